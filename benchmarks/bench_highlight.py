@@ -0,0 +1,110 @@
+"""Word-highlight SRT/VTT rendering: previous nested-loop version vs. current.
+
+Builds a synthetic transcript (3 hours, ~30k tokens by default) and times both
+implementations on it. Run from the repo root:
+
+    PYTHONPATH=src python benchmarks/bench_highlight.py [--hours 3] [--tokens 30000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, List
+
+from podkeet.formats import _format_timestamp, _to_srt, _to_vtt
+
+WORDS = "the a podcast episode about audio models and how we transcribe long recordings".split()
+
+
+def synthetic_transcript(hours: float, tokens: int, sentence_tokens: int, seed: int = 0) -> Any:
+    rng = random.Random(seed)
+    step = hours * 3600.0 / tokens
+    sentences = []
+    for first in range(0, tokens, sentence_tokens):
+        toks = []
+        for i in range(first, min(first + sentence_tokens, tokens)):
+            start = i * step
+            toks.append(
+                SimpleNamespace(
+                    text=" " + rng.choice(WORDS), start=start, end=start + step, duration=step
+                )
+            )
+        toks[-1].text += "."
+        sentences.append(
+            SimpleNamespace(
+                text="".join(t.text for t in toks),
+                start=toks[0].start,
+                end=toks[-1].end,
+                tokens=toks,
+            )
+        )
+    return SimpleNamespace(text="".join(s.text for s in sentences), sentences=sentences)
+
+
+def legacy_to_srt(result: Any) -> str:
+    """The nested-loop, ``str +=`` implementation this benchmark replaced."""
+    srt_content: List[str] = []
+    entry_index = 1
+    for sentence in getattr(result, "sentences", []):
+        tokens = getattr(sentence, "tokens", [])
+        for i, token in enumerate(tokens):
+            start_time = _format_timestamp(getattr(token, "start", 0.0), decimal_marker=",")
+            end_val = (
+                getattr(token, "end", 0.0)
+                if i == len(tokens) - 1
+                else getattr(tokens[i + 1], "start", 0.0)
+            )
+            end_time = _format_timestamp(end_val, decimal_marker=",")
+            text = ""
+            for j, inner_token in enumerate(tokens):
+                ttxt = getattr(inner_token, "text", "")
+                if i == j:
+                    text += ttxt.replace(ttxt.strip(), f"<u>{ttxt.strip()}</u>")
+                else:
+                    text += ttxt
+            text = text.strip()
+            srt_content.append(str(entry_index))
+            srt_content.append(f"{start_time} --> {end_time}")
+            srt_content.append(text)
+            srt_content.append("")
+            entry_index += 1
+    return "\n".join(srt_content)
+
+
+def best_of(fn: Any, arg: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = perf_counter()
+        fn(arg)
+        best = min(best, perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--tokens", type=int, default=30_000)
+    parser.add_argument("--sentence-tokens", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = synthetic_transcript(args.hours, args.tokens, args.sentence_tokens)
+    assert legacy_to_srt(result) == _to_srt(result, highlight_words=True)
+
+    legacy = best_of(legacy_to_srt, result, args.repeat)
+    srt = best_of(lambda r: _to_srt(r, highlight_words=True), result, args.repeat)
+    vtt = best_of(lambda r: _to_vtt(r, highlight_words=True), result, args.repeat)
+    print(
+        f"{args.tokens} tokens over {args.hours:g} h, "
+        f"{args.sentence_tokens} tokens per sentence (best of {args.repeat})"
+    )
+    print(f"  legacy srt  {legacy * 1000:9.1f} ms")
+    print(f"  srt         {srt * 1000:9.1f} ms  ({legacy / srt:.1f}x)")
+    print(f"  vtt         {vtt * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Chunked-result handling: nested dicts + SimpleNamespace vs. the array Transcript.
+
+Simulates the chunked path on a synthetic recording (3 hours, ~30k tokens,
+10-minute windows with 15 s overlap by default): normalize each window's
+result, offset it, stitch the windows and render SRT. Reports wall time and
+peak traced memory for the previous dict-based pipeline and for `Transcript`.
+
+    PYTHONPATH=src python benchmarks/bench_transcript.py [--hours 3] [--tokens 30000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tracemalloc
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from podkeet.chunking import Chunk, plan_chunks
+from podkeet.formats import _to_srt
+from podkeet.transcriber import _merge_transcripts, _norm_token
+from podkeet.transcript import Transcript
+
+WORDS = "the a podcast episode about audio models and how we transcribe long recordings".split()
+RATE = 16_000
+
+
+def synthetic_windows(
+    hours: float, tokens: int, chunk_seconds: float, overlap_seconds: float, seed: int = 0
+) -> Tuple[List[Any], List[Chunk]]:
+    """Per-window results (window-relative times) shaped like parakeet's output."""
+    rng = random.Random(seed)
+    step = hours * 3600.0 / tokens
+    timeline = [(" " + rng.choice(WORDS), i * step) for i in range(tokens)]
+    chunks = plan_chunks(int(hours * 3600 * RATE), chunk_seconds, RATE, overlap_seconds)
+    windows = []
+    for c in chunks:
+        lo, hi = c.offset, c.offset + c.duration
+        toks = [
+            SimpleNamespace(text=t, start=s - lo, end=s - lo + step, duration=step)
+            for t, s in timeline
+            if lo <= s < hi
+        ]
+        sentences = []
+        for i in range(0, len(toks), 40):
+            group = toks[i : i + 40]
+            sentences.append(
+                SimpleNamespace(
+                    text="".join(t.text for t in group),
+                    start=group[0].start,
+                    end=group[-1].end,
+                    duration=group[-1].end - group[0].start,
+                    tokens=group,
+                )
+            )
+        windows.append(
+            SimpleNamespace(text="".join(s.text for s in sentences), sentences=sentences)
+        )
+    return windows, chunks
+
+
+# --- previous implementation (nested dicts, copied per step) -------------------
+
+
+def legacy_result_to_dict(result: Any) -> Dict[str, Any]:
+    def token_to_dict(tok: Any) -> Dict[str, Any]:
+        return {
+            "text": getattr(tok, "text", ""),
+            "start": float(getattr(tok, "start", 0.0)),
+            "end": float(getattr(tok, "end", 0.0)),
+            "duration": float(getattr(tok, "duration", 0.0)),
+        }
+
+    return {
+        "text": getattr(result, "text", ""),
+        "sentences": [
+            {
+                "text": getattr(s, "text", ""),
+                "start": float(getattr(s, "start", 0.0)),
+                "end": float(getattr(s, "end", 0.0)),
+                "duration": float(getattr(s, "duration", 0.0)),
+                "tokens": [token_to_dict(t) for t in getattr(s, "tokens", [])],
+            }
+            for s in getattr(result, "sentences", [])
+        ],
+    }
+
+
+def legacy_dict_with_offset(d: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"text": d.get("text", ""), "sentences": []}
+    for s in d.get("sentences", []):
+        ss = {
+            "text": s.get("text", ""),
+            "start": s.get("start", 0.0) + offset,
+            "end": s.get("end", 0.0) + offset,
+            "duration": s.get("duration", 0.0),
+            "tokens": [],
+        }
+        for t in s.get("tokens", []):
+            ss["tokens"].append(
+                {
+                    "text": t.get("text", ""),
+                    "start": t.get("start", 0.0) + offset,
+                    "end": t.get("end", 0.0) + offset,
+                    "duration": t.get("duration", 0.0),
+                }
+            )
+        out["sentences"].append(ss)
+    return out
+
+
+def legacy_seam_cut(left: List[Dict], right: List[Dict], lo: float, hi: float) -> Tuple:
+    mid = (lo + hi) / 2
+    if hi <= lo:
+        return lo, lo
+    left_ov = [t for t in left if t["start"] >= lo and _norm_token(t["text"])]
+    right_ov = [t for t in right if t["start"] < hi and _norm_token(t["text"])]
+    best: Optional[Tuple[float, float, float]] = None
+    j = 0
+    for a in left_ov:
+        while j < len(right_ov) and right_ov[j]["start"] < a["start"] - 0.25:
+            j += 1
+        k = j
+        key = _norm_token(a["text"])
+        while k < len(right_ov) and right_ov[k]["start"] <= a["start"] + 0.25:
+            b = right_ov[k]
+            if _norm_token(b["text"]) == key:
+                dist = abs(a["start"] - mid)
+                if best is None or dist < best[0]:
+                    best = (dist, a["start"], b["start"])
+                break
+            k += 1
+    if best is None:
+        return mid, mid
+    return best[1], best[2]
+
+
+def legacy_sentence_from_tokens(tokens: List[Dict]) -> Dict[str, Any]:
+    return {
+        "text": "".join(t.get("text", "") for t in tokens),
+        "start": tokens[0]["start"],
+        "end": tokens[-1]["end"],
+        "duration": tokens[-1]["end"] - tokens[0]["start"],
+        "tokens": tokens,
+    }
+
+
+def legacy_keep_tokens(sentences: List[Dict], keep: Callable, tail: bool) -> Tuple:
+    out: List[Dict] = []
+    rebuilt: List[bool] = []
+    for s in sentences:
+        tokens = s.get("tokens", [])
+        kept = [t for t in tokens if keep(t)]
+        if not kept:
+            continue
+        if len(kept) == len(tokens):
+            out.append(s)
+            rebuilt.append(False)
+        else:
+            out.append(legacy_sentence_from_tokens(kept))
+            rebuilt.append(True)
+    if not out:
+        return out, False
+    return out, rebuilt[-1] if tail else rebuilt[0]
+
+
+def legacy_merge(parts: List[Dict[str, Any]], chunks: List[Chunk]) -> Dict[str, Any]:
+    merged: List[Dict[str, Any]] = []
+    for idx, p in enumerate(parts):
+        incoming = p.get("sentences", [])
+        if idx == 0 or not merged:
+            merged = list(incoming)
+            continue
+        lo = chunks[idx].offset
+        hi = chunks[idx - 1].offset + chunks[idx - 1].duration
+        left_cut, right_cut = legacy_seam_cut(
+            [t for s in merged for t in s.get("tokens", [])],
+            [t for s in incoming for t in s.get("tokens", [])],
+            lo,
+            hi,
+        )
+        left, lc = legacy_keep_tokens(merged, lambda t: t["start"] < left_cut, True)
+        right, rc = legacy_keep_tokens(incoming, lambda t: t["start"] >= right_cut, False)
+        if left and right and lc and rc:
+            joined = legacy_sentence_from_tokens(left[-1]["tokens"] + right[0]["tokens"])
+            merged = left[:-1] + [joined] + right[1:]
+        else:
+            merged = left + right
+    return {"text": "".join(s.get("text", "") for s in merged).strip(), "sentences": merged}
+
+
+def legacy_ns(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: legacy_ns(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [legacy_ns(x) for x in obj]
+    return obj
+
+
+# --- runs -----------------------------------------------------------------------
+
+
+def run_legacy(windows: List[Any], chunks: List[Chunk]) -> str:
+    parts = [
+        legacy_dict_with_offset(legacy_result_to_dict(w), c.offset) for w, c in zip(windows, chunks)
+    ]
+    return _to_srt(legacy_ns(legacy_merge(parts, chunks)))
+
+
+def run_transcript(windows: List[Any], chunks: List[Chunk]) -> str:
+    parts = [Transcript.from_result(w).shift(c.offset) for w, c in zip(windows, chunks)]
+    return _to_srt(_merge_transcripts(parts, chunks))
+
+
+def measure(fn: Callable[..., str], *args: Any) -> Tuple[float, float, str]:
+    tracemalloc.start()
+    t0 = perf_counter()
+    out = fn(*args)
+    elapsed = perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--tokens", type=int, default=30_000)
+    parser.add_argument("--chunk-seconds", type=float, default=600.0)
+    parser.add_argument("--overlap-seconds", type=float, default=15.0)
+    args = parser.parse_args()
+
+    windows, chunks = synthetic_windows(
+        args.hours, args.tokens, args.chunk_seconds, args.overlap_seconds
+    )
+    legacy_t, legacy_mb, legacy_srt = measure(run_legacy, windows, chunks)
+    new_t, new_mb, new_srt = measure(run_transcript, windows, chunks)
+    assert legacy_srt == new_srt
+
+    print(f"{args.tokens} tokens over {args.hours:g} h in {len(chunks)} windows")
+    print(f"  dicts + SimpleNamespace  {legacy_t * 1000:8.1f} ms  peak {legacy_mb:7.1f} MiB")
+    print(
+        f"  Transcript arrays        {new_t * 1000:8.1f} ms  peak {new_mb:7.1f} MiB"
+        f"  ({legacy_t / new_t:.1f}x faster, {legacy_mb / new_mb:.1f}x less memory)"
+    )
+
+
+if __name__ == "__main__":
+    main()
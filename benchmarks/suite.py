@@ -0,0 +1,401 @@
+"""Benchmark suite: chunk planning, merge, formatters and the CLI on synthetic input.
+
+Generates speech-like PCM (tone bursts separated by silence) and a
+deterministic stub model whose tokens depend only on absolute time, so every
+run on every machine sees the same transcripts. Nothing needs MLX, ffmpeg or
+the network; it runs on a plain Linux box. Cases, per duration:
+
+- ``plan_chunks``: window a decoded buffer into zero-copy chunk views
+- ``vad``: detect speech, cut the silences and plan windows at pauses
+- ``merge``: normalize, offset and stitch every window's result
+- ``format.<fmt>`` / ``format.<fmt>.highlight``: each formatter on the merged transcript
+- ``cli.transcribe``: ``podkeet transcribe --pcm --format all`` end to end
+- ``shard.serial`` / ``shard.workers<N>``: the same windows transcribed one
+  after another in-process, then by ``--workers`` processes; the stub model
+  does a spectrogram's worth of FFTs here so there is work to spread
+
+Results are written as JSON. With ``--baseline`` each case is compared to a
+previous results file and the run exits 1 when one got slower than
+``--threshold`` (and by more than ``--min-seconds``). From the repo root:
+
+    PYTHONPATH=src python benchmarks/suite.py [--durations 1m,10m,1h,6h] [--repeat 5]
+        [--cases merge,format] [--workers 4] [--output results.json] [--baseline main.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+
+from podkeet import get_version, sharding
+from podkeet.chunking import (
+    DEFAULT_CHUNK_SECONDS,
+    DEFAULT_OVERLAP_SECONDS,
+    plan_chunks,
+    plan_chunks_at_pauses,
+)
+from podkeet.ffmpeg_utils import SAMPLE_RATE, load_pcm
+from podkeet.formats import FORMATTERS, WORD_FORMATTERS
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import _merge_transcripts, _transcribe_chunked
+from podkeet.transcript import Transcript
+from podkeet.vad import detect_voice, trim_silence
+
+WORDS = "the a podcast episode about audio models and how we transcribe long recordings".split()
+TOKEN_SECONDS = 0.4
+SENTENCE_TOKENS = 12
+CASES = ("plan_chunks", "vad", "merge", "format", "cli", "shard")
+FRAME = 400  # 25 ms analysis frames for the stub model's simulated feature extraction
+
+
+def parse_duration(text: str) -> float:
+    """``"90s"``, ``"10m"``, ``"1.5h"`` or plain seconds."""
+    text = text.strip().lower()
+    units = {"s": 1.0, "m": 60.0, "h": 3600.0}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def duration_label(seconds: float) -> str:
+    for unit, size in (("h", 3600.0), ("m", 60.0)):
+        if seconds >= size and seconds % size == 0:
+            return f"{seconds / size:g}{unit}"
+    return f"{seconds:g}s"
+
+
+# --- synthetic input ---------------------------------------------------------
+
+
+def write_pcm(path: Path, seconds: float, seed: int = 0, block_seconds: int = 60) -> Path:
+    """Write *seconds* of speech-like mono float32 PCM to *path*, a block at a time.
+
+    Utterances of 0.3-3 s (a low tone with harmonics and noise) alternate
+    with 0.1-1.2 s of near-silence, so memory stays flat for hours of audio.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    block = block_seconds * SAMPLE_RATE
+    with open(path, "wb") as fh:
+        for start in range(0, total, block):
+            n = min(block, total - start)
+            t = np.arange(start, start + n, dtype=np.float64) / SAMPLE_RATE
+            env = np.zeros(n, dtype=np.float32)
+            pos = 0
+            while pos < n:
+                talk = int(rng.uniform(0.3, 3.0) * SAMPLE_RATE)
+                env[pos : pos + talk] = rng.uniform(0.2, 0.6)
+                pos += talk + int(rng.uniform(0.1, 1.2) * SAMPLE_RATE)
+            pitch = rng.uniform(100.0, 220.0)
+            voice = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+            noise = rng.standard_normal(n) * 0.02
+            (env * voice + noise).astype(np.float32).tofile(fh)
+    return path
+
+
+class StubModel:
+    """Deterministic stand-in for a Parakeet model.
+
+    Token ``i`` is always ``WORDS[i * 7 % len(WORDS)]`` at ``i * TOKEN_SECONDS``
+    of the recording, and every ``SENTENCE_TOKENS`` tokens end a sentence, so
+    overlapping windows agree on what they heard, like a real model would.
+    """
+
+    preprocessor_config = SimpleNamespace(sample_rate=SAMPLE_RATE)
+
+    def __init__(self, compute: bool = False) -> None:
+        self.base: Optional[np.ndarray] = None  # buffer that windows are sliced from
+        self.compute = compute  # burn CPU in proportion to the audio, like a real model
+
+    def _offset(self, samples: np.ndarray) -> int:
+        if self.base is None:
+            return 0
+        addr = samples.__array_interface__["data"][0]
+        base = self.base.__array_interface__["data"][0]
+        return (addr - base) // samples.itemsize
+
+    def window(self, samples: np.ndarray) -> Any:
+        """The result for *samples*, with times relative to their first sample."""
+        if self.compute:
+            frames = np.asarray(samples[: len(samples) // FRAME * FRAME]).reshape(-1, FRAME)
+            for _ in range(4):
+                np.log1p(np.abs(np.fft.rfft(frames, axis=1)))
+        lo = self._offset(samples) / SAMPLE_RATE
+        hi = lo + len(samples) / SAMPLE_RATE
+        sentences: List[Any] = []
+        toks: List[Any] = []
+        i = math.ceil(lo / TOKEN_SECONDS - 1e-9)
+        while i * TOKEN_SECONDS < hi:
+            start = i * TOKEN_SECONDS - lo
+            end = min(start + TOKEN_SECONDS * 0.8, hi - lo)
+            text = " " + WORDS[i * 7 % len(WORDS)]
+            if (i + 1) % SENTENCE_TOKENS == 0:
+                text += "."
+            toks.append(SimpleNamespace(text=text, start=start, end=end, duration=end - start))
+            if (i + 1) % SENTENCE_TOKENS == 0:
+                sentences.append(_sentence(toks))
+                toks = []
+            i += 1
+        if toks:
+            sentences.append(_sentence(toks))
+        return SimpleNamespace(text="".join(s.text for s in sentences), sentences=sentences)
+
+    def transcribe(self, audio_path: Path) -> Any:
+        return self.window(self.base)
+
+
+def shard_loader(name: str, dtype: str) -> StubModel:
+    """Worker-side loader: a computing stub over the worker's map of the PCM."""
+    model = StubModel(compute=True)
+    model.base = sharding._worker["samples"]
+    return model
+
+
+def _sentence(toks: List[Any]) -> Any:
+    start, end = toks[0].start, toks[-1].end
+    text = "".join(t.text for t in toks)
+    return SimpleNamespace(text=text, start=start, end=end, duration=end - start, tokens=toks)
+
+
+# --- measurement -------------------------------------------------------------
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Best and median seconds per call; fast cases are looped like `timeit`."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat, number)]
+    return {"seconds": min(runs), "median": statistics.median(runs), "number": number}
+
+
+@contextmanager
+def stubbed_cli(model: StubModel, pcm_path: Path, work: Path) -> Iterator[None]:
+    """Route `podkeet transcribe --pcm` through the stub model and the PCM file."""
+
+    def decode(path: Path, sample_rate: int = SAMPLE_RATE, out_path: Any = None) -> np.ndarray:
+        model.base = load_pcm(pcm_path)
+        return model.base
+
+    registry = ModelRegistry(loader=lambda name, dtype: model)
+    with (
+        patch.dict(os.environ, {"PODKEET_CHECKPOINT_DIR": str(work / "checkpoints")}),
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.decode_audio", side_effect=decode),
+        patch("podkeet.transcriber.get_registry", return_value=registry),
+        patch(
+            "podkeet.transcriber._transcribe_samples",
+            side_effect=lambda m, samples, dtype: m.window(samples),
+        ),
+    ):
+        yield
+
+
+def run_cases(
+    seconds: float, cases: List[str], repeat: int, work: Path, workers: int = 4
+) -> Dict[str, Dict[str, Any]]:
+    from typer.testing import CliRunner
+
+    from podkeet.cli import app
+
+    label = duration_label(seconds)
+    pcm_path = write_pcm(work / f"synthetic-{label}.f32", seconds)
+    samples = load_pcm(pcm_path)
+    model = StubModel()
+    model.base = samples
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(name: str, fn: Callable[[], Any]) -> None:
+        stats = measure(fn, repeat)
+        stats["audio_seconds"] = seconds
+        results[f"{name}/{label}"] = stats
+        print(f"  {name + '/' + label:<28} {stats['seconds'] * 1000:10.3f} ms", flush=True)
+
+    chunks = plan_chunks(len(samples), DEFAULT_CHUNK_SECONDS, SAMPLE_RATE, DEFAULT_OVERLAP_SECONDS)
+    if "plan_chunks" in cases:
+
+        def split() -> List[np.ndarray]:
+            windows = plan_chunks(
+                len(samples), DEFAULT_CHUNK_SECONDS, SAMPLE_RATE, DEFAULT_OVERLAP_SECONDS
+            )
+            return [c.slice(samples) for c in windows]
+
+        record("plan_chunks", split)
+
+    if "vad" in cases:
+
+        def vad() -> List[Any]:
+            trimmed = trim_silence(samples, detect_voice(samples))
+            return plan_chunks_at_pauses(
+                len(trimmed.samples), trimmed.pauses, DEFAULT_CHUNK_SECONDS, SAMPLE_RATE
+            )
+
+        record("vad", vad)
+
+    windows = [model.window(c.slice(samples)) for c in chunks]
+
+    def merge() -> Transcript:
+        parts = [Transcript.from_result(w).shift(c.offset) for w, c in zip(windows, chunks)]
+        return _merge_transcripts(parts, chunks)
+
+    if "merge" in cases:
+        record("merge", merge)
+
+    if "format" in cases:
+        transcript = merge()
+        for fmt, formatter in FORMATTERS.items():
+            record(f"format.{fmt}", lambda f=formatter: f(transcript))
+        for fmt, formatter in WORD_FORMATTERS.items():
+            record(f"format.{fmt}.highlight", lambda f=formatter: f(transcript))
+
+    if "cli" in cases:
+        audio = work / f"synthetic-{label}.wav"  # only names the outputs
+        audio.touch()
+        out_dir = work / f"out-{label}"
+        args = ["transcribe", str(audio), "--out-dir", str(out_dir), "--pcm", "--format", "all"]
+        args += ["--no-cache", "--memory-budget", "4096", "--no-timing"]
+        runner = CliRunner()
+
+        def cli() -> None:
+            result = runner.invoke(app, args)
+            if result.exit_code != 0:
+                raise RuntimeError(f"podkeet {' '.join(args)} failed:\n{result.output}")
+
+        with stubbed_cli(model, pcm_path, work):
+            record("cli.transcribe", cli)
+
+    if "shard" in cases:
+        # Same windows both ways; workers are forked so they keep the stubbed inference
+        shards, plan = sharding.plan_shards(len(samples), workers, worker_memory_mb=4096)
+        heavy = StubModel(compute=True)
+        heavy.base = samples
+        window = plan.chunk_seconds or seconds
+
+        def serial() -> Transcript:
+            return _transcribe_chunked(heavy, samples, "float32", window, plan.overlap_seconds)
+
+        def sharded() -> Transcript:
+            return sharding.transcribe_sharded(
+                samples,
+                workers,
+                loader=shard_loader,
+                chunk_seconds=window,
+                overlap_seconds=plan.overlap_seconds,
+                start_method="fork",
+            )[0]
+
+        with patch(
+            "podkeet.transcriber._transcribe_samples",
+            side_effect=lambda m, samples, dtype: m.window(samples),
+        ):
+            record("shard.serial", serial)
+            record(f"shard.workers{workers}", sharded)
+        before = results[f"shard.serial/{label}"]["seconds"]
+        after = results[f"shard.workers{workers}/{label}"]["seconds"]
+        print(f"  {'':<28} {before / after:9.2f}x with {workers} workers ({len(shards)} windows)")
+
+    pcm_path.unlink()
+    return results
+
+
+# --- baseline comparison -----------------------------------------------------
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+    min_seconds: float,
+) -> List[str]:
+    """Print current vs. baseline per case and return the cases that regressed.
+
+    A case regresses when it is more than *threshold* (relative) and more than
+    *min_seconds* (absolute, to ignore timer noise on tiny cases) slower.
+    """
+    regressions = []
+    print(f"\n{'case':<28} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<28} {'-':>11} {stats['seconds'] * 1000:9.2f}ms {'new':>8}")
+            continue
+        before, now = old["seconds"], stats["seconds"]
+        change = now / before - 1 if before > 0 else 0.0
+        slower = change > threshold and now - before > min_seconds
+        flag = "  REGRESSION" if slower else ""
+        print(f"{name:<28} {before * 1000:9.2f}ms {now * 1000:9.2f}ms {change:+8.1%}{flag}")
+        if slower:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", default="1m,10m,1h", help="e.g. 1m,10m,1h,6h")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"subset of {','.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, default=min(4, os.cpu_count() or 1), help="processes for shard"
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results.json"))
+    parser.add_argument("--baseline", type=Path, help="results JSON of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown")
+    parser.add_argument(
+        "--min-seconds", type=float, default=0.002, help="ignore slowdowns smaller than this"
+    )
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    durations = [parse_duration(d) for d in args.durations.split(",") if d.strip()]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="podkeet-bench-") as tmp:
+        for seconds in durations:
+            print(f"{duration_label(seconds)} of synthetic audio (best of {args.repeat})")
+            results.update(run_cases(seconds, cases, args.repeat, Path(tmp), args.workers))
+
+    report = {
+        "meta": {
+            "podkeet": get_version(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.threshold:.0%}: ", end="")
+            print(", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,30 @@
-from importlib import metadata
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from rich.console import Console
+if TYPE_CHECKING:
+    from rich.console import Console
 
 __all__ = ["console", "APP_NAME", "get_version", "Outputs"]
 
-console = Console()
 APP_NAME = "podkeet"
+_console: Optional["Console"] = None
+
+
+def __getattr__(name: str) -> Any:
+    # ``console`` is created on first use so that importing podkeet doesn't load rich
+    if name == "console":
+        global _console
+        if _console is None:
+            from rich.console import Console
+
+            _console = Console()
+        return _console
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_version() -> str:
+    from importlib import metadata
+
     try:
         return metadata.version(APP_NAME)
     except metadata.PackageNotFoundError:
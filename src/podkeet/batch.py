@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import glob
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .downloader import DownloadAttempt, download_audio, video_id
+from .ffmpeg_utils import (
+    MP3_ENCODE_REALTIME,
+    SAMPLE_RATE,
+    decode_audio,
+    encode_mp3,
+    extract_audio_from_video,
+    is_media_file,
+    is_url,
+    is_video_file,
+    load_pcm,
+    probe_duration,
+)
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, ModelRegistry, get_registry
+from .tracing import span
+from .transcriber import transcribe as run_transcription
+
+
+def _expand_input(item: str, base: Optional[Path] = None) -> List[str]:
+    """Expand one CLI/manifest entry into concrete sources.
+
+    URLs pass through, directories expand to their media files, and anything
+    that is not an existing path is treated as a glob pattern. Unmatched
+    entries are kept so they surface as a per-item failure instead of vanishing.
+    """
+    if is_url(item):
+        return [item]
+    path = Path(item).expanduser()
+    if base is not None and not path.is_absolute():
+        path = base / path
+    if path.is_dir():
+        return [str(p) for p in sorted(path.iterdir()) if p.is_file() and is_media_file(p)]
+    if path.exists():
+        return [str(path)]
+    matches = sorted(glob.glob(str(path), recursive=True))
+    files = [m for m in matches if Path(m).is_file()]
+    return files or [str(path)]
+
+
+def read_manifest(manifest: Path) -> List[str]:
+    """Read a manifest of URLs/paths, one per line. Blank lines and '#' comments are skipped.
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    sources: List[str] = []
+    for line in manifest.read_text(encoding="utf-8").splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        sources.extend(_expand_input(entry, base=manifest.parent))
+    return sources
+
+
+def collect_sources(inputs: Iterable[str], manifest: Optional[Path] = None) -> List[str]:
+    """Build the ordered, de-duplicated queue of sources for a batch run."""
+    sources: List[str] = []
+    for item in inputs:
+        sources.extend(_expand_input(item))
+    if manifest is not None:
+        sources.extend(read_manifest(manifest))
+    seen = set()
+    ordered: List[str] = []
+    for s in sources:
+        if s not in seen:
+            seen.add(s)
+            ordered.append(s)
+    return ordered
+
+
+@dataclass
+class BatchItem:
+    source: str
+    status: str = "pending"
+    transcript_path: Optional[str] = None
+    transcript_paths: List[str] = field(default_factory=list)
+    audio_path: Optional[str] = None
+    error: Optional[str] = None
+    audio_seconds: float = 0.0
+    download_seconds: Optional[float] = None
+    extract_seconds: Optional[float] = None
+    transcribe_seconds: Optional[float] = None
+    transcode_seconds: Optional[float] = None
+    transcode_seconds_saved_estimate: Optional[float] = None  # at MP3_ENCODE_REALTIME, not timed
+    total_seconds: float = 0.0
+    download_attempts: List[DownloadAttempt] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Audio seconds transcribed per wall-clock second for this item."""
+        return self.audio_seconds / self.total_seconds if self.total_seconds > 0 else 0.0
+
+    def fail(self, exc: BaseException) -> None:
+        """Record *exc* as this item's error, keeping any download attempts it carries."""
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+        self.download_attempts = list(getattr(exc, "attempts", None) or self.download_attempts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["throughput"] = self.throughput
+        return d
+
+
+@dataclass
+class BatchSummary:
+    items: List[BatchItem] = field(default_factory=list)
+    model: str = DEFAULT_MODEL
+    model_load_seconds: float = 0.0
+    total_seconds: float = 0.0
+    stages: Dict[str, Any] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)  # left out by the caller's *skip*
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for i in self.items if i.status == "ok")
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for i in self.items if i.status == "error")
+
+    @property
+    def audio_seconds(self) -> float:
+        return sum(i.audio_seconds for i in self.items if i.status == "ok")
+
+    @property
+    def throughput(self) -> float:
+        """Audio seconds transcribed per wall-clock second over the whole run."""
+        return self.audio_seconds / self.total_seconds if self.total_seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ok" if self.failed == 0 else "partial",
+            "model": self.model,
+            "count": len(self.items),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "model_load_seconds": self.model_load_seconds,
+            "total_seconds": self.total_seconds,
+            "audio_seconds": self.audio_seconds,
+            "throughput": self.throughput,
+            "transcode_seconds_saved_estimate": sum(
+                i.transcode_seconds_saved_estimate or 0.0 for i in self.items
+            ),
+            "download_retries": sum(max(0, len(i.download_attempts) - 1) for i in self.items),
+            "stages": self.stages,
+            "items": [i.as_dict() for i in self.items],
+            "skipped": self.skipped,
+        }
+
+
+@dataclass
+class PreparedAudio:
+    """Audio ready for the model, plus how long it took to get there."""
+
+    audio_path: Path
+    temporary: bool = False
+    native: bool = False  # downloaded stream in its original codec, not MP3
+    pcm_path: Optional[Path] = None
+    download_seconds: Optional[float] = None
+    extract_seconds: Optional[float] = None
+    download_attempts: List[DownloadAttempt] = field(default_factory=list)
+
+
+def _decode_to_pcm(audio_path: Path) -> Path:
+    """Decode to a temporary memory-mappable ``.f32`` file (16 kHz mono float32)."""
+    fd, name = tempfile.mkstemp(prefix="podkeet-", suffix=".f32")
+    os.close(fd)
+    pcm_path = Path(name)
+    try:
+        decode_audio(audio_path, out_path=pcm_path)
+    except Exception:
+        pcm_path.unlink(missing_ok=True)
+        raise
+    return pcm_path
+
+
+def prepare_source(source: str, out_dir: Path, pcm: bool = False) -> PreparedAudio:
+    """Download a URL or extract audio from a local video; local audio passes through.
+
+    With *pcm*, video and audio are decoded once to raw PCM instead of being
+    re-encoded to MP3, so the model never re-reads a lossy intermediate.
+    """
+    if is_url(source):
+        dt0 = perf_counter()
+        attempts: List[DownloadAttempt] = []
+        audio_path = download_audio(source, out_dir, codec=None, attempts=attempts)
+        prepared = PreparedAudio(
+            audio_path,
+            temporary=True,
+            native=True,
+            download_seconds=perf_counter() - dt0,
+            download_attempts=attempts,
+        )
+        if pcm:
+            et0 = perf_counter()
+            prepared.pcm_path = _decode_to_pcm(audio_path)
+            prepared.extract_seconds = perf_counter() - et0
+        return prepared
+    local_path = Path(source)
+    if not local_path.exists():
+        raise FileNotFoundError(f"File not found: {local_path}")
+    if pcm:
+        et0 = perf_counter()
+        pcm_path = _decode_to_pcm(local_path)
+        return PreparedAudio(local_path, pcm_path=pcm_path, extract_seconds=perf_counter() - et0)
+    if is_video_file(local_path):
+        et0 = perf_counter()
+        audio_path = extract_audio_from_video(local_path, out_dir)
+        return PreparedAudio(audio_path, temporary=True, extract_seconds=perf_counter() - et0)
+    return PreparedAudio(local_path)
+
+
+def transcribe_prepared(
+    item: BatchItem,
+    prepared: PreparedAudio,
+    out_dir: Path,
+    *,
+    keep_audio: bool = False,
+    audio_format: str = "mp3",
+    **options: Any,
+) -> BatchItem:
+    """Run the model on already-prepared audio and fill in *item*.
+
+    *options* are forwarded to `transcriber.transcribe` (model_name, language,
+    out_format, registry, chunk_seconds, ...). Errors are captured on the item
+    rather than raised. Temporary audio is removed afterwards unless
+    *keep_audio* is set; kept native downloads are converted to MP3 unless
+    *audio_format* is ``"native"``.
+    """
+    item.download_seconds = prepared.download_seconds
+    item.download_attempts = prepared.download_attempts
+    item.extract_seconds = prepared.extract_seconds
+    item.audio_path = str(prepared.audio_path)
+    try:
+        samples = None
+        if prepared.pcm_path is not None:
+            samples = load_pcm(prepared.pcm_path)
+            item.audio_seconds = len(samples) / SAMPLE_RATE
+        else:
+            item.audio_seconds = probe_duration(prepared.audio_path)
+        if options.get("cache") is not None and is_url(item.source):
+            # Key URL results by video ID so `podkeet transcribe URL` hits them too
+            options.setdefault("cache_id", video_id(item.source))
+        tt0 = perf_counter()
+        with span("transcribe", source=item.source):
+            result = run_transcription(
+                prepared.audio_path, out_dir=out_dir, samples=samples, **options
+            )
+        item.transcribe_seconds = perf_counter() - tt0
+        item.transcript_path = str(result.out_path)
+        item.transcript_paths = [str(p) for p in getattr(result, "out_paths", None) or []]
+        item.status = "ok"
+    except Exception as e:
+        item.fail(e)
+    finally:
+        if prepared.pcm_path is not None:
+            prepared.pcm_path.unlink(missing_ok=True)
+        if prepared.native:
+            _finish_native(item, prepared, keep_audio and audio_format == "mp3")
+        if prepared.temporary and not keep_audio:
+            try:
+                prepared.audio_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return item
+
+
+def _finish_native(item: BatchItem, prepared: PreparedAudio, want_mp3: bool) -> None:
+    """Produce the MP3 of a native download only when it is kept; else estimate the saving."""
+    src = prepared.audio_path
+    if not want_mp3 or src.suffix.lower() == ".mp3":
+        item.transcode_seconds_saved_estimate = item.audio_seconds / MP3_ENCODE_REALTIME
+        return
+    ct0 = perf_counter()
+    try:
+        mp3_path = encode_mp3(src, src.with_suffix(".mp3"))
+    except Exception:
+        return  # keep the native file rather than losing the audio
+    item.transcode_seconds = perf_counter() - ct0
+    src.unlink(missing_ok=True)
+    prepared.audio_path = mp3_path
+    item.audio_path = str(mp3_path)
+
+
+def process_source(
+    source: str,
+    out_dir: Path,
+    *,
+    keep_audio: bool = False,
+    pcm: bool = False,
+    **options: Any,
+) -> BatchItem:
+    """Download/extract/transcribe a single source, recording timings.
+
+    Errors are captured on the returned item rather than raised. *options* are
+    forwarded to `transcribe_prepared`.
+    """
+    item = BatchItem(source=source)
+    t0 = perf_counter()
+    try:
+        prepared = prepare_source(source, out_dir, pcm=pcm)
+    except Exception as e:
+        item.fail(e)
+    else:
+        transcribe_prepared(item, prepared, out_dir, keep_audio=keep_audio, **options)
+    item.total_seconds = perf_counter() - t0
+    return item
+
+
+def _load_model(
+    summary: BatchSummary, registry: ModelRegistry, model_name: str, dtype: str
+) -> None:
+    """Load the model into *registry*, timing it as ``summary.model_load_seconds``."""
+    lt0 = perf_counter()
+    registry.get(model_name, dtype)
+    summary.model_load_seconds = perf_counter() - lt0
+
+
+def run_batch(
+    sources: List[str],
+    out_dir: Path,
+    *,
+    model_name: str = DEFAULT_MODEL,
+    dtype: str = DEFAULT_DTYPE,
+    registry: Optional[ModelRegistry] = None,
+    keep_audio: bool = False,
+    pcm: bool = False,
+    on_item: Optional[Callable[[int, BatchItem], None]] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+    **options: Any,
+) -> BatchSummary:
+    """Transcribe *sources* in order with a single warm model.
+
+    The model is loaded once, before the first item that needs it; a failing
+    item is recorded and the queue moves on to the next one. Sources for which
+    *skip* returns True are listed in ``summary.skipped`` instead (an error
+    raised by *skip* fails that item). Extra *options* are forwarded to
+    `transcriber.transcribe`.
+    """
+    registry = registry if registry is not None else get_registry()
+    summary = BatchSummary(model=model_name)
+    t0 = perf_counter()
+
+    # Sharded runs load the model in each worker process, never in this one
+    loaded = options.get("workers", 1) > 1
+    for idx, source in enumerate(sources):
+        try:
+            if skip is not None and skip(source):
+                summary.skipped.append(source)
+                continue
+        except Exception as e:
+            item = BatchItem(source=source)
+            item.fail(e)
+        else:
+            if not loaded:
+                _load_model(summary, registry, model_name, dtype)
+                loaded = True
+            item = process_source(
+                source,
+                out_dir,
+                keep_audio=keep_audio,
+                pcm=pcm,
+                model_name=model_name,
+                dtype=dtype,
+                registry=registry,
+                **options,
+            )
+        summary.items.append(item)
+        if on_item is not None:
+            on_item(idx, item)
+
+    summary.total_seconds = perf_counter() - t0
+    return summary
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .ffmpeg_utils import SAMPLE_RATE, decode_command, ensure_ffmpeg
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_MAX_MB = 2048
+_BLOCK = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    """``$PODKEET_CACHE_DIR``, else ``$XDG_CACHE_HOME/podkeet/transcripts``."""
+    env = os.environ.get("PODKEET_CACHE_DIR")
+    if env:
+        return Path(env).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "podkeet" / "transcripts"
+
+
+def default_max_bytes() -> int:
+    try:
+        return int(float(os.environ.get("PODKEET_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """Streaming SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_BLOCK), b""):
+            h.update(block)
+    return "file:" + h.hexdigest()
+
+
+def hash_audio(path: Path, sample_rate: int = SAMPLE_RATE) -> str:
+    """Streaming SHA-256 of a file's decoded PCM, as ffmpeg produces it.
+
+    Equal to `hash_samples` of `decode_audio` for the same file, but the
+    samples are hashed off the pipe instead of being held in memory. Unlike
+    the container bytes, this survives a re-mux or a change of tags.
+    """
+    ensure_ffmpeg()
+    h = hashlib.sha256()
+    proc = subprocess.Popen(
+        decode_command(path, sample_rate), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert proc.stdout is not None
+    for block in iter(lambda: proc.stdout.read(_BLOCK), b""):
+        h.update(block)
+    _, stderr = proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, stderr=stderr)
+    return "pcm:" + h.hexdigest()
+
+
+def hash_samples(samples: "np.ndarray") -> str:
+    """Streaming SHA-256 of decoded PCM samples, without copying the buffer."""
+    import numpy as np
+
+    h = hashlib.sha256()
+    arr = np.ascontiguousarray(samples, dtype=np.float32)
+    step = _BLOCK // arr.itemsize
+    for i in range(0, len(arr), step):
+        h.update(memoryview(arr[i : i + step]))
+    return "pcm:" + h.hexdigest()
+
+
+def transcript_key(audio_id: str, model_name: str, dtype: str, **options: Any) -> str:
+    """Cache key for one audio identity under a model and output-affecting options."""
+    payload = json.dumps(
+        {"audio": audio_id, "model": model_name, "dtype": dtype, "options": options},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    name: str
+    result: Dict[str, Any]
+    meta: Dict[str, Any]
+
+
+class TranscriptCache:
+    """On-disk, content-addressed store of normalized transcription results.
+
+    Entries live at ``<root>/<key[:2]>/<key>.json``. Reads refresh the entry's
+    mtime so eviction (oldest mtime first) is least-recently-used.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        self.root = Path(root) if root else default_cache_dir()
+        self.max_bytes = max_bytes if max_bytes is not None else default_max_bytes()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _entries(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return list(self.root.glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return CacheEntry(
+            key=key,
+            name=data.get("name", key),
+            result=data.get("result", {}),
+            meta=data.get("meta", {}),
+        )
+
+    def put(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        name: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Store *result* atomically, then evict old entries if over the size cap."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "key": key,
+            "name": name,
+            "created": time.time(),
+            "meta": meta or {},
+            "result": result,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.prune()
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        sizes = [p.stat().st_size for p in entries]
+        return {
+            "path": str(self.root),
+            "entries": len(entries),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least-recently-used entries until the cache fits *max_bytes*.
+
+        Returns the number of entries removed.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= limit:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry. Returns how many were removed."""
+        count = len(self._entries())
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        return count
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from .cache import transcript_key
+from .chunking import Chunk
+from .transcript import Transcript
+
+
+def default_checkpoint_dir() -> Path:
+    """``$PODKEET_CHECKPOINT_DIR``, else ``$XDG_CACHE_HOME/podkeet/checkpoints``."""
+    env = os.environ.get("PODKEET_CHECKPOINT_DIR")
+    if env:
+        return Path(env).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "podkeet" / "checkpoints"
+
+
+class ChunkCheckpoint:
+    """Per-chunk results of one chunked run, stored as they complete.
+
+    Each finished window is saved as ``<dir>/<start>-<end>.json`` (sample
+    indices) with its window-relative result and offset, so a re-run with
+    *resume* only transcribes the windows that are missing. A changed chunk
+    plan simply misses.
+    """
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self.path = path
+        self.resume = resume
+        self.reused = 0
+        if not resume:
+            self.clear()
+
+    def _file(self, chunk: Chunk) -> Path:
+        return self.path / f"{chunk.start}-{chunk.end}.json"
+
+    def load(self, chunk: Chunk) -> Optional[Transcript]:
+        """The saved, already offset transcript for *chunk*, or None."""
+        if not self.resume:
+            return None
+        try:
+            data = json.loads(self._file(chunk).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("sample_rate") != chunk.sample_rate:
+            return None
+        self.reused += 1
+        return Transcript.from_dict(data.get("result", {})).shift(float(data["offset"]))
+
+    def save(self, chunk: Chunk, result: Transcript) -> Path:
+        """Store the window-relative *result* of *chunk* atomically."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self._file(chunk)
+        data = {
+            "start": chunk.start,
+            "end": chunk.end,
+            "sample_rate": chunk.sample_rate,
+            "offset": chunk.offset,
+            "result": result.to_dict(),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    def clear(self) -> None:
+        if self.path.exists():
+            shutil.rmtree(self.path)
+
+
+class CheckpointStore:
+    """Checkpoint directories keyed by audio identity, model and dtype."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root) if root else default_checkpoint_dir()
+
+    def open(
+        self, audio_id: str, model_name: str, dtype: str, resume: bool = False
+    ) -> ChunkCheckpoint:
+        """Checkpoints for one run; without *resume* any earlier ones are discarded."""
+        return ChunkCheckpoint(self.root / transcript_key(audio_id, model_name, dtype), resume)
+
+    def clear(self) -> int:
+        """Remove every checkpoint directory. Returns how many were removed."""
+        if not self.root.exists():
+            return 0
+        runs = [p for p in self.root.iterdir() if p.is_dir()]
+        shutil.rmtree(self.root)
+        return len(runs)
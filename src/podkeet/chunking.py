@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .ffmpeg_utils import SAMPLE_RATE
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_CHUNK_SECONDS = 600.0
+DEFAULT_OVERLAP_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A half-open sample range ``[start, end)`` of a decoded PCM buffer."""
+
+    start: int
+    end: int
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def offset(self) -> float:
+        """Exact start time of the chunk in seconds."""
+        return self.start / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) / self.sample_rate
+
+    def slice(self, samples: "np.ndarray") -> "np.ndarray":
+        """Zero-copy view of this chunk's samples."""
+        return samples[self.start : self.end]
+
+
+def plan_chunks(
+    num_samples: int,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+    overlap_seconds: float = 0.0,
+) -> List[Chunk]:
+    """Split ``num_samples`` into windows of ``chunk_seconds``.
+
+    Consecutive windows share ``overlap_seconds`` of audio so words straddling
+    a boundary are heard whole by at least one window. Boundaries are sample
+    indices, so offsets are exact and the last window takes whatever remains.
+    """
+    if chunk_seconds <= 0:
+        raise ValueError("chunk_seconds must be > 0")
+    if not 0 <= overlap_seconds < chunk_seconds:
+        raise ValueError("overlap_seconds must be >= 0 and smaller than chunk_seconds")
+    size = max(int(round(chunk_seconds * sample_rate)), 1)
+    step = max(size - int(round(overlap_seconds * sample_rate)), 1)
+    chunks: List[Chunk] = []
+    start = 0
+    while start < num_samples:
+        end = min(start + size, num_samples)
+        chunks.append(Chunk(start, end, sample_rate))
+        if end >= num_samples:
+            break
+        start += step
+    return chunks
+
+
+def plan_chunks_at_pauses(
+    num_samples: int,
+    pauses: "np.ndarray",
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+    overlap_seconds: float = 0.0,
+    search_seconds: Optional[float] = None,
+) -> List[Chunk]:
+    """Like `plan_chunks`, but end each window in the middle of a pause.
+
+    *pauses* are ``(n, 2)`` sample ranges of silence (see `podkeet.vad`). Each
+    window ends at the pause midpoint closest to ``chunk_seconds`` within the
+    last *search_seconds* (a quarter of the window, at most 60 s); the next
+    window starts right there, since nothing is being said. Where no pause is
+    close enough the window is cut at full length and overlaps the next one
+    by *overlap_seconds*, as in `plan_chunks`.
+    """
+    import numpy as np
+
+    if chunk_seconds <= 0:
+        raise ValueError("chunk_seconds must be > 0")
+    if not 0 <= overlap_seconds < chunk_seconds:
+        raise ValueError("overlap_seconds must be >= 0 and smaller than chunk_seconds")
+    if search_seconds is None:
+        search_seconds = min(chunk_seconds / 4, 60.0)
+    size = max(int(round(chunk_seconds * sample_rate)), 1)
+    search = int(round(search_seconds * sample_rate))
+    overlap = int(round(overlap_seconds * sample_rate))
+    mids = np.sort((np.asarray(pauses, dtype=np.int64).reshape(-1, 2).sum(axis=1)) // 2)
+    chunks: List[Chunk] = []
+    start = 0
+    while start < num_samples:
+        target = start + size
+        if target >= num_samples:
+            chunks.append(Chunk(start, num_samples, sample_rate))
+            break
+        lo = np.searchsorted(mids, max(target - search, start + 1), side="left")
+        hi = np.searchsorted(mids, target, side="right")
+        if hi > lo:
+            cut = int(mids[hi - 1])  # the latest pause before the target
+            chunks.append(Chunk(start, cut, sample_rate))
+            start = cut
+        else:
+            chunks.append(Chunk(start, target, sample_rate))
+            start = max(target - overlap, start + 1)
+    return chunks
+
+
+@dataclass(frozen=True)
+class MemoryModel:
+    """Rough peak-memory estimate for transcribing ``d`` seconds in one pass.
+
+    ``base_mb + linear_mb_per_second * d + quadratic_mb_per_second2 * d**2``.
+    The quadratic term is the encoder's full self-attention over ~12.5
+    frames/s (8 heads, bfloat16), which is what exhausts Metal memory on long
+    episodes; the defaults are calibrated for parakeet-tdt-0.6b.
+    """
+
+    base_mb: float = 1500.0
+    linear_mb_per_second: float = 2.0
+    quadratic_mb_per_second2: float = 0.0025
+
+    def peak_mb(self, seconds: float) -> float:
+        return (
+            self.base_mb
+            + self.linear_mb_per_second * seconds
+            + self.quadratic_mb_per_second2 * seconds * seconds
+        )
+
+    def max_seconds(self, budget_mb: float) -> float:
+        """Longest window whose estimate fits in *budget_mb* (0 if none does)."""
+        a = self.quadratic_mb_per_second2
+        b = self.linear_mb_per_second
+        c = self.base_mb - budget_mb
+        if c >= 0:
+            return 0.0
+        if a == 0:
+            return -c / b if b > 0 else float("inf")
+        return (-b + math.sqrt(b * b - 4 * a * c)) / (2 * a)
+
+
+DEFAULT_MEMORY_MODEL = MemoryModel()
+MIN_CHUNK_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ChunkPlan:
+    """Whether to transcribe in one pass or in windows, decided before inference."""
+
+    mode: str  # "full" | "chunked"
+    duration: float
+    budget_mb: float
+    estimated_peak_mb: float
+    chunk_seconds: Optional[float] = None
+    overlap_seconds: float = 0.0
+    reason: str = ""
+    workers: int = 1  # processes the windows are spread over (see `podkeet.sharding`)
+
+    @property
+    def chunked(self) -> bool:
+        return self.mode == "chunked"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def default_memory_budget_mb() -> float:
+    """Half of physical memory, or 8 GB if it cannot be determined."""
+    try:
+        total = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        return total / (1024 * 1024) / 2
+    except (AttributeError, ValueError, OSError):
+        return 8192.0
+
+
+def plan_transcription(
+    duration: float,
+    memory_budget_mb: Optional[float] = None,
+    *,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    max_chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    min_chunk_seconds: float = MIN_CHUNK_SECONDS,
+    memory_model: MemoryModel = DEFAULT_MEMORY_MODEL,
+) -> ChunkPlan:
+    """Pick full-file vs. chunked transcription for *duration* seconds of audio.
+
+    Full-file is chosen when its estimated peak fits the budget. Otherwise the
+    largest window that fits (capped at *max_chunk_seconds*, rounded down to
+    10 s) is used; if not even *min_chunk_seconds* fits, that minimum is used
+    anyway and the plan says so.
+    """
+    budget = memory_budget_mb if memory_budget_mb is not None else default_memory_budget_mb()
+    full_peak = memory_model.peak_mb(duration)
+    if full_peak <= budget:
+        return ChunkPlan(
+            mode="full",
+            duration=duration,
+            budget_mb=budget,
+            estimated_peak_mb=full_peak,
+            reason="full-file estimate fits the memory budget",
+        )
+
+    fits = memory_model.max_seconds(budget)
+    floor = max(min_chunk_seconds, overlap_seconds + 10.0)
+    chunk = min(fits, max_chunk_seconds)
+    chunk = math.floor(chunk / 10.0) * 10.0
+    if chunk < floor:
+        chunk = floor
+        reason = "no window fits the memory budget; using the minimum window"
+    else:
+        reason = "full-file estimate exceeds the memory budget"
+    return ChunkPlan(
+        mode="chunked",
+        duration=duration,
+        budget_mb=budget,
+        estimated_peak_mb=memory_model.peak_mb(chunk),
+        chunk_seconds=chunk,
+        overlap_seconds=overlap_seconds,
+        reason=reason,
+    )
@@ -1,17 +1,70 @@
 from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from dataclasses import asdict
+from importlib import import_module
 from pathlib import Path
 from time import perf_counter
-import json
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
 
 import typer
-from rich import print as rprint
-from rich.panel import Panel
 
 from . import Outputs, get_version
-from .downloader import download_audio
-from .ffmpeg_utils import is_url, is_video_file, extract_audio_from_video
-from .transcriber import transcribe as run_transcription
+from .cache import TranscriptCache
+from .chunking import ChunkPlan
+from .ffmpeg_utils import (
+    MP3_ENCODE_REALTIME,
+    encode_mp3,
+    extract_audio_from_video,
+    is_url,
+    is_video_file,
+    probe_duration,
+)
+from .tracing import Tracer, span, tracing
+
+if TYPE_CHECKING:
+    from .batch import BatchItem
+    from .downloader import DownloadAttempt, DownloadFailed, DownloadItem
+    from .ledger import JobSpec
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """Stand-in for ``podkeet.<module>.<name>`` that imports the module on first call.
+
+    Keeps ``--version``/``--help`` from loading numpy, asyncio, yt-dlp or the
+    model stack, while the names stay patchable on this module.
+    """
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        return getattr(import_module(f"{__package__}.{module}"), name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    return call
+
+
+collect_sources = _lazy("batch", "collect_sources")
+run_batch = _lazy("batch", "run_batch")
+run_pipeline = _lazy("pipeline", "run_pipeline")
+download_audio = _lazy("downloader", "download_audio")
+download_playlist = _lazy("downloader", "download_playlist")
+video_id = _lazy("downloader", "video_id")
+parse_formats = _lazy("formats", "parse_formats")
+lookup_cached = _lazy("transcriber", "lookup_cached")
+run_transcription = _lazy("transcriber", "transcribe")
+
+
+def rprint(*objects: Any, **kwargs: Any) -> None:
+    from rich import print as rich_print
+
+    rich_print(*objects, **kwargs)
+
+
+def _panel(body: Any, fit: bool = False, **kwargs: Any) -> Any:
+    from rich.panel import Panel
+
+    return Panel.fit(body, **kwargs) if fit else Panel(body, **kwargs)
+
 
 app = typer.Typer(
     add_completion=False,
@@ -20,6 +73,8 @@ app = typer.Typer(
 Download YouTube audio as MP3 and transcribe it with Parakeet-MLX on Apple Silicon.
 """,
 )
+cache_app = typer.Typer(no_args_is_help=True, help="Inspect or trim the transcript cache.")
+app.add_typer(cache_app, name="cache")
 
 
 @app.callback()
@@ -37,7 +92,7 @@ def version_callback(
 
 def _print_version(v: Optional[bool]) -> Optional[bool]:
     if v:
-        rprint(f"podkeet {get_version()}")
+        typer.echo(f"podkeet {get_version()}")
         raise typer.Exit(0)
     return None
 
@@ -58,21 +113,288 @@ def _fmt_duration(seconds: float) -> str:
     return f"{s}.{ms:03d}s"
 
 
+def _out_paths(result: Any) -> List[Path]:
+    paths = getattr(result, "out_paths", None)
+    return list(paths) if isinstance(paths, list) and paths else [result.out_path]
+
+
+def _check_formats(out_format: str) -> None:
+    try:
+        parse_formats(out_format)
+    except ValueError as e:
+        rprint(_panel(str(e), border_style="red"))
+        raise typer.Exit(2)
+
+
+def _check_audio_format(audio_format: str) -> Optional[str]:
+    """Validate ``--audio-format``; returns the yt-dlp codec (None = keep native)."""
+    from .downloader import AUDIO_FORMATS
+
+    if audio_format not in AUDIO_FORMATS:
+        choices = "|".join(AUDIO_FORMATS)
+        rprint(
+            _panel(f"Unknown audio format {audio_format!r} (choose {choices})", border_style="red")
+        )
+        raise typer.Exit(2)
+    return None if audio_format == "native" else audio_format
+
+
+def _report_download_failure(err: DownloadFailed, source: str, as_json: bool) -> None:
+    attempts = [asdict(a) for a in err.attempts]
+    if as_json:
+        summary = {
+            "status": "error",
+            "source": source,
+            "error": str(err),
+            "reason": err.reason,
+            "retryable": err.retryable,
+            "download_attempts": attempts,
+        }
+        print(json.dumps(summary, ensure_ascii=False))
+        return
+    kind = "gave up after retries" if err.retryable else "permanent error, not retried"
+    details = [f"Download failed: {err.reason} ({kind})", ""]
+    for a in err.attempts:
+        details.append(f"#{a.attempt} {_fmt_duration(a.seconds)} {a.error}")
+    rprint(_panel("\n".join(details), border_style="red"))
+
+
+@contextmanager
+def _traced(path: Optional[Path]) -> Iterator[Tracer]:
+    """Trace the enclosed stages; with *path*, write a Chrome trace there on the way out."""
+    with tracing() as tracer:
+        try:
+            yield tracer
+        finally:
+            if path is not None:
+                tracer.write(path)
+
+
+def _index_outputs(paths: List[Any]) -> None:
+    """Add new JSON transcripts to the search index, if ``podkeet index`` created one."""
+    from .search import index_outputs
+
+    try:
+        index_outputs(Path(p) for p in paths)
+    except Exception as e:  # the transcript is written; a stale index is not fatal
+        import logging
+
+        logging.getLogger(__name__).warning("Could not update the search index: %s", e)
+
+
+def _report_transcription(
+    result: Any,
+    *,
+    source: str,
+    audio_path: Optional[Path],
+    model: str,
+    language: str,
+    device: str,
+    out_format: str,
+    transcribe_elapsed: float,
+    download_elapsed: Optional[float] = None,
+    extract_elapsed: Optional[float] = None,
+    transcode_elapsed: Optional[float] = None,
+    transcode_saved_estimate: Optional[float] = None,
+    download_attempts: Optional[List[DownloadAttempt]] = None,
+    tracer: Optional[Tracer] = None,
+    trace_path: Optional[Path] = None,
+    no_timing: bool = False,
+) -> None:
+    """Print the JSON summary (``--format json``) or the human-readable panel."""
+    plan = result.plan if isinstance(getattr(result, "plan", None), ChunkPlan) else None
+    cached = getattr(result, "cached", False) is True
+    vad = getattr(result, "vad", None)
+    vad = vad if isinstance(vad, dict) else None
+
+    # If requesting JSON transcript format, print a JSON summary for automation
+    if "json" in parse_formats(out_format):
+        summary = {
+            "status": "ok",
+            "transcript_path": str(result.out_path),
+            "transcript_paths": [str(p) for p in _out_paths(result)],
+            "audio_path": str(audio_path) if audio_path is not None else None,
+            "source": source,
+            "model": model,
+            "language": language,
+            "device": device,
+            "cached": cached,
+            "transcribe_seconds": transcribe_elapsed,
+        }
+        if download_elapsed is not None:
+            summary["download_seconds"] = download_elapsed
+        if download_attempts:
+            summary["download_attempts"] = [asdict(a) for a in download_attempts]
+        if extract_elapsed is not None:
+            summary["extract_seconds"] = extract_elapsed
+        if transcode_elapsed is not None:
+            summary["transcode_seconds"] = transcode_elapsed
+        if transcode_saved_estimate is not None:
+            summary["transcode_seconds_saved_estimate"] = transcode_saved_estimate
+        if plan is not None:
+            summary["plan"] = plan.as_dict()
+        if vad is not None:
+            summary["vad"] = vad
+        if tracer is not None:
+            summary["profile"] = tracer.as_dict()
+        if trace_path is not None:
+            summary["trace_path"] = str(trace_path)
+        # Emit compact JSON to stdout (avoid Rich panel for automation)
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        details = [f"Transcript saved to {p}" for p in _out_paths(result)]
+        if cached:
+            details.append("Served from the transcript cache")
+        if plan is not None and plan.workers > 1:
+            details.append(
+                f"Sharded in {plan.chunk_seconds:.0f}s windows across {plan.workers} workers"
+            )
+        elif plan is not None and plan.chunked:
+            details.append(f"Chunked in {plan.chunk_seconds:.0f}s windows to fit memory")
+        if vad is not None and vad["removed_seconds"] > 0:
+            details.append(
+                f"Skipped {_fmt_duration(vad['removed_seconds'])} of silence "
+                f"({vad['speech_seconds'] / max(vad['total_seconds'], 1e-9):.0%} speech)"
+            )
+        if not no_timing:
+            details += [""]
+            if download_elapsed is not None:
+                details.append(f"⏬  Download:   {_fmt_duration(download_elapsed)}")
+            if extract_elapsed is not None:
+                details.append(f"🎬  Extract:    {_fmt_duration(extract_elapsed)}")
+            if transcode_elapsed is not None:
+                details.append(f"🎵  MP3 encode: {_fmt_duration(transcode_elapsed)}")
+            if transcode_saved_estimate is not None:
+                details.append(
+                    f"⚡  Skipped MP3 transcode (est. ~{_fmt_duration(transcode_saved_estimate)} "
+                    f"at {MP3_ENCODE_REALTIME:.0f}x realtime)"
+                )
+            details.append(f"⏱️  Transcribe: {_fmt_duration(transcribe_elapsed)}")
+        if trace_path is not None:
+            details.append(f"Trace saved to {trace_path}")
+        rprint(
+            _panel(
+                "\n".join(details), fit=True, title="Transcription complete", border_style="green"
+            )
+        )
+
+
 @app.command()
 def download(
     url: str = typer.Argument(..., help="YouTube video URL"),
     out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Output directory for MP3"),
+    audio_format: str = typer.Option(
+        "mp3",
+        "--audio-format",
+        help="mp3, or 'native' to keep the downloaded stream (opus/m4a) without re-encoding",
+    ),
     no_timing: bool = typer.Option(False, "--no-timing", help="Hide timing lines in output panel"),
 ):
     """Download audio as MP3 from a YouTube URL."""
+    from .downloader import DownloadFailed
+
+    codec = _check_audio_format(audio_format)
     outputs = Outputs(out_dir)
     t0 = perf_counter()
-    mp3_path = download_audio(url, outputs.base)
+    try:
+        audio_path = download_audio(url, outputs.base, codec=codec)
+    except DownloadFailed as e:
+        _report_download_failure(e, url, as_json=False)
+        raise typer.Exit(1)
     elapsed = perf_counter() - t0
-    body_lines = [f"Saved MP3 to {mp3_path}"]
+    body_lines = [f"Saved {'MP3' if codec else 'audio'} to {audio_path}"]
     if not no_timing:
         body_lines += ["", f"⏱️  {_fmt_duration(elapsed)}"]
-    rprint(Panel.fit("\n".join(body_lines), title="Download complete", border_style="green"))
+    rprint(_panel("\n".join(body_lines), fit=True, title="Download complete", border_style="green"))
+
+
+@app.command("download-playlist")
+def download_playlist_cmd(
+    url: str = typer.Argument(..., help="Playlist or channel URL"),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Output directory for MP3s"),
+    workers: int = typer.Option(4, "--workers", min=1, help="Concurrent downloads"),
+    archive: Optional[Path] = typer.Option(
+        None,
+        "--archive",
+        help="Download archive; entries listed there are skipped (default: OUT_DIR/archive.txt)",
+    ),
+    no_archive: bool = typer.Option(
+        False, "--no-archive", help="Download everything, ignoring and not updating the archive"
+    ),
+    limit: Optional[int] = typer.Option(None, "--limit", min=1, help="Only the first N entries"),
+    audio_format: str = typer.Option(
+        "mp3",
+        "--audio-format",
+        help="mp3, or 'native' to keep the downloaded streams (opus/m4a) without re-encoding",
+    ),
+    summary_path: Optional[Path] = typer.Option(
+        None,
+        "--summary",
+        help="Where to write the summary JSON (default: OUT_DIR/download-summary.json)",
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Print the summary JSON to stdout"),
+    no_timing: bool = typer.Option(False, "--no-timing", help="Hide timing lines in output"),
+):
+    """Download every video of a playlist or channel as MP3, several at a time."""
+    codec = _check_audio_format(audio_format)
+    outputs = Outputs(out_dir)
+
+    def on_item(item: DownloadItem) -> None:
+        if as_json:
+            return
+        label = item.title or item.id
+        if item.status == "ok":
+            line = f"[green]✓[/green] {label} → {item.path}"
+            if not no_timing:
+                line += f"  ({_fmt_duration(item.seconds)})"
+        elif item.status == "skipped":
+            line = f"[dim]↷ {label} (in archive)[/dim]"
+        else:
+            line = f"[red]✗[/red] {label}: {item.error}"
+        rprint(line)
+
+    summary = download_playlist(
+        url,
+        outputs.base,
+        workers=workers,
+        archive=None if no_archive else (archive or outputs.base / "archive.txt"),
+        limit=limit,
+        codec=codec,
+        on_item=on_item,
+    )
+    summary_dict = summary.as_dict()
+    summary_file = summary_path or (outputs.base / "download-summary.json")
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    summary_file.write_text(
+        json.dumps(summary_dict, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+
+    if as_json:
+        print(json.dumps(summary_dict, ensure_ascii=False))
+    else:
+        details = [
+            f"Downloaded {summary.downloaded}/{len(summary.items)} entries",
+            f"Summary saved to {summary_file}",
+        ]
+        if summary.skipped:
+            details.append(f"Skipped (archive): {summary.skipped}")
+        if summary.failed:
+            details.append(f"Failed: {summary.failed}")
+        if not no_timing:
+            details += [
+                "",
+                f"🔎  Listing:    {_fmt_duration(summary.expand_seconds)}",
+                f"⏱️  Total:      {_fmt_duration(summary.total_seconds)}",
+                f"🚀  Throughput: {summary.items_per_minute:.1f} items/min, "
+                f"{summary.bytes_per_second / 1e6:.1f} MB/s",
+            ]
+        border = "green" if summary.failed == 0 else "yellow"
+        rprint(
+            _panel("\n".join(details), fit=True, title="Playlist downloaded", border_style=border)
+        )
+
+    if summary.failed:
+        raise typer.Exit(1)
 
 
 @app.command("transcribe")
@@ -80,7 +402,12 @@ def transcribe(
     source: str = typer.Argument(..., help="YouTube URL or local audio/video file (.mp3, .mp4, …)"),
     out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Where to store outputs"),
     keep_audio: bool = typer.Option(
-        False, "--keep-audio", help="Keep downloaded MP3 when using URL"
+        False, "--keep-audio", help="Keep the downloaded audio when using URL"
+    ),
+    audio_format: str = typer.Option(
+        "mp3",
+        "--audio-format",
+        help="Format of kept audio: mp3, or 'native' (the downloaded opus/m4a, no re-encode)",
     ),
     language: str = typer.Option("auto", "--language", help="Language code or 'auto'"),
     model: str = typer.Option(
@@ -88,84 +415,858 @@ def transcribe(
         "--model",
         help="Parakeet-MLX model repo (Hugging Face)",
     ),
-    format: str = typer.Option("txt", "--format", help="Output format: txt|srt|vtt|json"),
+    format: str = typer.Option(
+        "txt",
+        "--format",
+        help="Output format(s): txt|srt|vtt|json|jsonl, comma-separated (e.g. srt,vtt) or 'all'",
+    ),
     device: str = typer.Option("auto", "--device", help="auto|mps|cpu"),
+    pcm: bool = typer.Option(
+        False,
+        "--pcm",
+        help="Decode straight to 16 kHz PCM in one ffmpeg pass (no intermediate MP3)",
+    ),
+    chunk_seconds: Optional[float] = typer.Option(
+        None,
+        "--chunk-seconds",
+        min=1.0,
+        help="Transcribe in windows of this many seconds (lower peak memory)",
+    ),
+    overlap_seconds: float = typer.Option(
+        15.0,
+        "--overlap-seconds",
+        min=0.0,
+        help="Audio shared by consecutive windows; seam words are kept once",
+    ),
+    memory_budget: Optional[float] = typer.Option(
+        None,
+        "--memory-budget",
+        min=1.0,
+        help="Memory budget in MB for choosing full-file vs. chunked (default: half of RAM)",
+    ),
+    highlight_words: bool = typer.Option(
+        False,
+        "--highlight-words",
+        help="Word-level SRT/VTT: one cue per word with the current word highlighted",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Reuse windows an interrupted chunked run already finished (checkpointed per chunk)",
+    ),
+    vad: bool = typer.Option(
+        False,
+        "--vad",
+        help="Cut silences longer than a second before inference and chunk at pauses",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        min=1,
+        help="Transcribe windows of one file in this many processes, each loading the model",
+    ),
+    worker_memory: Optional[float] = typer.Option(
+        None,
+        "--worker-memory",
+        min=1.0,
+        help="Memory budget in MB per worker process (default: --memory-budget / --workers)",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Always run the model; don't read or write the transcript cache"
+    ),
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        help="Write a Chrome trace-event JSON of every stage (chrome://tracing, ui.perfetto.dev)",
+    ),
     no_timing: bool = typer.Option(False, "--no-timing", help="Hide timing lines in output panel"),
 ):
     """Transcribe from URL or local audio/video file."""
+    _check_formats(format)
+    from .checkpoints import CheckpointStore
+    from .downloader import DownloadFailed
+
+    keep_codec = _check_audio_format(audio_format)
     outputs = Outputs(out_dir)
+    cache = None if no_cache else TranscriptCache()
 
-    download_elapsed: Optional[float] = None
-    extract_elapsed: Optional[float] = None
-    extracted_audio: Optional[Path] = None
-    if is_url(source):
-        dt0 = perf_counter()
-        mp3_path = download_audio(source, outputs.base)
-        download_elapsed = perf_counter() - dt0
-    else:
-        local_path = Path(source)
-        if not local_path.exists():
-            rprint(Panel(f"File not found: {local_path}", border_style="red"))
-            raise typer.Exit(2)
-        if is_video_file(local_path):
-            et0 = perf_counter()
-            mp3_path = extract_audio_from_video(local_path, outputs.base)
-            extract_elapsed = perf_counter() - et0
-            extracted_audio = mp3_path
+    with _traced(trace) as tracer:
+        download_elapsed: Optional[float] = None
+        extract_elapsed: Optional[float] = None
+        extracted_audio: Optional[Path] = None
+        download_attempts: List[DownloadAttempt] = []
+        cache_id: Optional[str] = None
+        if is_url(source) and cache is not None:
+            cache_id = video_id(source)
+            if cache_id is not None:
+                tt0 = perf_counter()
+                with span("cache.lookup", cache_id=cache_id):
+                    hit = lookup_cached(
+                        cache,
+                        cache_id,
+                        outputs.base,
+                        model_name=model,
+                        out_format=format,
+                        chunk_seconds=chunk_seconds,
+                        overlap_seconds=overlap_seconds,
+                        highlight_words=highlight_words,
+                        vad=vad,
+                        workers=workers,
+                    )
+                if hit is not None:
+                    _report_transcription(
+                        hit,
+                        source=source,
+                        audio_path=None,
+                        model=model,
+                        language=language,
+                        device=device,
+                        out_format=format,
+                        transcribe_elapsed=perf_counter() - tt0,
+                        tracer=tracer,
+                        trace_path=trace,
+                        no_timing=no_timing,
+                    )
+                    return
+
+        if is_url(source):
+            # Keep the native stream; ffmpeg decodes it directly, so no MP3 round-trip
+            dt0 = perf_counter()
+            try:
+                audio_path = download_audio(
+                    source, outputs.base, codec=None, attempts=download_attempts
+                )
+            except DownloadFailed as e:
+                _report_download_failure(e, source, as_json="json" in parse_formats(format))
+                raise typer.Exit(1)
+            download_elapsed = perf_counter() - dt0
+        else:
+            local_path = Path(source)
+            if not local_path.exists():
+                rprint(_panel(f"File not found: {local_path}", border_style="red"))
+                raise typer.Exit(2)
+            if is_video_file(local_path) and not pcm:
+                et0 = perf_counter()
+                audio_path = extract_audio_from_video(local_path, outputs.base)
+                extract_elapsed = perf_counter() - et0
+                extracted_audio = audio_path
+            else:
+                audio_path = local_path
+
+        tt0 = perf_counter()
+        with span("transcribe", source=source):
+            result = run_transcription(
+                audio_path,
+                model_name=model,
+                language=language,
+                device=device,
+                out_format=format,
+                out_dir=outputs.base,
+                pcm=pcm,
+                chunk_seconds=chunk_seconds,
+                overlap_seconds=overlap_seconds,
+                memory_budget_mb=memory_budget,
+                cache=cache,
+                cache_id=cache_id,
+                highlight_words=highlight_words,
+                checkpoints=CheckpointStore(),
+                resume=resume,
+                vad=vad,
+                workers=workers,
+                worker_memory_mb=worker_memory,
+            )
+        transcribe_elapsed = perf_counter() - tt0
+
+        transcode_elapsed: Optional[float] = None
+        transcode_saved_estimate: Optional[float] = None
+        if download_elapsed is not None:
+            if keep_audio and keep_codec and audio_path.suffix.lower() != ".mp3":
+                ct0 = perf_counter()
+                native_path = audio_path
+                audio_path = encode_mp3(native_path, native_path.with_suffix(".mp3"))
+                native_path.unlink(missing_ok=True)
+                transcode_elapsed = perf_counter() - ct0
+            else:
+                plan = getattr(result, "plan", None)
+                seconds = (
+                    plan.duration if isinstance(plan, ChunkPlan) else probe_duration(audio_path)
+                )
+                transcode_saved_estimate = seconds / MP3_ENCODE_REALTIME
+
+        _report_transcription(
+            result,
+            source=source,
+            audio_path=audio_path,
+            model=model,
+            language=language,
+            device=device,
+            out_format=format,
+            transcribe_elapsed=transcribe_elapsed,
+            download_elapsed=download_elapsed,
+            extract_elapsed=extract_elapsed,
+            transcode_elapsed=transcode_elapsed,
+            transcode_saved_estimate=transcode_saved_estimate,
+            download_attempts=download_attempts,
+            tracer=tracer,
+            trace_path=trace,
+            no_timing=no_timing,
+        )
+        _index_outputs(_out_paths(result))
+
+        if is_url(source) and not keep_audio:
+            try:
+                audio_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+        if extracted_audio is not None and not keep_audio:
+            try:
+                extracted_audio.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+
+@app.command("transcribe-many")
+def transcribe_many(
+    sources: Optional[List[str]] = typer.Argument(
+        None, help="Files, globs, directories or URLs to transcribe in order"
+    ),
+    manifest: Optional[Path] = typer.Option(
+        None, "--manifest", help="Text file with one URL or path per line ('#' comments allowed)"
+    ),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Where to store outputs"),
+    keep_audio: bool = typer.Option(
+        False, "--keep-audio", help="Keep downloaded/extracted audio files"
+    ),
+    audio_format: str = typer.Option(
+        "mp3",
+        "--audio-format",
+        help="Format of kept downloads: mp3, or 'native' (the downloaded opus/m4a, no re-encode)",
+    ),
+    language: str = typer.Option("auto", "--language", help="Language code or 'auto'"),
+    model: str = typer.Option(
+        "mlx-community/parakeet-tdt-0.6b-v2",
+        "--model",
+        help="Parakeet-MLX model repo (Hugging Face)",
+    ),
+    format: str = typer.Option(
+        "txt",
+        "--format",
+        help="Output format(s): txt|srt|vtt|json|jsonl, comma-separated (e.g. srt,vtt) or 'all'",
+    ),
+    device: str = typer.Option("auto", "--device", help="auto|mps|cpu"),
+    pcm: bool = typer.Option(
+        False,
+        "--pcm",
+        help="Decode straight to 16 kHz PCM in one ffmpeg pass (no intermediate MP3)",
+    ),
+    chunk_seconds: Optional[float] = typer.Option(
+        None,
+        "--chunk-seconds",
+        min=1.0,
+        help="Transcribe in windows of this many seconds (lower peak memory)",
+    ),
+    overlap_seconds: float = typer.Option(
+        15.0,
+        "--overlap-seconds",
+        min=0.0,
+        help="Audio shared by consecutive windows; seam words are kept once",
+    ),
+    memory_budget: Optional[float] = typer.Option(
+        None,
+        "--memory-budget",
+        min=1.0,
+        help="Memory budget in MB for choosing full-file vs. chunked (default: half of RAM)",
+    ),
+    highlight_words: bool = typer.Option(
+        False,
+        "--highlight-words",
+        help="Word-level SRT/VTT: one cue per word with the current word highlighted",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Reuse windows an interrupted chunked run already finished (checkpointed per chunk)",
+    ),
+    vad: bool = typer.Option(
+        False,
+        "--vad",
+        help="Cut silences longer than a second before inference and chunk at pauses",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        min=1,
+        help="Transcribe windows of each file in this many processes, each loading the model",
+    ),
+    worker_memory: Optional[float] = typer.Option(
+        None,
+        "--worker-memory",
+        min=1.0,
+        help="Memory budget in MB per worker process (default: --memory-budget / --workers)",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Always run the model; don't read or write the transcript cache"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Also re-run sources the job ledger records as done"
+    ),
+    retry_failed: bool = typer.Option(
+        False, "--retry-failed", help="Also queue every source whose last job failed"
+    ),
+    no_ledger: bool = typer.Option(False, "--no-ledger", help="Don't read or write the job ledger"),
+    summary_path: Optional[Path] = typer.Option(
+        None, "--summary", help="Where to write the summary JSON (default: OUT_DIR/summary.json)"
+    ),
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        help="Write a Chrome trace-event JSON of every stage (chrome://tracing, ui.perfetto.dev)",
+    ),
+    prefetch: int = typer.Option(
+        2,
+        "--prefetch",
+        min=0,
+        help="Items to download/extract ahead of the model (0 = strictly sequential)",
+    ),
+    download_workers: int = typer.Option(
+        2, "--download-workers", min=1, help="Concurrent downloads when prefetching"
+    ),
+    extract_workers: int = typer.Option(
+        2, "--extract-workers", min=0, help="ffmpeg extraction processes when prefetching"
+    ),
+    no_timing: bool = typer.Option(False, "--no-timing", help="Hide timing lines in output"),
+):
+    """Transcribe many sources in one process, loading the model only once."""
+    from .checkpoints import CheckpointStore
+    from .ledger import Ledger, job_options
+
+    ledger = None if no_ledger else Ledger()
+    queue = collect_sources(sources or [], manifest)
+    if retry_failed and ledger is not None:
+        queue = list(dict.fromkeys(queue + ledger.failed_sources()))
+    if not queue:
+        rprint(_panel("No sources to transcribe", border_style="red"))
+        raise typer.Exit(2)
+
+    _check_formats(format)
+    _check_audio_format(audio_format)
+    outputs = Outputs(out_dir)
+    as_json = "json" in parse_formats(format)
+
+    specs: Dict[str, JobSpec] = {}
+
+    def on_item(idx: int, item: BatchItem) -> None:
+        spec = specs.get(item.source)
+        if ledger is not None and spec is not None:
+            ledger.record(spec, item, command="transcribe-many")
+        if item.status == "ok":
+            _index_outputs(item.transcript_paths or [item.transcript_path])
+        if as_json:
+            return
+        prefix = f"[{idx + 1}/{len(queue)}]"
+        if item.status == "ok":
+            line = f"{prefix} [green]✓[/green] {item.source} → {item.transcript_path}"
+            if not no_timing:
+                line += f"  ({_fmt_duration(item.total_seconds)}, {item.throughput:.1f}x)"
         else:
-            mp3_path = local_path
+            line = f"{prefix} [red]✗[/red] {item.source}: {item.error}"
+        rprint(line)
 
-    tt0 = perf_counter()
-    result = run_transcription(
-        mp3_path,
+    options = dict(
         model_name=model,
         language=language,
         device=device,
         out_format=format,
-        out_dir=outputs.base,
+        keep_audio=keep_audio,
+        audio_format=audio_format,
+        pcm=pcm,
+        chunk_seconds=chunk_seconds,
+        overlap_seconds=overlap_seconds,
+        memory_budget_mb=memory_budget,
+        cache=None if no_cache else TranscriptCache(),
+        highlight_words=highlight_words,
+        checkpoints=CheckpointStore(),
+        resume=resume,
+        vad=vad,
+        workers=workers,
+        worker_memory_mb=worker_memory,
+        on_item=on_item,
     )
-    transcribe_elapsed = perf_counter() - tt0
+    if ledger is not None:
+        jobs_ledger = ledger
+        key_options = job_options(outputs.base, options)
 
-    # If requesting JSON transcript format, print a JSON summary for automation
-    if format.lower() == "json":
-        summary = {
-            "status": "ok",
-            "transcript_path": str(result.out_path),
-            "audio_path": str(mp3_path),
-            "source": source,
-            "model": model,
-            "language": language,
-            "device": device,
-            "transcribe_seconds": transcribe_elapsed,
-        }
-        if download_elapsed is not None:
-            summary["download_seconds"] = download_elapsed
-        if extract_elapsed is not None:
-            summary["extract_seconds"] = extract_elapsed
-        # Emit compact JSON to stdout (avoid Rich panel for automation)
-        print(json.dumps(summary, ensure_ascii=False))
+        def skip(source: str) -> bool:
+            """Fingerprint *source* as it comes up; True if its job is already done."""
+            specs[source] = jobs_ledger.spec(source, model, key_options)
+            return not force and jobs_ledger.is_done(specs[source])
+
+        options["skip"] = skip
+    with _traced(trace) as tracer:
+        if prefetch > 0:
+            summary = run_pipeline(
+                queue,
+                outputs.base,
+                prefetch=prefetch,
+                download_workers=download_workers,
+                extract_workers=extract_workers,
+                **options,
+            )
+        else:
+            summary = run_batch(queue, outputs.base, **options)
+
+    if ledger is not None:
+        ledger.close()
+    if not summary.items:
+        if as_json:
+            print(json.dumps({"status": "ok", "count": 0, "skipped": summary.skipped}))
+        else:
+            rprint(
+                _panel(
+                    f"Nothing to do: all {len(summary.skipped)} sources are already transcribed "
+                    "(--force to redo)",
+                    fit=True,
+                    border_style="green",
+                )
+            )
+        return
+
+    summary_dict = summary.as_dict()
+    summary_dict["profile"] = tracer.as_dict()
+    if trace is not None:
+        summary_dict["trace_path"] = str(trace)
+    summary_file = summary_path or (outputs.base / "summary.json")
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    summary_file.write_text(
+        json.dumps(summary_dict, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+
+    if as_json:
+        print(json.dumps(summary_dict, ensure_ascii=False))
     else:
-        details = [f"Transcript saved to {result.out_path}"]
+        details = [
+            f"Transcribed {summary.succeeded}/{len(summary.items)} sources",
+            f"Summary saved to {summary_file}",
+        ]
+        if summary.failed:
+            details.append(f"Failed: {summary.failed}")
+        if summary.skipped:
+            details.append(f"Skipped {len(summary.skipped)} already transcribed (--force to redo)")
+        if trace is not None:
+            details.append(f"Trace saved to {trace}")
         if not no_timing:
-            details += [""]
-            if download_elapsed is not None:
-                details.append(f"⏬  Download:   {_fmt_duration(download_elapsed)}")
-            if extract_elapsed is not None:
-                details.append(f"🎬  Extract:    {_fmt_duration(extract_elapsed)}")
-            details.append(f"⏱️  Transcribe: {_fmt_duration(transcribe_elapsed)}")
-        rprint(Panel.fit("\n".join(details), title="Transcription complete", border_style="green"))
+            details.append("")
+            if summary.model_load_seconds:  # sharded runs load it in the workers
+                details.append(f"🧠  Model load: {_fmt_duration(summary.model_load_seconds)}")
+            details += [
+                f"⏱️  Total:      {_fmt_duration(summary.total_seconds)}",
+                f"🚀  Throughput: {summary.throughput:.1f}x realtime",
+            ]
+            stages = summary.stages
+            if stages:
+                details.append("")
+                for name in ("download", "extract", "model"):
+                    st = stages[name]
+                    if st["items"]:
+                        details.append(
+                            f"{name:<9} {st['utilization']:>5.0%} busy over {st['items']} items"
+                        )
+                details.append(
+                    f"queue depth max {stages['queue_depth_max']}, "
+                    f"model waited {_fmt_duration(stages['model_wait_seconds'])}"
+                )
+                if stages["bottleneck"]:
+                    details.append(f"bottleneck: {stages['bottleneck']}")
+        border = "green" if summary.failed == 0 else "yellow"
+        rprint(_panel("\n".join(details), fit=True, title="Batch complete", border_style=border))
 
-    if is_url(source) and not keep_audio:
-        try:
-            mp3_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+    if summary.failed:
+        raise typer.Exit(1)
 
-    if extracted_audio is not None and not keep_audio:
-        try:
-            extracted_audio.unlink(missing_ok=True)
-        except Exception:
-            pass
+
+@app.command("watch")
+def watch(
+    directory: Path = typer.Argument(..., help="Folder that new recordings are dropped into"),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Where to store outputs"),
+    model: str = typer.Option(
+        "mlx-community/parakeet-tdt-0.6b-v2",
+        "--model",
+        help="Parakeet-MLX model repo (Hugging Face)",
+    ),
+    format: str = typer.Option(
+        "txt",
+        "--format",
+        help="Output format(s): txt|srt|vtt|json|jsonl, comma-separated (e.g. srt,vtt) or 'all'",
+    ),
+    pcm: bool = typer.Option(
+        False,
+        "--pcm",
+        help="Decode straight to 16 kHz PCM in one ffmpeg pass (no intermediate MP3)",
+    ),
+    chunk_seconds: Optional[float] = typer.Option(
+        None,
+        "--chunk-seconds",
+        min=1.0,
+        help="Transcribe in windows of this many seconds (lower peak memory)",
+    ),
+    memory_budget: Optional[float] = typer.Option(
+        None,
+        "--memory-budget",
+        min=1.0,
+        help="Memory budget in MB for choosing full-file vs. chunked (default: half of RAM)",
+    ),
+    vad: bool = typer.Option(
+        False,
+        "--vad",
+        help="Cut silences longer than a second before inference and chunk at pauses",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Always run the model; don't read or write the transcript cache"
+    ),
+    recursive: bool = typer.Option(False, "--recursive", help="Also watch subfolders"),
+    poll_seconds: float = typer.Option(
+        2.0, "--poll-seconds", min=0.1, help="How often to look for new files"
+    ),
+    settle_seconds: float = typer.Option(
+        5.0,
+        "--settle-seconds",
+        min=0.0,
+        help="A file is picked up once its size has not changed for this long",
+    ),
+    max_attempts: int = typer.Option(
+        3, "--max-attempts", min=1, help="Give up on a file after it failed this many times"
+    ),
+    once: bool = typer.Option(
+        False, "--once", help="Transcribe what is in the folder now, then exit"
+    ),
+):
+    """Transcribe new recordings in a folder as they arrive, keeping the model loaded."""
+    import logging
+
+    from .ledger import Ledger
+    from .watch import DirectoryWatcher
+
+    if not directory.is_dir():
+        rprint(_panel(f"Not a directory: {directory}", border_style="red"))
+        raise typer.Exit(2)
+    _check_formats(format)
+    outputs = Outputs(out_dir)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    ledger = Ledger()
+    watcher = DirectoryWatcher(
+        directory,
+        outputs.base,
+        ledger,
+        model_name=model,
+        settle_seconds=settle_seconds,
+        recursive=recursive,
+        max_attempts=max_attempts,
+        out_format=format,
+        pcm=pcm,
+        chunk_seconds=chunk_seconds,
+        memory_budget_mb=memory_budget,
+        cache=None if no_cache else TranscriptCache(),
+        vad=vad,
+    )
+
+    def on_item(item: BatchItem) -> None:
+        if item.status == "ok":
+            _index_outputs(item.transcript_paths or [item.transcript_path])
+            rprint(f"[green]✓[/green] {item.source} → {item.transcript_path}")
+        else:
+            rprint(f"[red]✗[/red] {item.source}: {item.error}")
+
+    rprint(
+        _panel(
+            f"Loading {model} and watching {directory} (Ctrl-C to stop)",
+            fit=True,
+            title="podkeet watch",
+            border_style="cyan",
+        )
+    )
+    try:
+        watcher.run(poll_seconds=poll_seconds, once=once, on_item=on_item)
+    except KeyboardInterrupt:
+        rprint("[yellow]Stopped[/yellow]")
+    finally:
+        ledger.close()
+
+
+@app.command("serve")
+def serve(
+    host: str = typer.Option(
+        "127.0.0.1", "--host", help="Interface to bind (localhost only by default)"
+    ),
+    port: int = typer.Option(8765, "--port", min=0, help="Port to listen on"),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Where to store job outputs"),
+    model: str = typer.Option(
+        "mlx-community/parakeet-tdt-0.6b-v2",
+        "--model",
+        help="Parakeet-MLX model repo (Hugging Face)",
+    ),
+    format: str = typer.Option(
+        "all",
+        "--format",
+        help="Default format(s) for jobs that don't name any: txt|srt|vtt|json|jsonl|all",
+    ),
+    max_queue: int = typer.Option(
+        16, "--max-queue", min=1, help="Jobs waiting beyond this are rejected with 503"
+    ),
+    concurrency: int = typer.Option(
+        2,
+        "--concurrency",
+        min=1,
+        help="Jobs downloaded/extracted at once (the model still runs one at a time)",
+    ),
+    chunk_seconds: Optional[float] = typer.Option(
+        None,
+        "--chunk-seconds",
+        min=1.0,
+        help="Transcribe in windows of this many seconds (lower peak memory)",
+    ),
+    memory_budget: Optional[float] = typer.Option(
+        None,
+        "--memory-budget",
+        min=1.0,
+        help="Memory budget in MB for choosing full-file vs. chunked (default: half of RAM)",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Always run the model; don't read or write the transcript cache"
+    ),
+    source_dirs: Optional[List[Path]] = typer.Option(
+        None,
+        "--source-dir",
+        help="Folder jobs may name local files in (repeatable; default: URLs and uploads only)",
+    ),
+):
+    """Serve transcription jobs over HTTP with the model kept loaded."""
+    import asyncio
+
+    from .server import TranscriptionServer
+
+    _check_formats(format)
+    outputs = Outputs(out_dir)
+    server = TranscriptionServer(
+        outputs.base / "jobs",
+        model_name=model,
+        out_format=format,
+        max_queue=max_queue,
+        concurrency=concurrency,
+        chunk_seconds=chunk_seconds,
+        memory_budget_mb=memory_budget,
+        cache=None if no_cache else TranscriptCache(),
+        source_dirs=source_dirs or [],
+    )
+    rprint(
+        _panel(
+            f"Loading {model} and listening on http://{host}:{port}\n"
+            "POST /jobs · GET /jobs/{id} · GET /jobs/{id}/result?format=srt · "
+            "GET /health · GET /metrics",
+            fit=True,
+            title="podkeet serve",
+            border_style="cyan",
+        )
+    )
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        rprint("[yellow]Stopped[/yellow]")
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+@app.command("jobs")
+def jobs(
+    days: float = typer.Option(
+        30.0, "--days", min=0.0, help="Only jobs finished in the last N days (0 = all)"
+    ),
+    by: str = typer.Option("day", "--by", help="Group by day|week|month"),
+    failed: bool = typer.Option(False, "--failed", help="Also list sources whose last job failed"),
+    as_json: bool = typer.Option(False, "--json", help="Print stats as JSON"),
+):
+    """Report throughput and failures over time from the job ledger."""
+    import time
+
+    from .ledger import PERIODS, Ledger
+
+    if by not in PERIODS:
+        rprint(_panel(f"--by must be one of: {', '.join(PERIODS)}", border_style="red"))
+        raise typer.Exit(2)
+    ledger = Ledger()
+    stats = ledger.stats(time.time() - days * 86400 if days else 0.0, by)
+    stats["path"] = str(ledger.path)
+    if failed:
+        stats["failed_sources"] = ledger.failed_sources()
+    ledger.close()
+    if as_json:
+        print(json.dumps(stats, ensure_ascii=False))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=f"Jobs per {by} ({stats['path']})", title_justify="left")
+    for column in ("", "jobs", "ok", "failed", "failure rate", "audio", "busy", "throughput"):
+        table.add_column(column, justify="left" if not column else "right")
+    rows = [(p["period"], p) for p in stats["periods"]]
+    for label, p in rows + [("total", stats["total"])]:
+        table.add_row(
+            label,
+            str(p["jobs"]),
+            str(p["ok"]),
+            str(p["failed"]),
+            f"{p['failure_rate']:.0%}",
+            _fmt_duration(p["audio_seconds"]),
+            _fmt_duration(p["busy_seconds"]),
+            f"{p['throughput']:.1f}x",
+            end_section=label == rows[-1][0] if rows else False,
+        )
+    rprint(table)
+    if stats["errors"]:
+        lines = []
+        for e in stats["errors"]:
+            first_line = (e["error"] or "unknown error").splitlines()[0]
+            lines.append(f"{e['count']:>4}  {first_line[:100]}")
+        body = "\n".join(lines)
+        rprint(_panel(body, fit=True, title="Most common errors", border_style="yellow"))
+    if stats.get("failed_sources"):
+        rprint(
+            _panel(
+                "\n".join(stats["failed_sources"])
+                + "\n\nRe-run them with: podkeet transcribe-many --retry-failed",
+                fit=True,
+                title="Last job failed",
+                border_style="red",
+            )
+        )
+
+
+@app.command("index")
+def index(
+    paths: Optional[List[Path]] = typer.Argument(
+        None, help="Transcript files or folders to index (default: the outputs folder)"
+    ),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Re-read every file from scratch"),
+    as_json: bool = typer.Option(False, "--json", help="Print the update as JSON"),
+):
+    """Add ``json``/``jsonl`` transcripts to the full-text search index.
+
+    Only new and changed files are read; once the index exists, transcripts
+    written by transcribe, transcribe-many and watch are added as they finish.
+    """
+    from .search import SearchIndex
+
+    roots = paths or [Outputs().base]
+    missing = [str(p) for p in roots if not p.exists()]
+    if missing:
+        rprint(_panel(f"Not found: {', '.join(missing)}", border_style="red"))
+        raise typer.Exit(2)
+    search_index = SearchIndex()
+    if rebuild:
+        search_index.rebuild()
+    update = search_index.update(roots)
+    stats = {**search_index.stats(), **update.as_dict()}
+    search_index.close()
+    if as_json:
+        print(json.dumps(stats, ensure_ascii=False))
+        return
+    body = [
+        f"Added {update.added}, updated {update.updated}, removed {update.removed}"
+        f" ({update.unchanged} unchanged) in {_fmt_duration(update.seconds)}",
+        f"{stats['documents']} transcripts, {stats['sentences']} sentences in {stats['path']}",
+    ]
+    rprint(_panel("\n".join(body), fit=True, title="Search index", border_style="green"))
+
+
+@app.command("search")
+def search(
+    query: str = typer.Argument(
+        ..., help='Words to find; FTS5 syntax such as "exact phrase", OR and prefix* works'
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum number of hits"),
+    as_json: bool = typer.Option(False, "--json", help="Print hits as JSON"),
+):
+    """Search indexed transcripts; hits are timed to the words that matched."""
+    from .formats import _format_timestamp
+    from .search import SearchIndex, default_index_path
+
+    if not default_index_path().exists():
+        rprint(_panel("No search index yet: run `podkeet index` first", border_style="red"))
+        raise typer.Exit(1)
+    search_index = SearchIndex()
+    hits = search_index.search(query, limit)
+    search_index.close()
+    if as_json:
+        print(json.dumps([h.as_dict() for h in hits], ensure_ascii=False))
+        return
+    if not hits:
+        rprint(_panel(f"No matches for {query!r}", fit=True, border_style="yellow"))
+        return
+
+    import re
+
+    from rich.text import Text
+
+    terms = [
+        re.escape(w.rstrip("*")) + (r"\w*" if w.endswith("*") else r"\b")
+        for w in re.findall(r"\w+\*?", query)
+        if w not in ("AND", "OR", "NOT", "NEAR")
+    ]
+    pattern = r"(?i)\b(?:" + "|".join(terms) + ")" if terms else None
+    for hit in hits:
+        start = _format_timestamp(hit.start_ms / 1000, decimal_marker=".")
+        end = _format_timestamp(hit.end_ms / 1000, decimal_marker=".")
+        line = Text(f"{hit.path}  {start} --> {end}", style="cyan")
+        text = Text(hit.text)
+        if pattern is not None:
+            text.highlight_regex(pattern, "bold yellow")
+        rprint(line)
+        rprint(text)
+        rprint()
+
+
+@cache_app.command("stats")
+def cache_stats(
+    as_json: bool = typer.Option(False, "--json", help="Print stats as JSON"),
+):
+    """Show transcript cache location, size and entry count."""
+    stats = TranscriptCache().stats()
+    if as_json:
+        print(json.dumps(stats, ensure_ascii=False))
+        return
+    body = [
+        f"Path:    {stats['path']}",
+        f"Entries: {stats['entries']}",
+        f"Size:    {_fmt_bytes(stats['bytes'])} / {_fmt_bytes(stats['max_bytes'])}",
+    ]
+    rprint(_panel("\n".join(body), fit=True, title="Transcript cache", border_style="cyan"))
+
+
+@cache_app.command("prune")
+def cache_prune(
+    max_size: Optional[float] = typer.Option(
+        None, "--max-size", min=0.0, help="Target size in MB (default: configured cap)"
+    ),
+):
+    """Evict least-recently-used transcripts until the cache fits its size cap."""
+    cache = TranscriptCache()
+    limit = int(max_size * 1024 * 1024) if max_size is not None else None
+    removed = cache.prune(limit)
+    rprint(_panel(f"Removed {removed} cached transcripts", fit=True, border_style="green"))
+
+
+@cache_app.command("clear")
+def cache_clear():
+    """Remove every cached transcript."""
+    removed = TranscriptCache().clear()
+    rprint(_panel(f"Removed {removed} cached transcripts", fit=True, border_style="green"))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import List
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
 from .ffmpeg_utils import ensure_ffmpeg
+from .tracing import span
 
 
 class YTDLPLogger:
@@ -18,28 +29,53 @@ class YTDLPLogger:
         pass
 
 
-def download_audio(url: str, output_dir: Path) -> Path:
-    """Download best audio from a YouTube URL and convert to MP3.
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def video_id(url: str) -> Optional[str]:
+    """Return a stable ``extractor:id`` identity for a media URL, or None.
 
-    Returns the final MP3 file path.
+    YouTube URLs are parsed locally; anything else asks yt-dlp for metadata
+    without downloading.
     """
-    ensure_ffmpeg()
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    candidate: Optional[str] = None
+    if host in _YOUTUBE_HOSTS:
+        if parsed.path == "/watch":
+            candidate = (parse_qs(parsed.query).get("v") or [None])[0]
+        else:
+            parts = [p for p in parsed.path.split("/") if p]
+            if len(parts) >= 2 and parts[0] in {"shorts", "live", "embed", "v"}:
+                candidate = parts[1]
+    elif host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    if candidate and _YOUTUBE_ID.match(candidate):
+        return f"youtube:{candidate}"
 
-    from yt_dlp import YoutubeDL
-    from yt_dlp.utils import DownloadError
+    try:
+        from yt_dlp import YoutubeDL
 
-    output_dir.mkdir(parents=True, exist_ok=True)
+        opts = {"logger": YTDLPLogger(), "quiet": True, "noprogress": True}
+        with YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+    except Exception:
+        return None
+    vid = (info or {}).get("id")
+    extractor = ((info or {}).get("extractor_key") or "generic").lower()
+    return f"{extractor}:{vid}" if vid else None
 
-    ydl_opts = {
-        "format": "bestaudio/best",
-        "outtmpl": str(output_dir / "%(title)s.%(ext)s"),
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "192",
-            }
-        ],
+
+# Prefer streams ffmpeg decodes cheaply and that need no remux: opus, then AAC
+NATIVE_AUDIO_FORMAT = "bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best"
+AUDIO_FORMATS = ("mp3", "native")
+
+
+def _ydl_opts(work_dir: Path, outtmpl: str, codec: Optional[str] = "mp3") -> Dict[str, Any]:
+    opts: Dict[str, Any] = {
+        "format": "bestaudio/best" if codec else NATIVE_AUDIO_FORMAT,
+        "outtmpl": str(work_dir / outtmpl),
         "logger": YTDLPLogger(),
         "noprogress": True,
         "quiet": True,
@@ -48,53 +84,466 @@ def download_audio(url: str, output_dir: Path) -> Path:
         "fragment_retries": 5,
         "socket_timeout": 30,
     }
+    if codec:
+        opts["postprocessors"] = [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": codec,
+                "preferredquality": "192",
+            }
+        ]
+    return opts
+
+
+# (reason, substrings) checked in order against the lower-cased error text.
+# Permanent reasons fail at once; no number of retries fixes a removed video.
+_PERMANENT_ERRORS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("private", ("private video",)),
+    ("geo-blocked", ("available in your country", "geo restrict", "geo-restrict")),
+    ("age-restricted", ("confirm your age", "age-restricted", "inappropriate for some users")),
+    ("members-only", ("members-only", "join this channel")),
+    ("copyright", ("copyright",)),
+    ("live-not-started", ("live event will begin", "premieres in")),
+    ("unsupported-url", ("unsupported url", "is not a valid url")),
+    ("format-unavailable", ("requested format is not available",)),
+    ("drm", ("drm protected",)),
+    (
+        "unavailable",
+        ("video unavailable", "has been removed", "account associated", "http error 404"),
+    ),
+]
+_RETRYABLE_ERRORS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("rate-limited", ("http error 429", "too many requests")),
+    ("server-error", ("http error 5",)),
+    ("timeout", ("timed out", "timeout")),
+    (
+        "connection",
+        (
+            "connection reset",
+            "connection refused",
+            "connection aborted",
+            "remote end closed",
+            "incompleteread",
+            "eof occurred",
+        ),
+    ),
+    ("network", ("temporary failure", "name resolution", "network is unreachable", "ssl")),
+]
+
+
+def classify_error(exc: BaseException) -> Tuple[bool, str]:
+    """Return ``(retryable, reason)`` for a download failure.
+
+    yt-dlp wraps the underlying error in ``DownloadError``; both its message
+    and the wrapped exception (``exc_info``) are inspected. Unknown errors are
+    treated as retryable, but extractor errors yt-dlp marks as *expected*
+    (its user-facing "this can't be downloaded" errors) are permanent.
+    """
+    text = str(exc).lower()
+    for reason, needles in _PERMANENT_ERRORS:
+        if any(n in text for n in needles):
+            return False, reason
+    for reason, needles in _RETRYABLE_ERRORS:
+        if any(n in text for n in needles):
+            return True, reason
+    exc_info = getattr(exc, "exc_info", None)
+    inner = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+    if isinstance(inner, (TimeoutError, ConnectionError)):
+        return True, "timeout" if isinstance(inner, TimeoutError) else "connection"
+    if isinstance(inner, OSError):
+        return True, "network"
+    if getattr(inner, "expected", False):
+        return False, "unavailable"
+    return True, "unknown"
+
+
+@dataclass
+class RetryPolicy:
+    """Capped exponential backoff with full jitter, bounded by a total deadline.
+
+    This sits on top of yt-dlp's own per-request ``retries``, so it only has
+    to ride out failures of a whole extraction attempt.
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    deadline: float = 120.0
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retrying after failed *attempt* (1-based)."""
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+@dataclass
+class DownloadAttempt:
+    attempt: int
+    seconds: float
+    outcome: str  # ok | retry | failed
+    reason: Optional[str] = None
+    retryable: Optional[bool] = None
+    error: Optional[str] = None
+    sleep_seconds: float = 0.0
+
+
+class DownloadFailed(RuntimeError):
+    """A download that gave up, with every attempt that was made."""
+
+    def __init__(self, url: str, reason: str, retryable: bool, attempts: List[DownloadAttempt]):
+        last = attempts[-1].error if attempts else ""
+        n = len(attempts)
+        super().__init__(f"{last} [{reason}, {n} attempt{'s' if n != 1 else ''}]")
+        self.url = url
+        self.reason = reason
+        self.retryable = retryable
+        self.attempts = attempts
+
+
+def _extract_with_retries(
+    ydl: Any, url: str, policy: RetryPolicy, attempts: List[DownloadAttempt]
+) -> Dict[str, Any]:
+    from yt_dlp.utils import DownloadError
+
+    started = time.monotonic()
+    for n in range(1, policy.max_attempts + 1):
+        t0 = time.monotonic()
+        try:
+            with span("download.attempt", attempt=n):
+                info = ydl.extract_info(url, download=True) or {}
+        except DownloadError as e:
+            retryable, reason = classify_error(e)
+            record = DownloadAttempt(
+                n, time.monotonic() - t0, "failed", reason, retryable, str(e)[:500]
+            )
+            attempts.append(record)
+            delay = policy.delay(n)
+            out_of_time = time.monotonic() - started + delay > policy.deadline
+            if not retryable or n == policy.max_attempts or out_of_time:
+                raise DownloadFailed(url, reason, retryable, attempts) from e
+            record.outcome = "retry"
+            record.sleep_seconds = delay
+            time.sleep(delay)
+        else:
+            attempts.append(DownloadAttempt(n, time.monotonic() - t0, "ok"))
+            return info
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _downloaded_file(info: Dict[str, Any], work_dir: Path) -> Optional[Path]:
+    """The file yt-dlp produced, from ``requested_downloads`` when available."""
+    for req in info.get("requested_downloads") or []:
+        fp = req.get("filepath") or req.get("_filename") or req.get("filename")
+        if fp and Path(fp).exists():
+            return Path(fp)
+    # Older yt-dlp versions: the private work dir only holds this download
+    found = [p for p in work_dir.iterdir() if p.is_file() and p.suffix not in (".part", ".ytdl")]
+    return max(found, key=lambda p: p.stat().st_mtime) if found else None
+
+
+def download_audio(
+    url: str,
+    output_dir: Path,
+    outtmpl: str = "%(title)s [%(id)s].%(ext)s",
+    codec: Optional[str] = "mp3",
+    *,
+    retry: Optional[RetryPolicy] = None,
+    attempts: Optional[List[DownloadAttempt]] = None,
+) -> Path:
+    """Download best audio from a YouTube URL and convert it to *codec* (MP3).
+
+    With ``codec=None`` the native stream (usually opus in WebM, or m4a) is
+    kept as downloaded, skipping the CPU-bound re-encode; ffmpeg decodes it
+    for the model just as well.
+
+    Each call downloads into its own temporary directory under *output_dir*
+    and moves the result into place, so concurrent calls sharing an output
+    directory never see each other's files; the video ID in the default
+    *outtmpl* keeps same-titled videos from overwriting each other once
+    moved there. Returns the final file path.
+
+    Failed attempts are retried per *retry* unless `classify_error` deems
+    them permanent; each attempt is appended to *attempts* if given. Raises
+    `DownloadFailed` when giving up.
+    """
+    ensure_ffmpeg()
+
+    from yt_dlp import YoutubeDL
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix=".download-", dir=output_dir))
+    try:
+        with span("download", url=url), YoutubeDL(_ydl_opts(work_dir, outtmpl, codec)) as ydl:
+            info = _extract_with_retries(
+                ydl, url, retry or RetryPolicy(), attempts if attempts is not None else []
+            )
+        produced = _downloaded_file(info, work_dir)
+        if produced is None:
+            raise FileNotFoundError(f"yt-dlp reported no audio file for {url}")
+        final = output_dir / produced.name
+        os.replace(produced, final)
+        return final
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# --- playlists and channels ----------------------------------------------------
+
+
+@dataclass
+class PlaylistEntry:
+    id: str
+    url: str
+    title: Optional[str] = None
+    extractor: str = "generic"
+
+    @property
+    def archive_key(self) -> str:
+        """The entry's line in a yt-dlp ``--download-archive`` file."""
+        return f"{self.extractor.lower()} {self.id}"
+
+
+def _entry_url(entry: Dict[str, Any]) -> Optional[str]:
+    url = entry.get("webpage_url") or entry.get("url")
+    if url and "://" not in url and (entry.get("ie_key") or "").lower() == "youtube":
+        return f"https://www.youtube.com/watch?v={entry.get('id') or url}"
+    return url
+
+
+def _is_container(entry: Dict[str, Any]) -> bool:
+    ie_key = entry.get("ie_key") or ""
+    return entry.get("_type") == "playlist" or ie_key.endswith("Tab") or "Playlist" in ie_key
+
+
+def _flat_entries(ydl: Any, info: Dict[str, Any], depth: int = 0) -> Iterator[Dict[str, Any]]:
+    """Leaf entries of a flat playlist, expanding nested playlists and channel tabs."""
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue  # unavailable/private entries come back as None
+        if entry.get("entries") is not None:
+            yield from _flat_entries(ydl, entry, depth + 1)
+        elif _is_container(entry) and depth < 2 and _entry_url(entry):
+            nested = ydl.extract_info(_entry_url(entry), download=False) or {}
+            yield from _flat_entries(ydl, nested, depth + 1)
+        else:
+            yield entry
+
+
+def expand_playlist(url: str) -> List[PlaylistEntry]:
+    """List the videos behind a playlist or channel URL without downloading them.
+
+    Uses yt-dlp's flat extraction, so only the listing pages are fetched.
+    A plain video URL yields a single entry. Duplicates are dropped.
+    """
+    from yt_dlp import YoutubeDL
+
+    opts = {
+        "logger": YTDLPLogger(),
+        "quiet": True,
+        "noprogress": True,
+        "extract_flat": "in_playlist",
+        "skip_download": True,
+    }
+    with span("download.expand", url=url), YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False) or {}
+        if info.get("_type") not in ("playlist", "multi_video"):
+            vid = info.get("id")
+            if not vid:
+                return []
+            extractor = info.get("extractor_key") or "generic"
+            return [
+                PlaylistEntry(vid, info.get("webpage_url") or url, info.get("title"), extractor)
+            ]
+        raw = list(_flat_entries(ydl, info))
+
+    entries: List[PlaylistEntry] = []
+    seen = set()
+    for e in raw:
+        vid, entry_url = e.get("id"), _entry_url(e)
+        if not vid or not entry_url:
+            continue
+        entry = PlaylistEntry(vid, entry_url, e.get("title"), e.get("ie_key") or "generic")
+        if entry.archive_key not in seen:
+            seen.add(entry.archive_key)
+            entries.append(entry)
+    return entries
+
+
+class DownloadArchive:
+    """A yt-dlp compatible download archive: one ``extractor id`` line per finished item."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            lines = []
+        self._keys = {line.strip() for line in lines if line.strip()}
 
-    # Capture directory snapshot to robustly locate the newly created MP3
-    before: List[Path] = list(output_dir.glob("*"))
-    before_names = {p.name for p in before}
-    start_time = time.time()
-
-    with YoutubeDL(ydl_opts) as ydl:
-        for attempt in range(5):
-            try:
-                info = ydl.extract_info(url, download=True)
-                break
-            except DownloadError:
-                if attempt == 4:
-                    raise
-                # exponential backoff
-                time.sleep(2**attempt)
-
-    # Prefer explicit filepath from yt-dlp if present
-    # Many yt-dlp versions populate requested_downloads with final filepaths
-    candidates: List[Path] = []
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if key in self._keys:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(key + "\n")
+            self._keys.add(key)
+
+
+@dataclass
+class DownloadItem:
+    id: str
+    url: str
+    title: Optional[str] = None
+    status: str = "pending"  # ok | skipped | error
+    path: Optional[str] = None
+    bytes: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    attempts: List[DownloadAttempt] = field(default_factory=list)
+
+
+@dataclass
+class DownloadSummary:
+    source: str
+    workers: int = 1
+    items: List[DownloadItem] = field(default_factory=list)
+    expand_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def _count(self, status: str) -> int:
+        return sum(1 for i in self.items if i.status == status)
+
+    @property
+    def downloaded(self) -> int:
+        return self._count("ok")
+
+    @property
+    def skipped(self) -> int:
+        return self._count("skipped")
+
+    @property
+    def failed(self) -> int:
+        return self._count("error")
+
+    @property
+    def bytes(self) -> int:
+        return sum(i.bytes for i in self.items)
+
+    @property
+    def retries(self) -> int:
+        return sum(max(0, len(i.attempts) - 1) for i in self.items)
+
+    @property
+    def items_per_minute(self) -> float:
+        return 60.0 * self.downloaded / self.total_seconds if self.total_seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.total_seconds if self.total_seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ok" if self.failed == 0 else "partial",
+            "source": self.source,
+            "workers": self.workers,
+            "count": len(self.items),
+            "downloaded": self.downloaded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "expand_seconds": self.expand_seconds,
+            "total_seconds": self.total_seconds,
+            "items_per_minute": self.items_per_minute,
+            "bytes_per_second": self.bytes_per_second,
+            "items": [asdict(i) for i in self.items],
+        }
+
+
+def _download_entry(
+    entry: PlaylistEntry,
+    output_dir: Path,
+    archive: Optional[DownloadArchive],
+    codec: Optional[str] = "mp3",
+    retry: Optional[RetryPolicy] = None,
+) -> DownloadItem:
+    item = DownloadItem(entry.id, entry.url, entry.title)
+    t0 = perf_counter()
     try:
-        reqs = info.get("requested_downloads") or []
-        for req in reqs:
-            fp = req.get("filepath") or req.get("_filename") or req.get("filename")
-            if fp:
-                p = Path(fp)
-                if p.suffix.lower() == ".mp3" and p.exists():
-                    candidates.append(p)
-    except Exception:
-        pass
+        path = download_audio(
+            entry.url,
+            output_dir,
+            codec=codec,
+            retry=retry,
+            attempts=item.attempts,
+        )
+        item.path = str(path)
+        item.bytes = path.stat().st_size
+        item.status = "ok"
+        if archive is not None:
+            archive.add(entry.archive_key)
+    except Exception as e:
+        item.status = "error"
+        item.error = f"{type(e).__name__}: {e}"
+    item.seconds = perf_counter() - t0
+    return item
+
+
+def download_playlist(
+    url: str,
+    output_dir: Path,
+    *,
+    workers: int = 4,
+    archive: Optional[Path] = None,
+    limit: Optional[int] = None,
+    codec: Optional[str] = "mp3",
+    retry: Optional[RetryPolicy] = None,
+    on_item: Optional[Callable[[DownloadItem], None]] = None,
+) -> DownloadSummary:
+    """Download every video of a playlist or channel with a worker pool.
 
-    # Fall back to diffing directory contents created during this call
-    if not candidates:
-        after = list(output_dir.glob("*.mp3"))
-        new_files = [p for p in after if p.name not in before_names]
-        # If nothing obvious, also consider files modified very recently
-        if not new_files:
-            recent = [p for p in after if p.stat().st_mtime >= start_time - 2]
-            new_files = recent
-        # If multiple, pick the most recent
-        if new_files:
-            candidates = sorted(new_files, key=lambda p: p.stat().st_mtime, reverse=True)
-
-    if candidates:
-        return candidates[0]
-
-    # Last resort: guess from title (may fail if yt-dlp sanitized differently)
-    title = info.get("title") or "audio"
-    guessed = output_dir / f"{title}.mp3"
-    return guessed
+    Audio is converted to *codec* (MP3), or kept native with ``codec=None``.
+
+    Entries listed in *archive* are skipped, and each finished entry is
+    appended to it, so a re-run only fetches what is new or previously
+    failed. Failures are recorded per item rather than raised.
+    """
+    ensure_ffmpeg()
+    summary = DownloadSummary(source=url, workers=workers)
+    t0 = perf_counter()
+    entries = expand_playlist(url)
+    if limit is not None:
+        entries = entries[:limit]
+    summary.expand_seconds = perf_counter() - t0
+
+    ledger = DownloadArchive(archive) if archive is not None else None
+    summary.items = [DownloadItem(e.id, e.url, e.title) for e in entries]
+    todo = []
+    for idx, entry in enumerate(entries):
+        if ledger is not None and entry.archive_key in ledger:
+            summary.items[idx].status = "skipped"
+            if on_item:
+                on_item(summary.items[idx])
+        else:
+            todo.append(idx)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(_download_entry, entries[idx], output_dir, ledger, codec, retry): idx
+                for idx in todo
+            }
+            for fut in as_completed(futures):
+                item = fut.result()
+                summary.items[futures[fut]] = item
+                if on_item:
+                    on_item(item)
+    summary.total_seconds = perf_counter() - t0
+    return summary
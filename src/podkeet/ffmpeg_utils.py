@@ -1,10 +1,15 @@
 from __future__ import annotations
+
 import shutil
 import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from .tracing import span
+
+if TYPE_CHECKING:
+    import numpy as np
 
-from rich.panel import Panel
-from rich.text import Text
 
 # Video file extensions that require audio extraction before transcription
 VIDEO_EXTENSIONS = {
@@ -21,6 +26,22 @@ VIDEO_EXTENSIONS = {
     ".m2ts",
 }
 
+# Parakeet models expect 16 kHz mono input
+SAMPLE_RATE = 16_000
+
+# Audio file extensions that can be transcribed directly
+AUDIO_EXTENSIONS = {
+    ".mp3",
+    ".m4a",
+    ".aac",
+    ".wav",
+    ".flac",
+    ".ogg",
+    ".opus",
+    ".wma",
+    ".aiff",
+}
+
 
 def ensure_ffmpeg() -> None:
     """Ensure ffmpeg is available on PATH.
@@ -30,6 +51,9 @@ def ensure_ffmpeg() -> None:
     if shutil.which("ffmpeg"):
         return
 
+    from rich.panel import Panel
+    from rich.text import Text
+
     msg = Text()
     msg.append("ffmpeg is required for audio extraction.\n\n", style="bold red")
     msg.append("Install it on macOS with Homebrew:\n", style="bold")
@@ -50,20 +74,49 @@ def is_video_file(path: Path) -> bool:
     return path.suffix.lower() in VIDEO_EXTENSIONS
 
 
-def extract_audio_from_video(video_path: Path, out_dir: Path) -> Path:
-    """Extract audio from a video file and save it as an MP3 in *out_dir*.
+def is_media_file(path: Path) -> bool:
+    """Return True if *path* has an audio or video file extension."""
+    suffix = path.suffix.lower()
+    return suffix in AUDIO_EXTENSIONS or suffix in VIDEO_EXTENSIONS
 
-    Returns the path to the extracted MP3.
-    """
+
+def probe_duration(path: Path) -> float:
+    """Get duration in seconds using ffprobe. Returns 0.0 on failure."""
+    try:
+        with span("ffmpeg.probe"):
+            out = subprocess.check_output(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "default=nw=1:nk=1",
+                    str(path),
+                ],
+                stderr=subprocess.STDOUT,
+            )
+        return float(out.decode("utf-8").strip())
+    except Exception:
+        return 0.0
+
+
+# Rough single-core libmp3lame speed in audio seconds per second. Used to
+# estimate the re-encode a native-format download skips.
+MP3_ENCODE_REALTIME = 60.0
+
+
+def encode_mp3(src: Path, mp3_path: Path) -> Path:
+    """Encode the audio of any ffmpeg-readable *src* to VBR MP3 at *mp3_path*."""
     ensure_ffmpeg()
-    out_dir.mkdir(parents=True, exist_ok=True)
-    mp3_path = out_dir / (video_path.stem + ".mp3")
+    mp3_path.parent.mkdir(parents=True, exist_ok=True)
     cmd = [
         "ffmpeg",
         "-nostdin",
         "-y",
         "-i",
-        str(video_path),
+        str(src),
         "-vn",
         "-acodec",
         "libmp3lame",
@@ -71,5 +124,69 @@ def extract_audio_from_video(video_path: Path, out_dir: Path) -> Path:
         "2",
         str(mp3_path),
     ]
-    subprocess.run(cmd, check=True, capture_output=True)
+    with span("ffmpeg.encode_mp3", source=src.name):
+        subprocess.run(cmd, check=True, capture_output=True)
     return mp3_path
+
+
+def extract_audio_from_video(video_path: Path, out_dir: Path) -> Path:
+    """Extract audio from a video file and save it as an MP3 in *out_dir*.
+
+    Returns the path to the extracted MP3.
+    """
+    return encode_mp3(video_path, out_dir / (video_path.stem + ".mp3"))
+
+
+def decode_command(path: Path, sample_rate: int = SAMPLE_RATE) -> List[str]:
+    """ffmpeg arguments that write *path* to stdout as mono float32 PCM."""
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-i",
+        str(path),
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "f32le",
+        "-acodec",
+        "pcm_f32le",
+        "pipe:1",
+    ]
+
+
+def decode_audio(
+    path: Path, sample_rate: int = SAMPLE_RATE, out_path: Optional[Path] = None
+) -> "np.ndarray":
+    """Decode any audio/video file to mono float32 PCM in a single ffmpeg pass.
+
+    Samples are streamed over a pipe. With *out_path* they are written to a raw
+    ``.f32`` file and returned as a read-only memory map; otherwise they are
+    returned as an in-memory array.
+    """
+    import numpy as np
+
+    ensure_ffmpeg()
+    cmd = decode_command(path, sample_rate)
+    with span("ffmpeg.decode", source=path.name, to_file=out_path is not None):
+        if out_path is None:
+            proc = subprocess.run(cmd, check=True, capture_output=True)
+            return np.frombuffer(proc.stdout, dtype=np.float32)
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, "wb") as fh:
+            subprocess.run(cmd, check=True, stdout=fh, stderr=subprocess.PIPE)
+    return load_pcm(out_path)
+
+
+def load_pcm(path: Path) -> "np.ndarray":
+    """Memory-map a raw float32 PCM file written by `decode_audio`."""
+    import numpy as np
+
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="r")
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+from .transcript import Transcript
+
+# Local copies of formatters inspired by parakeet_mlx.cli
+# to avoid depending on internal CLI module.
+
+
+def _format_timestamp(
+    seconds: float, always_include_hours: bool = True, decimal_marker: str = ","
+) -> str:
+    assert seconds >= 0
+    milliseconds = round(seconds * 1000.0)
+    hours = milliseconds // 3_600_000
+    milliseconds %= 3_600_000
+    minutes = milliseconds // 60_000
+    milliseconds %= 60_000
+    sec = milliseconds // 1_000
+    milliseconds %= 1_000
+    hours_marker = f"{hours:02d}:" if always_include_hours or hours > 0 else ""
+    return f"{hours_marker}{minutes:02d}:{sec:02d}{decimal_marker}{milliseconds:03d}"
+
+
+def _to_txt(result: Any) -> str:
+    return (getattr(result, "text", "") or "").strip()
+
+
+def _wrap_word(text: str, open_tag: str, close_tag: str) -> str:
+    """Wrap the word in *text* with tags, keeping its surrounding whitespace."""
+    core = text.strip()
+    if not core:
+        return text
+    lead = text[: len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()) :]
+    return f"{lead}{open_tag}{core}{close_tag}{trail}"
+
+
+def _word_cues(
+    transcript: Transcript, open_tag: str, close_tag: str
+) -> Iterator[Tuple[float, float, str]]:
+    """Yield one ``(start, end, text)`` cue per token with that token highlighted.
+
+    Token texts are collected once per sentence and every cue is a single join
+    of the unchanged prefix, the wrapped token and the unchanged suffix, so the
+    work per cue is linear in the sentence length (no repeated ``+=``) and the
+    highlight always lands on the token's own position.
+    """
+    starts = transcript.token_start.tolist()
+    ends = transcript.token_end.tolist()
+    for _, _, _, a, b in transcript.sentences():
+        texts = transcript.token_texts(a, b)
+        for i in range(b - a):
+            end = ends[a + i] if a + i == b - 1 else starts[a + i + 1]
+            parts = texts[:i]
+            parts.append(_wrap_word(texts[i], open_tag, close_tag))
+            parts.extend(texts[i + 1 :])
+            yield starts[a + i], end, "".join(parts).strip()
+
+
+def _sentence_cues(transcript: Transcript) -> Iterator[Tuple[float, float, str]]:
+    for text, start, end, _, _ in transcript.sentences():
+        yield start, end, text.strip()
+
+
+def _cues(transcript: Transcript, highlight_words: bool, tags: Tuple[str, str]) -> Iterator:
+    if highlight_words:
+        return _word_cues(transcript, *tags)
+    return _sentence_cues(transcript)
+
+
+def _srt_cue(index: int, start: float, end: float, text: str) -> str:
+    start_time = _format_timestamp(start, decimal_marker=",")
+    end_time = _format_timestamp(end, decimal_marker=",")
+    return f"{index}\n{start_time} --> {end_time}\n{text}\n"
+
+
+def _vtt_cue(start: float, end: float, text: str) -> str:
+    start_time = _format_timestamp(start, decimal_marker=".")
+    end_time = _format_timestamp(end, decimal_marker=".")
+    return f"{start_time} --> {end_time}\n{text}\n"
+
+
+SRT_TAGS = ("<u>", "</u>")
+VTT_TAGS = ("<b>", "</b>")
+VTT_HEADER = "WEBVTT\n"
+
+
+def _to_srt(result: Any, highlight_words: bool = False) -> str:
+    cues = _cues(Transcript.from_result(result), highlight_words, SRT_TAGS)
+    return "\n".join(_srt_cue(i, *cue) for i, cue in enumerate(cues, start=1))
+
+
+def _to_vtt(result: Any, highlight_words: bool = False) -> str:
+    cues = _cues(Transcript.from_result(result), highlight_words, VTT_TAGS)
+    return VTT_HEADER + "".join("\n" + _vtt_cue(*cue) for cue in cues)
+
+
+def _sentence_records(transcript: Transcript) -> List[Dict[str, Any]]:
+    return transcript.to_dict(ndigits=3)["sentences"]
+
+
+def _json_sentence(record: Dict[str, Any]) -> str:
+    """One sentence as it appears inside the indented ``"sentences"`` array."""
+    lines = json.dumps(record, indent=2, ensure_ascii=False).splitlines()
+    return "\n".join("    " + line for line in lines)
+
+
+# `_to_json` output split so it can be written incrementally: `_json_head`,
+# the `_json_sentence` entries joined by ",\n", then JSON_TAIL. "text" comes
+# first but is only known once every sentence has been transcribed, so the
+# sentences are streamed after PARTIAL_JSON_HEAD and the head is put in front
+# when the file is finished.
+PARTIAL_JSON_HEAD = '{\n  "sentences": [\n'
+JSON_TAIL = "\n  ]\n}"
+
+
+def _json_head(text: str) -> str:
+    return f'{{\n  "text": {json.dumps(text, ensure_ascii=False)},\n  "sentences": [\n'
+
+
+def _to_json(result: Any) -> str:
+    transcript = Transcript.from_result(result)
+    output_dict = {"text": transcript.text, "sentences": _sentence_records(transcript)}
+    return json.dumps(output_dict, indent=2, ensure_ascii=False)
+
+
+def _to_jsonl(result: Any) -> str:
+    """One JSON object per line for each sentence, ready to be tailed."""
+    records = _sentence_records(Transcript.from_result(result))
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+
+FORMATTERS = {
+    "txt": _to_txt,
+    "srt": lambda r: _to_srt(r, highlight_words=False),
+    "vtt": lambda r: _to_vtt(r, highlight_words=False),
+    "json": _to_json,
+    "jsonl": _to_jsonl,
+}
+
+# Word-level ("karaoke") variants used when highlight_words is set
+WORD_FORMATTERS = {
+    "srt": lambda r: _to_srt(r, highlight_words=True),
+    "vtt": lambda r: _to_vtt(r, highlight_words=True),
+}
+
+
+Formats = Union[str, Sequence[str]]
+
+
+def parse_formats(out_format: Formats) -> List[str]:
+    """Normalize ``"srt"``, ``"txt,srt"``, ``["txt", "vtt"]`` or ``"all"`` to a format list."""
+    choices = "|".join(FORMATTERS)
+    items = out_format.split(",") if isinstance(out_format, str) else list(out_format)
+    formats: List[str] = []
+    for item in items:
+        fmt = item.strip().lower()
+        if not fmt:
+            continue
+        if fmt == "all":
+            candidates = list(FORMATTERS)
+        elif fmt in FORMATTERS:
+            candidates = [fmt]
+        else:
+            raise ValueError(f"Unsupported format: {fmt}. Choose from {choices} or all")
+        formats.extend(f for f in candidates if f not in formats)
+    if not formats:
+        raise ValueError(f"No output format given. Choose from {choices} or all")
+    return formats
@@ -0,0 +1,263 @@
+"""Persistent record of transcription jobs, in SQLite.
+
+Every finished batch or watch job is stored with its source, content hash,
+model, output-affecting options, output paths, status and per-stage timings.
+A job is identified by the content (not the path) plus the model and
+options, so a re-run can skip work that is already done, retry what failed,
+and ``podkeet jobs`` can report throughput and failures over time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .cache import hash_file
+from .ffmpeg_utils import is_url
+
+if TYPE_CHECKING:
+    from .batch import BatchItem
+
+# Options that change what a job produces; anything else (cache, registry,
+# callbacks) does not make it a different job
+KEY_OPTIONS = (
+    "dtype",
+    "out_format",
+    "chunk_seconds",
+    "overlap_seconds",
+    "highlight_words",
+    "vad",
+    "workers",
+)
+TIMINGS = (
+    "audio_seconds",
+    "download_seconds",
+    "extract_seconds",
+    "transcribe_seconds",
+    "transcode_seconds",
+    "total_seconds",
+)
+PERIODS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    model TEXT NOT NULL,
+    options TEXT NOT NULL,
+    command TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    outputs TEXT NOT NULL,
+    {", ".join(f"{t} REAL" for t in TIMINGS)},
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (job_key, id);
+CREATE INDEX IF NOT EXISTS jobs_by_file ON jobs (source, size, mtime_ns);
+CREATE INDEX IF NOT EXISTS jobs_by_time ON jobs (finished_at);
+"""
+
+
+def default_ledger_path() -> Path:
+    """``$PODKEET_LEDGER``, else ``$XDG_STATE_HOME/podkeet/ledger.sqlite``."""
+    env = os.environ.get("PODKEET_LEDGER")
+    if env:
+        return Path(env).expanduser()
+    base = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    return Path(base) / "podkeet" / "ledger.sqlite"
+
+
+def job_options(out_dir: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """The output-affecting subset of *options*, plus where the outputs go."""
+    picked = {k: options[k] for k in KEY_OPTIONS if options.get(k) is not None}
+    picked["out_dir"] = str(Path(out_dir).resolve())
+    return picked
+
+
+@dataclass
+class JobSpec:
+    """What a job is: the content of a source under a model and options."""
+
+    source: str
+    content_hash: str
+    model: str
+    options: Dict[str, Any]
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        payload = json.dumps(
+            {"content": self.content_hash, "model": self.model, "options": self.options},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Ledger:
+    """Job history in a SQLite file (see `default_ledger_path`)."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else default_ledger_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def known_hash(self, path: Path, size: int, mtime_ns: int) -> Optional[str]:
+        """Content hash recorded for this exact version of *path*, if any."""
+        rows = self._query(
+            "SELECT content_hash FROM jobs WHERE source = ? AND size = ? AND mtime_ns = ?"
+            " ORDER BY id DESC LIMIT 1",
+            (str(path), size, mtime_ns),
+        )
+        return rows[0]["content_hash"] if rows else None
+
+    def spec(self, source: str, model: str, options: Dict[str, Any]) -> JobSpec:
+        """Identify *source*: a URL by its video ID, a file by a hash of its bytes.
+
+        Files already in the ledger with the same size and mtime are not hashed again.
+        """
+        if is_url(source):
+            from .downloader import video_id
+
+            return JobSpec(source, f"url:{video_id(source) or source}", model, options)
+        path = Path(source)
+        try:
+            st = path.stat()
+        except OSError:  # missing: the job will fail and be recorded as such
+            return JobSpec(source, f"path:{source}", model, options)
+        content = self.known_hash(path, st.st_size, st.st_mtime_ns) or hash_file(path)
+        return JobSpec(source, content, model, options, st.st_size, st.st_mtime_ns)
+
+    def last(self, spec: JobSpec) -> Optional[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT * FROM jobs WHERE job_key = ? ORDER BY id DESC LIMIT 1", (spec.key,)
+        )
+        return _job(rows[0]) if rows else None
+
+    def is_done(self, spec: JobSpec) -> bool:
+        """True if the last run of this job succeeded and its outputs still exist."""
+        job = self.last(spec)
+        return (
+            job is not None
+            and job["status"] == "ok"
+            and bool(job["outputs"])
+            and all(Path(p).exists() for p in job["outputs"])
+        )
+
+    def failures(self, spec: JobSpec) -> int:
+        """Failed runs of this job since it last succeeded."""
+        rows = self._query(
+            "SELECT COUNT(*) AS n FROM jobs WHERE job_key = ? AND status = 'error' AND id >"
+            " COALESCE((SELECT MAX(id) FROM jobs WHERE job_key = ? AND status = 'ok'), 0)",
+            (spec.key, spec.key),
+        )
+        return int(rows[0]["n"])
+
+    def record(self, spec: JobSpec, item: "BatchItem", command: Optional[str] = None) -> int:
+        """Store the outcome of one job. Returns its row ID."""
+        outputs = item.transcript_paths or ([item.transcript_path] if item.transcript_path else [])
+        row = {
+            "job_key": spec.key,
+            "source": spec.source,
+            "content_hash": spec.content_hash,
+            "size": spec.size,
+            "mtime_ns": spec.mtime_ns,
+            "model": spec.model,
+            "options": json.dumps(spec.options, sort_keys=True),
+            "command": command,
+            "status": item.status,
+            "error": item.error,
+            "outputs": json.dumps([str(p) for p in outputs]),
+            **{t: getattr(item, t) for t in TIMINGS},
+            "finished_at": time.time(),
+        }
+        columns = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self._lock, self._db:
+            cur = self._db.execute(
+                f"INSERT INTO jobs ({columns}) VALUES ({marks})", tuple(row.values())
+            )
+        return int(cur.lastrowid)
+
+    def failed_sources(self) -> List[str]:
+        """Sources whose latest job failed, oldest first."""
+        rows = self._query(
+            "SELECT source FROM jobs WHERE id IN (SELECT MAX(id) FROM jobs GROUP BY job_key)"
+            " AND status = 'error' ORDER BY id"
+        )
+        return list(dict.fromkeys(r["source"] for r in rows))
+
+    def jobs(self, since: float = 0.0, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM jobs WHERE finished_at >= ?"
+        params: Tuple[Any, ...] = (since,)
+        if status is not None:
+            sql += " AND status = ?"
+            params += (status,)
+        return [_job(r) for r in self._query(sql + " ORDER BY id", params)]
+
+    def stats(self, since: float = 0.0, period: str = "day", top_errors: int = 5) -> Dict[str, Any]:
+        """Jobs, failures and throughput per *period* (day, week or month, local time)."""
+        fmt = PERIODS[period]
+        aggregate = (
+            "COUNT(*) AS jobs,"
+            " SUM(status = 'ok') AS ok,"
+            " SUM(status = 'error') AS failed,"
+            " COALESCE(SUM(CASE WHEN status = 'ok' THEN audio_seconds END), 0) AS audio_seconds,"
+            " COALESCE(SUM(total_seconds), 0) AS busy_seconds"
+        )
+        rows = self._query(
+            f"SELECT strftime('{fmt}', finished_at, 'unixepoch', 'localtime') AS period,"
+            f" {aggregate} FROM jobs WHERE finished_at >= ? GROUP BY period ORDER BY period",
+            (since,),
+        )
+        total = self._query(f"SELECT {aggregate} FROM jobs WHERE finished_at >= ?", (since,))
+        errors = self._query(
+            "SELECT error, COUNT(*) AS count FROM jobs WHERE status = 'error'"
+            " AND finished_at >= ? GROUP BY error ORDER BY count DESC LIMIT ?",
+            (since, top_errors),
+        )
+        return {
+            "period": period,
+            "total": _rates(dict(total[0])),
+            "periods": [_rates(dict(r)) for r in rows],
+            "errors": [{"error": r["error"], "count": r["count"]} for r in errors],
+        }
+
+
+def _job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["options"] = json.loads(job["options"])
+    job["outputs"] = json.loads(job["outputs"])
+    return job
+
+
+def _rates(row: Dict[str, Any]) -> Dict[str, Any]:
+    jobs = row["jobs"] or 0
+    row["ok"] = row["ok"] or 0
+    row["failed"] = row["failed"] or 0
+    row["failure_rate"] = row["failed"] / jobs if jobs else 0.0
+    busy = row["busy_seconds"]
+    row["throughput"] = row["audio_seconds"] / busy if busy else 0.0
+    return row
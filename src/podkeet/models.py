@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .tracing import span
+
+DEFAULT_MODEL = "mlx-community/parakeet-tdt-0.6b-v2"
+DEFAULT_DTYPE = "bfloat16"
+
+# A loader receives (model_name, dtype_name) and returns a ready-to-use model.
+Loader = Callable[[str, str], Any]
+
+
+def _default_loader(model_name: str, dtype: str) -> Any:
+    """Load a Parakeet-MLX model with the given MLX dtype name (e.g. 'bfloat16')."""
+    try:
+        import mlx.core as mx
+        from parakeet_mlx import from_pretrained
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "parakeet-mlx is not installed. Install it with:\n"
+            "  uv pip install parakeet-mlx\n"
+            "or\n"
+            "  pip install parakeet-mlx"
+        ) from e
+
+    return from_pretrained(model_name, dtype=getattr(mx, dtype))
+
+
+def _release_memory() -> None:
+    """Best-effort release of cached MLX buffers after a model is dropped."""
+    mx = sys.modules.get("mlx.core")
+    if mx is None:
+        return
+    clear = getattr(mx, "clear_cache", None) or getattr(
+        getattr(mx, "metal", None), "clear_cache", None
+    )
+    if clear is None:
+        return
+    try:
+        clear()
+    except RuntimeError:  # MLX surfaces backend failures as RuntimeError
+        pass
+
+
+@dataclass
+class RegistryStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    load_seconds: float = 0.0
+    last_load_seconds: Optional[float] = None
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+            "load_seconds": self.load_seconds,
+            "last_load_seconds": self.last_load_seconds,
+        }
+
+
+class ModelRegistry:
+    """LRU cache of loaded models keyed by (model_name, dtype).
+
+    Loading a Parakeet model pays the full weight-load and graph-warmup cost, so
+    callers driving many transcriptions from one process should share a registry.
+    """
+
+    def __init__(self, max_models: int = 1, loader: Optional[Loader] = None) -> None:
+        if max_models < 1:
+            raise ValueError("max_models must be >= 1")
+        self.max_models = max_models
+        self._loader: Loader = loader or _default_loader
+        self._models: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = RegistryStats()
+
+    @property
+    def loader(self) -> Loader:
+        """The function this registry loads models with."""
+        return self._loader
+
+    def get(self, model_name: str = DEFAULT_MODEL, dtype: str = DEFAULT_DTYPE) -> Any:
+        """Return a cached model, loading (and possibly evicting) on a miss."""
+        key = (model_name, dtype)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.stats.hits += 1
+                return model
+
+            self.stats.misses += 1
+            t0 = perf_counter()
+            with span("model.load", model=model_name, dtype=dtype):
+                model = self._loader(model_name, dtype)
+            elapsed = perf_counter() - t0
+            self.stats.load_seconds += elapsed
+            self.stats.last_load_seconds = elapsed
+
+            self._models[key] = model
+            evicted = False
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.stats.evictions += 1
+                evicted = True
+        if evicted:
+            _release_memory()
+        return model
+
+    def unload(self, model_name: str = DEFAULT_MODEL, dtype: str = DEFAULT_DTYPE) -> bool:
+        """Drop a single model from the cache. Returns True if it was loaded."""
+        with self._lock:
+            removed = self._models.pop((model_name, dtype), None) is not None
+        if removed:
+            _release_memory()
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached model."""
+        with self._lock:
+            had_models = bool(self._models)
+            self._models.clear()
+        if had_models:
+            _release_memory()
+
+    def loaded(self) -> List[Tuple[str, str]]:
+        """Return cached keys from least to most recently used."""
+        with self._lock:
+            return list(self._models)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide model registry used by `transcribe()` by default."""
+    return _registry
+
+
+def get_model(model_name: str = DEFAULT_MODEL, dtype: str = DEFAULT_DTYPE) -> Any:
+    return _registry.get(model_name, dtype)
+
+
+def unload(model_name: str = DEFAULT_MODEL, dtype: str = DEFAULT_DTYPE) -> bool:
+    return _registry.unload(model_name, dtype)
+
+
+def clear() -> None:
+    _registry.clear()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .batch import (
+    BatchItem,
+    BatchSummary,
+    PreparedAudio,
+    _load_model,
+    prepare_source,
+    transcribe_prepared,
+)
+from .ffmpeg_utils import is_url, is_video_file
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, ModelRegistry, get_registry
+
+
+@dataclass
+class StageStats:
+    workers: int = 1
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    def utilization(self, wall_seconds: float) -> float:
+        """Fraction of the stage's worker capacity spent doing work."""
+        capacity = wall_seconds * max(self.workers, 1)
+        return self.busy_seconds / capacity if capacity > 0 else 0.0
+
+
+@dataclass
+class PipelineStats:
+    download: StageStats = field(default_factory=StageStats)
+    extract: StageStats = field(default_factory=StageStats)
+    model: StageStats = field(default_factory=StageStats)
+    # Time the model consumer spent blocked waiting for the next prepared item
+    model_wait_seconds: float = 0.0
+    # Prepared-and-waiting items observed each time the consumer pulled from the queue
+    depth_samples: List[int] = field(default_factory=list)
+
+    def as_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        stages = {
+            name: {
+                "workers": st.workers,
+                "items": st.items,
+                "busy_seconds": st.busy_seconds,
+                "utilization": st.utilization(wall_seconds),
+            }
+            for name, st in (
+                ("download", self.download),
+                ("extract", self.extract),
+                ("model", self.model),
+            )
+        }
+        active = {k: v for k, v in stages.items() if v["items"]}
+        bottleneck = max(active, key=lambda k: active[k]["utilization"]) if active else None
+        samples = self.depth_samples
+        return {
+            **stages,
+            "model_wait_seconds": self.model_wait_seconds,
+            "queue_depth_max": max(samples) if samples else 0,
+            "queue_depth_mean": sum(samples) / len(samples) if samples else 0.0,
+            "bottleneck": bottleneck,
+        }
+
+
+def _ready(prepared: PreparedAudio) -> Future:
+    fut: Future = Future()
+    fut.set_result(prepared)
+    return fut
+
+
+def _failed(exc: BaseException) -> Future:
+    fut: Future = Future()
+    fut.set_exception(exc)
+    return fut
+
+
+def _needs_ffmpeg(source: str, pcm: bool) -> bool:
+    """Local sources that need an ffmpeg pass before the model can use them."""
+    return not is_url(source) and (pcm or is_video_file(Path(source)))
+
+
+def _submit(
+    source: str,
+    out_dir: Path,
+    download_pool: Executor,
+    extract_pool: Optional[Executor],
+    pcm: bool = False,
+) -> Future:
+    """Route a source to the stage that prepares it."""
+    if is_url(source):
+        return download_pool.submit(prepare_source, source, out_dir, pcm)
+    local_path = Path(source)
+    if not local_path.exists():
+        return _failed(FileNotFoundError(f"File not found: {local_path}"))
+    if _needs_ffmpeg(source, pcm) and extract_pool is not None:
+        return extract_pool.submit(prepare_source, source, out_dir, pcm)
+    try:
+        return _ready(prepare_source(source, out_dir, pcm))
+    except Exception as e:
+        return _failed(e)
+
+
+def _ready_depth(q: "queue.Queue[Optional[Tuple[int, str, Future]]]") -> int:
+    with q.mutex:
+        return sum(1 for entry in q.queue if entry is not None and entry[2].done())
+
+
+def run_pipeline(
+    sources: List[str],
+    out_dir: Path,
+    *,
+    model_name: str = DEFAULT_MODEL,
+    dtype: str = DEFAULT_DTYPE,
+    registry: Optional[ModelRegistry] = None,
+    keep_audio: bool = False,
+    pcm: bool = False,
+    prefetch: int = 2,
+    download_workers: int = 2,
+    extract_workers: int = 2,
+    on_item: Optional[Callable[[int, BatchItem], None]] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+    **options: Any,
+) -> BatchSummary:
+    """Transcribe *sources* in order while preparing the next ones in the background.
+
+    Downloads run in a bounded thread pool and ffmpeg extraction in a process
+    pool; a single consumer feeds prepared audio to the model. While item N is
+    transcribed, up to *prefetch* following items are fetched and decoded.
+    With *pcm*, the extract stage decodes straight to memory-mapped PCM files
+    instead of MP3. Per-stage utilization and queue depths end up in
+    ``summary.stages``. *skip* is checked by the feeder before a source is
+    prepared, as in `batch.run_batch`. Extra *options* are forwarded to
+    `transcriber.transcribe`.
+    """
+    registry = registry if registry is not None else get_registry()
+    summary = BatchSummary(model=model_name)
+    stats = PipelineStats(
+        download=StageStats(workers=download_workers),
+        extract=StageStats(workers=extract_workers),
+    )
+    t0 = perf_counter()
+
+    pending: "queue.Queue[Optional[Tuple[int, str, Future]]]" = queue.Queue(
+        maxsize=max(prefetch, 1)
+    )
+    stop = threading.Event()
+    needs_extract = any(_needs_ffmpeg(s, pcm) for s in sources)
+
+    with ExitStack() as stack:
+        download_pool = stack.enter_context(
+            ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="podkeet-dl")
+        )
+        extract_pool: Optional[Executor] = None
+        if needs_extract and extract_workers > 0:
+            extract_pool = stack.enter_context(ProcessPoolExecutor(max_workers=extract_workers))
+
+        def put(entry: Optional[Tuple[int, str, Future]]) -> bool:
+            while not stop.is_set():
+                try:
+                    pending.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed() -> None:
+            for idx, source in enumerate(sources):
+                try:
+                    if skip is not None and skip(source):
+                        summary.skipped.append(source)
+                        continue
+                except Exception as e:
+                    fut = _failed(e)
+                else:
+                    fut = _submit(source, out_dir, download_pool, extract_pool, pcm)
+                if not put((idx, source, fut)):
+                    fut.cancel()
+                    return
+            put(None)
+
+        feeder = threading.Thread(target=feed, name="podkeet-feeder", daemon=True)
+        feeder.start()
+        try:
+            # Sharded runs load the model in each worker process, never in this one
+            loaded = options.get("workers", 1) > 1
+            while True:
+                stats.depth_samples.append(_ready_depth(pending))
+                wt0 = perf_counter()
+                entry = pending.get()
+                if entry is None:
+                    break
+                idx, source, fut = entry
+                item = BatchItem(source=source)
+                try:
+                    prepared = fut.result()
+                except Exception as e:
+                    stats.model_wait_seconds += perf_counter() - wt0
+                    item.fail(e)
+                else:
+                    stats.model_wait_seconds += perf_counter() - wt0
+                    if not loaded:
+                        _load_model(summary, registry, model_name, dtype)
+                        loaded = True
+                    if prepared.download_seconds is not None:
+                        stats.download.items += 1
+                        stats.download.busy_seconds += prepared.download_seconds
+                    if prepared.extract_seconds is not None:
+                        stats.extract.items += 1
+                        stats.extract.busy_seconds += prepared.extract_seconds
+                    mt0 = perf_counter()
+                    transcribe_prepared(
+                        item,
+                        prepared,
+                        out_dir,
+                        keep_audio=keep_audio,
+                        model_name=model_name,
+                        dtype=dtype,
+                        registry=registry,
+                        **options,
+                    )
+                    stats.model.items += 1
+                    stats.model.busy_seconds += perf_counter() - mt0
+                # Stages overlap across items, so report the work spent on this one
+                item.total_seconds = (
+                    (item.download_seconds or 0.0)
+                    + (item.extract_seconds or 0.0)
+                    + (item.transcribe_seconds or 0.0)
+                )
+                summary.items.append(item)
+                if on_item is not None:
+                    on_item(idx, item)
+        finally:
+            stop.set()
+            feeder.join()
+
+    summary.total_seconds = perf_counter() - t0
+    summary.stages = stats.as_dict(summary.total_seconds)
+    return summary
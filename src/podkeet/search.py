@@ -0,0 +1,330 @@
+"""Full-text search over transcripts with a local SQLite FTS5 index.
+
+Transcripts written as ``json`` (`formats._to_json`) or ``jsonl`` are indexed
+per sentence in an FTS5 table; their tokens are kept with millisecond
+timings alongside, so a hit is narrowed from the sentence to the words that
+matched. Indexing is incremental: a file is only (re)read when its size or
+mtime changed, deleted files drop out, and `index_outputs` adds a single
+run's outputs right after they are written.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+SUFFIXES = (".json", ".jsonl")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sentences INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentences (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sentences_by_doc ON sentences (doc_id);
+CREATE TABLE IF NOT EXISTS tokens (
+    sentence_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (sentence_id, idx)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS sentences_fts USING fts5(
+    text, content='sentences', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TERM = re.compile(r"(\w+)(\*?)", re.UNICODE)
+
+
+def default_index_path() -> Path:
+    """``$PODKEET_INDEX``, else ``$XDG_DATA_HOME/podkeet/index.sqlite``."""
+    env = os.environ.get("PODKEET_INDEX")
+    if env:
+        return Path(env).expanduser()
+    base = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return Path(base) / "podkeet" / "index.sqlite"
+
+
+def _ms(seconds: Any) -> int:
+    return int(round(float(seconds or 0.0) * 1000))
+
+
+def read_sentences(path: Path) -> Optional[List[Dict[str, Any]]]:
+    """Sentence records of a ``json``/``jsonl`` transcript, or None if it is not one."""
+    try:
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".jsonl":
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            data = json.loads(text)
+            records = data.get("sentences") if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+    if not isinstance(records, list) or not all(
+        isinstance(r, dict) and "text" in r and "start" in r for r in records
+    ):
+        return None  # e.g. summary.json
+    return records
+
+
+@dataclass
+class Hit:
+    path: str
+    text: str
+    start_ms: int  # first matching word (the sentence start if no word matched)
+    end_ms: int  # last matching word
+    sentence_start_ms: int
+    sentence_end_ms: int
+    score: float  # bm25, lower is better
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class IndexUpdate:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    skipped: int = 0  # JSON files that are not transcripts
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _fts_query(query: str) -> str:
+    """*query* as FTS5 terms that must all appear (no operators, safe to pass on)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in _WORD.findall(query))
+
+
+def _query_terms(query: str) -> Tuple[Set[str], List[str]]:
+    """Lower-cased words of *query*, and the prefixes written as ``word*``."""
+    words: Set[str] = set()
+    prefixes: List[str] = []
+    for match in _TERM.finditer(query):
+        term = match.group(1).lower()
+        if match.group(2):
+            prefixes.append(term)
+        else:
+            words.add(term)
+    return words, prefixes
+
+
+def _match_span(tokens: Sequence[Tuple[int, int, str]], query: str) -> Optional[Tuple[int, int]]:
+    """Start and end (ms) from the first to the last word of *query* in *tokens*.
+
+    Tokens are subword pieces; a new word starts at a piece with leading
+    whitespace, so a match is timed from its first piece to its last.
+    """
+    spans: List[Tuple[int, int, str]] = []
+    for start, end, text in tokens:
+        if not spans or text[:1].isspace():
+            spans.append((start, end, text))
+        else:
+            first, _, word = spans[-1]
+            spans[-1] = (first, end, word + text)
+    words, prefixes = _query_terms(query)
+    matched = [
+        (start, end)
+        for start, end, text in spans
+        for w in _WORD.findall(text.lower())
+        if w in words or any(w.startswith(p) for p in prefixes)
+    ]
+    if not matched:
+        return None
+    return matched[0][0], matched[-1][1]
+
+
+class SearchIndex:
+    """Sentence-level FTS5 index of transcript files (see `default_index_path`)."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _remove(self, doc_id: int) -> None:
+        db = self._db
+        rows = db.execute("SELECT id, text FROM sentences WHERE doc_id = ?", (doc_id,)).fetchall()
+        db.executemany(
+            "INSERT INTO sentences_fts (sentences_fts, rowid, text) VALUES ('delete', ?, ?)", rows
+        )
+        db.executemany("DELETE FROM tokens WHERE sentence_id = ?", [(r[0],) for r in rows])
+        db.execute("DELETE FROM sentences WHERE doc_id = ?", (doc_id,))
+        db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def add(self, path: Path, sentences: List[Dict[str, Any]], size: int, mtime_ns: int) -> None:
+        """Index (or re-index) the sentence records of the transcript at *path*."""
+        db = self._db
+        with self._lock, db:
+            row = db.execute("SELECT id FROM documents WHERE path = ?", (str(path),)).fetchone()
+            if row is not None:
+                self._remove(row[0])
+            cur = db.execute(
+                "INSERT INTO documents (path, size, mtime_ns, sentences, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (str(path), size, mtime_ns, len(sentences), time.time()),
+            )
+            doc_id = cur.lastrowid
+            for record in sentences:
+                text = (record.get("text") or "").strip()
+                cur = db.execute(
+                    "INSERT INTO sentences (doc_id, start_ms, end_ms, text) VALUES (?, ?, ?, ?)",
+                    (doc_id, _ms(record.get("start")), _ms(record.get("end")), text),
+                )
+                sid = cur.lastrowid
+                db.execute("INSERT INTO sentences_fts (rowid, text) VALUES (?, ?)", (sid, text))
+                db.executemany(
+                    "INSERT INTO tokens VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (sid, i, _ms(t.get("start")), _ms(t.get("end")), t.get("text") or "")
+                        for i, t in enumerate(record.get("tokens") or [])
+                    ],
+                )
+
+    def update(self, roots: Iterable[Path]) -> IndexUpdate:
+        """Bring the index up to date with the transcripts under *roots* (files or folders).
+
+        Unchanged files (same size and mtime) are not read; indexed files under
+        a root that no longer exist are removed.
+        """
+        t0 = time.perf_counter()
+        stats = IndexUpdate()
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._db.execute(
+                "SELECT path, size, mtime_ns FROM documents"
+            )
+        }
+        seen = set()
+        folders = []
+        for root in roots:
+            root = Path(root).resolve()
+            if root.is_dir():
+                folders.append(root)
+                files: Iterable[Path] = (p for p in root.rglob("*") if p.suffix in SUFFIXES)
+            else:
+                files = [root]
+            for path in sorted(files):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                seen.add(str(path))
+                previous = known.get(str(path))
+                if previous == (st.st_size, st.st_mtime_ns):
+                    stats.unchanged += 1
+                    continue
+                sentences = read_sentences(path)
+                if sentences is None:
+                    stats.skipped += 1
+                    continue
+                self.add(path, sentences, st.st_size, st.st_mtime_ns)
+                if previous is None:
+                    stats.added += 1
+                else:
+                    stats.updated += 1
+        for path in known:
+            gone = path not in seen and not Path(path).exists()
+            if gone and any(Path(path).is_relative_to(f) for f in folders):
+                self.remove(Path(path))
+                stats.removed += 1
+        stats.seconds = time.perf_counter() - t0
+        return stats
+
+    def remove(self, path: Path) -> bool:
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT id FROM documents WHERE path = ?", (str(path),)
+            ).fetchone()
+            if row is None:
+                return False
+            self._remove(row[0])
+        return True
+
+    def rebuild(self) -> None:
+        """Drop every indexed document (a following `update` reads everything again)."""
+        with self._lock, self._db:
+            for table in ("tokens", "sentences", "documents"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._db.execute("INSERT INTO sentences_fts (sentences_fts) VALUES ('delete-all')")
+
+    def stats(self) -> Dict[str, Any]:
+        docs, sentences = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(sentences), 0) FROM documents"
+        ).fetchone()
+        return {"path": str(self.path), "documents": docs, "sentences": sentences}
+
+    def search(self, query: str, limit: int = 20) -> List[Hit]:
+        """Best-ranked sentences matching *query*.
+
+        FTS5 syntax (``"exact phrase"``, ``OR``, ``NEAR``, ``prefix*``) is
+        accepted; a query that is not valid FTS5 is searched as plain words.
+        """
+        sql = (
+            "SELECT s.id, d.path, s.text, s.start_ms, s.end_ms, bm25(sentences_fts) AS score"
+            " FROM sentences_fts JOIN sentences s ON s.id = sentences_fts.rowid"
+            " JOIN documents d ON d.id = s.doc_id"
+            " WHERE sentences_fts MATCH ? ORDER BY score LIMIT ?"
+        )
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                safe = _fts_query(query)
+                rows = self._db.execute(sql, (safe, limit)).fetchall() if safe else []
+            hits = []
+            for sid, path, text, start_ms, end_ms, score in rows:
+                tokens = self._db.execute(
+                    "SELECT start_ms, end_ms, text FROM tokens WHERE sentence_id = ? ORDER BY idx",
+                    (sid,),
+                ).fetchall()
+                span = _match_span(tokens, query) or (start_ms, end_ms)
+                hits.append(Hit(path, text, span[0], span[1], start_ms, end_ms, score))
+        return hits
+
+
+def index_outputs(paths: Iterable[Path], index_path: Optional[Path] = None) -> int:
+    """Add freshly written transcript files to the index, if one exists.
+
+    The index is opt-in: nothing happens until ``podkeet index`` has created
+    it. Returns how many files were indexed.
+    """
+    index_path = index_path or default_index_path()
+    candidates = [Path(p) for p in paths if Path(p).suffix in SUFFIXES]
+    if not candidates or not index_path.exists():
+        return 0
+    index = SearchIndex(index_path)
+    try:
+        stats = index.update(candidates)
+    finally:
+        index.close()
+    return stats.added + stats.updated
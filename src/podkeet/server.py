@@ -0,0 +1,549 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .batch import BatchItem, prepare_source, transcribe_prepared
+from .ffmpeg_utils import is_url
+from .formats import Formats, parse_formats
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, ModelRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_UPLOAD_BYTES = 4 * 1024**3
+_BLOCK = 1 << 20
+
+# Per-job options a client may set; everything else comes from the server
+JOB_OPTIONS = {
+    "language": str,
+    "chunk_seconds": float,
+    "overlap_seconds": float,
+    "memory_budget_mb": float,
+    "highlight_words": bool,
+    "pcm": bool,
+    "vad": bool,
+}
+
+CONTENT_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass
+class Job:
+    id: str
+    source: str
+    formats: List[str]
+    options: Dict[str, Any] = field(default_factory=dict)
+    upload: Optional[Path] = None
+    status: str = "queued"  # queued | running | done | error
+    created_at: float = field(default_factory=time.time)
+    submitted: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    item: Optional[BatchItem] = None
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        return self.started - self.submitted if self.started is not None else None
+
+    @property
+    def latency_seconds(self) -> Optional[float]:
+        return self.finished - self.submitted if self.finished is not None else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        item = self.item
+        return {
+            "id": self.id,
+            "source": self.upload.name if self.upload is not None else self.source,
+            "status": self.status,
+            "formats": self.formats,
+            "created_at": self.created_at,
+            "queue_seconds": self.queue_seconds,
+            "latency_seconds": self.latency_seconds,
+            "audio_seconds": item.audio_seconds if item else None,
+            "transcribe_seconds": item.transcribe_seconds if item else None,
+            "error": item.error if item else None,
+            "results": (
+                {fmt: f"/jobs/{self.id}/result?format={fmt}" for fmt in self.formats}
+                if self.status == "done"
+                else {}
+            ),
+        }
+
+
+def _percentiles(values: Deque[float], qs: Tuple[int, ...] = (50, 90, 99)) -> Dict[str, Any]:
+    """Nearest-rank percentiles in milliseconds (None when there are no samples)."""
+    ordered = sorted(values)
+    out: Dict[str, Any] = {}
+    for q in qs:
+        if not ordered:
+            out[f"p{q}"] = None
+            continue
+        rank = max(1, -(-q * len(ordered) // 100))  # ceil(q/100 * n)
+        out[f"p{q}"] = round(ordered[rank - 1] * 1000, 1)
+    return out
+
+
+class ServerMetrics:
+    """Counters plus a sliding window of per-job latencies."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.latency: Deque[float] = deque(maxlen=window)
+        self.queue_wait: Deque[float] = deque(maxlen=window)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.audio_seconds = 0.0
+        self.transcribe_seconds = 0.0
+
+    def record(self, job: Job) -> None:
+        if job.latency_seconds is not None:
+            self.latency.append(job.latency_seconds)
+        if job.queue_seconds is not None:
+            self.queue_wait.append(job.queue_seconds)
+        if job.status == "done":
+            self.completed += 1
+            if job.item is not None:
+                self.audio_seconds += job.item.audio_seconds
+                self.transcribe_seconds += job.item.transcribe_seconds or 0.0
+        else:
+            self.failed += 1
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        """Model time per second of audio (below 1.0 is faster than real time)."""
+        if self.audio_seconds <= 0:
+            return None
+        return self.transcribe_seconds / self.audio_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        rtf = self.realtime_factor
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "audio_seconds": self.audio_seconds,
+            "transcribe_seconds": self.transcribe_seconds,
+            "realtime_factor": rtf,
+            "speed": 1.0 / rtf if rtf else None,
+            "latency_ms": _percentiles(self.latency),
+            "queue_wait_ms": _percentiles(self.queue_wait),
+        }
+
+
+class TranscriptionServer:
+    """Local HTTP front-end that keeps one model warm and runs queued jobs.
+
+    Jobs (a file path, a URL or an uploaded file) go through a bounded queue;
+    a full queue answers 503 instead of piling up work. *concurrency* jobs are
+    prepared (downloaded/extracted) at once, but the model itself runs one
+    job at a time. A file path is only accepted under one of *source_dirs*
+    (none by default), so clients cannot make the server read arbitrary files.
+
+    Endpoints: ``POST /jobs``, ``GET /jobs``, ``GET /jobs/{id}``,
+    ``GET /jobs/{id}/result?format=srt``, ``GET /health``, ``GET /metrics``.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        model_name: str = DEFAULT_MODEL,
+        dtype: str = DEFAULT_DTYPE,
+        registry: Optional[ModelRegistry] = None,
+        out_format: Formats = "all",
+        max_queue: int = 16,
+        concurrency: int = 1,
+        max_jobs: int = 1000,
+        max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        source_dirs: Sequence[Path] = (),
+        **options: Any,
+    ) -> None:
+        if max_queue < 1 or concurrency < 1:
+            raise ValueError("max_queue and concurrency must be >= 1")
+        self.out_dir = Path(out_dir)
+        self.model_name = model_name
+        self.dtype = dtype
+        self.registry = registry if registry is not None else get_registry()
+        self.formats = parse_formats(out_format)
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self.max_jobs = max_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.source_dirs = [Path(d).expanduser().resolve() for d in source_dirs]
+        self.options = options
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.metrics = ServerMetrics()
+        self.running = 0
+        self.port: Optional[int] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._model_lock = threading.Lock()
+        self._started = time.monotonic()
+
+    # --- lifecycle -------------------------------------------------------------
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Load the model, start the workers and begin accepting connections."""
+        await asyncio.to_thread(self.registry.get, self.model_name, self.dtype)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Serving %s on http://%s:%s", self.model_name, host, self.port)
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        await self.start(host, port)
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # --- jobs ------------------------------------------------------------------
+
+    def submit(
+        self,
+        source: str,
+        formats: Optional[List[str]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        upload: Optional[Path] = None,
+        job_id: Optional[str] = None,
+    ) -> Job:
+        """Queue a job, or raise `HTTPError` 503 if the queue is full."""
+        assert self._queue is not None, "server not started"
+        job = Job(
+            id=job_id or uuid.uuid4().hex[:12],
+            source=source,
+            formats=formats or self.formats,
+            options=options or {},
+            upload=upload,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise HTTPError(503, "job queue is full", {"Retry-After": "5"}) from None
+        self.metrics.submitted += 1
+        self.jobs[job.id] = job
+        self._prune_jobs()
+        return job
+
+    def _prune_jobs(self) -> None:
+        finished = [j for j in self.jobs.values() if j.status in ("done", "error")]
+        for job in finished[: max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job.id]
+            # Its results can no longer be fetched, so don't keep them on disk
+            shutil.rmtree(self.out_dir / job.id, ignore_errors=True)
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started = time.monotonic()
+            self.running += 1
+            try:
+                job.item = await asyncio.to_thread(self._run_job, job)
+                job.status = "done" if job.item.status == "ok" else "error"
+            except Exception as e:  # pragma: no cover - _run_job captures errors itself
+                job.item = BatchItem(source=job.source, status="error", error=str(e))
+                job.status = "error"
+            finally:
+                job.finished = time.monotonic()
+                self.running -= 1
+                self.metrics.record(job)
+                self._queue.task_done()
+
+    def _run_job(self, job: Job) -> BatchItem:
+        out_dir = self.out_dir / job.id
+        out_dir.mkdir(parents=True, exist_ok=True)
+        options = {**self.options, **job.options}
+        pcm = bool(options.pop("pcm", False))
+        item = BatchItem(source=job.source)
+        t0 = time.perf_counter()
+        try:
+            prepared = prepare_source(job.source, out_dir, pcm=pcm)
+        except Exception as e:
+            item.fail(e)
+        else:
+            # Preparation overlaps across workers; the model runs one job at a time
+            with self._model_lock:
+                transcribe_prepared(
+                    item,
+                    prepared,
+                    out_dir,
+                    model_name=self.model_name,
+                    dtype=self.dtype,
+                    registry=self.registry,
+                    out_format=job.formats,
+                    **options,
+                )
+        finally:
+            if job.upload is not None:
+                shutil.rmtree(job.upload.parent, ignore_errors=True)
+        item.total_seconds = time.perf_counter() - t0
+        return item
+
+    # --- HTTP ------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers = await _read_head(reader)
+                status, body, content_type, extra = await self._route(
+                    method, target, headers, reader
+                )
+            except HTTPError as e:
+                status, content_type, extra = e.status, CONTENT_TYPES["json"], e.headers
+                body = json.dumps({"error": str(e)}).encode("utf-8")
+            except Exception as e:
+                logger.exception("Request failed")
+                status, content_type, extra = 500, CONTENT_TYPES["json"], {}
+                body = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode("utf-8")
+            head = [
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                "Connection: close",
+                *(f"{k}: {v}" for k, v in extra.items()),
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        reader: asyncio.StreamReader,
+    ) -> Tuple[int, bytes, str, Dict[str, str]]:
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+
+        if path == "/health":
+            _allow(method, "GET")
+            return _json(200, self.health())
+        if path == "/metrics":
+            _allow(method, "GET")
+            return _json(200, self.snapshot())
+        if path == "/jobs":
+            _allow(method, "GET", "POST")
+            if method == "GET":
+                return _json(200, {"jobs": [j.as_dict() for j in self.jobs.values()]})
+            job = await self._create_job(headers, query, reader)
+            return _json(202, job.as_dict(), {"Location": f"/jobs/{job.id}"})
+
+        m = re.fullmatch(r"/jobs/([0-9a-f]+)(/result(?:\.(\w+))?)?", path)
+        if m:
+            _allow(method, "GET")
+            job = self.jobs.get(m.group(1))
+            if job is None:
+                raise HTTPError(404, f"unknown job: {m.group(1)}")
+            if not m.group(2):
+                return _json(200, job.as_dict())
+            return self._result(job, m.group(3) or query.get("format") or job.formats[0])
+        raise HTTPError(404, f"no route for {path}")
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "model": self.model_name,
+            "dtype": self.dtype,
+            "model_loaded": (self.model_name, self.dtype) in self.registry,
+            "uptime_seconds": time.monotonic() - self._started,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        depth = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "queue_depth": depth,
+            "queue_capacity": self.max_queue,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "jobs": self.metrics.as_dict(),
+            "model_registry": self.registry.stats.as_dict(),
+        }
+
+    async def _create_job(
+        self, headers: Dict[str, str], query: Dict[str, str], reader: asyncio.StreamReader
+    ) -> Job:
+        length = headers.get("content-length")
+        if length is None:
+            raise HTTPError(411, "Content-Length required")
+        try:
+            size = int(length)
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length") from None
+        ctype = headers.get("content-type", "").split(";")[0].strip().lower()
+
+        if ctype == "application/json":
+            if size > _BLOCK:
+                raise HTTPError(413, "JSON body too large")
+            try:
+                payload = json.loads(await reader.readexactly(size) or b"{}")
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON") from None
+            if not isinstance(payload, dict) or not payload.get("source"):
+                raise HTTPError(400, "'source' (a file path or URL) is required")
+            source = str(payload["source"])
+            self._check_source(source)
+            formats = self._job_formats(payload.get("format"))
+            return self.submit(source, formats, _job_options(payload))
+
+        # Anything else is the raw bytes of an uploaded audio/video file
+        if size > self.max_upload_bytes:
+            raise HTTPError(413, f"upload exceeds {self.max_upload_bytes} bytes")
+        name = Path(unquote(query.get("filename", "upload.bin"))).name or "upload.bin"
+        job_id = uuid.uuid4().hex[:12]
+        upload = self.out_dir / job_id / "upload" / name
+        upload.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # File I/O runs in a thread so a large upload doesn't stall other requests
+            fh = await asyncio.to_thread(open, upload, "wb")
+            try:
+                remaining = size
+                while remaining:
+                    block = await reader.readexactly(min(_BLOCK, remaining))
+                    await asyncio.to_thread(fh.write, block)
+                    remaining -= len(block)
+            finally:
+                await asyncio.to_thread(fh.close)
+            formats = self._job_formats(query.get("format"))
+            return self.submit(str(upload), formats, _job_options(query), upload, job_id)
+        except BaseException:
+            shutil.rmtree(upload.parent, ignore_errors=True)
+            raise
+
+    def _check_source(self, source: str) -> None:
+        """Reject local paths outside *source_dirs*: clients must not read arbitrary files."""
+        if is_url(source):
+            return
+        path = Path(source).expanduser().resolve()
+        if not any(path.is_relative_to(d) for d in self.source_dirs):
+            raise HTTPError(
+                403, "local paths are only accepted under the server's --source-dir folders"
+            )
+
+    def _job_formats(self, value: Any) -> List[str]:
+        if not value:
+            return self.formats
+        try:
+            return parse_formats(value)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+
+    def _result(self, job: Job, fmt: str) -> Tuple[int, bytes, str, Dict[str, str]]:
+        if job.status != "done":
+            detail = f": {job.item.error}" if job.item and job.item.error else ""
+            raise HTTPError(409, f"job is {job.status}{detail}")
+        if fmt not in job.formats:
+            raise HTTPError(404, f"format {fmt!r} was not requested for this job")
+        assert job.item is not None
+        for p in job.item.transcript_paths or [job.item.transcript_path or ""]:
+            path = Path(p)
+            if path.suffix == f".{fmt}" and path.exists():
+                return 200, path.read_bytes(), CONTENT_TYPES[fmt], {}
+        raise HTTPError(404, f"no {fmt} output for this job")
+
+
+def _allow(method: str, *allowed: str) -> None:
+    if method not in allowed:
+        raise HTTPError(405, f"{method} not allowed", {"Allow": ", ".join(allowed)})
+
+
+def _json(
+    status: int, payload: Any, headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, bytes, str, Dict[str, str]]:
+    return status, json.dumps(payload).encode("utf-8"), CONTENT_TYPES["json"], headers or {}
+
+
+def _job_options(values: Dict[str, Any]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    for name, kind in JOB_OPTIONS.items():
+        if name not in values:
+            continue
+        value = values[name]
+        try:
+            if kind is bool and isinstance(value, str):
+                options[name] = value.lower() in ("1", "true", "yes")
+            else:
+                options[name] = kind(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"invalid value for {name}: {value!r}") from None
+    return options
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    try:
+        raw = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(400, "request head too large") from None
+    lines = raw.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    return method.upper(), target, headers
@@ -0,0 +1,223 @@
+"""Sharded transcription of one long recording across a process pool.
+
+The decoded PCM is shared with the workers as a memory-mapped ``.f32`` file,
+so no audio is pickled. Each worker maps it and loads the model once, in the
+pool initializer, then transcribes whole windows (shards) of it. The parent
+merges the offset-corrected results in order with the same seam logic as
+serial chunked runs, so outputs stream and checkpoints work as usual.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import transcriber
+from .checkpoints import ChunkCheckpoint
+from .chunking import (
+    DEFAULT_MEMORY_MODEL,
+    DEFAULT_OVERLAP_SECONDS,
+    MIN_CHUNK_SECONDS,
+    Chunk,
+    ChunkPlan,
+    default_memory_budget_mb,
+    plan_chunks,
+    plan_chunks_at_pauses,
+    plan_transcription,
+)
+from .ffmpeg_utils import SAMPLE_RATE, load_pcm
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, Loader, ModelRegistry
+from .tracing import span
+from .transcript import Transcript
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by `_init_worker`
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(pcm_path: str, model_name: str, dtype: str, loader: Optional[Loader]) -> None:
+    """Pool initializer: map the shared PCM and load the model, once per process."""
+    _worker["samples"] = load_pcm(Path(pcm_path))
+    _worker["dtype"] = dtype
+    _worker["model"] = ModelRegistry(loader=loader).get(model_name, dtype)
+
+
+def _transcribe_shard(start: int, end: int) -> Transcript:
+    """Transcribe samples ``[start, end)`` in a worker; times are shard-relative."""
+    samples = _worker["samples"][start:end]
+    result = transcriber._transcribe_samples(_worker["model"], samples, _worker["dtype"])
+    return Transcript.from_result(result)
+
+
+def plan_shards(
+    num_samples: int,
+    workers: int,
+    *,
+    chunk_seconds: Optional[float] = None,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    worker_memory_mb: Optional[float] = None,
+    pauses: Optional["np.ndarray"] = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> Tuple[List[Chunk], ChunkPlan]:
+    """Windows for *workers* processes and the plan they follow.
+
+    Without *chunk_seconds* the recording is split evenly between the workers
+    (each window also covering the overlap), shortened to the longest window
+    that fits *worker_memory_mb*; the default budget is the usual one (half of
+    RAM) divided by the number of workers. With *pauses*, windows end in a
+    pause as in `plan_chunks_at_pauses`.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    duration = num_samples / sample_rate
+    budget = (
+        worker_memory_mb if worker_memory_mb is not None else default_memory_budget_mb() / workers
+    )
+    if chunk_seconds is None:
+        even = duration / workers + overlap_seconds
+        fits = plan_transcription(duration, budget, overlap_seconds=overlap_seconds)
+        window = min(even, fits.chunk_seconds) if fits.chunked else even
+        window = max(math.ceil(window), MIN_CHUNK_SECONDS, overlap_seconds + 10.0)
+        reason = f"split between {workers} workers"
+        if fits.chunked and fits.chunk_seconds < even:
+            reason += "; windows shortened to fit the per-worker memory budget"
+    else:
+        window = chunk_seconds
+        reason = f"{workers} workers, fixed window length"
+    if pauses is not None:
+        chunks = plan_chunks_at_pauses(num_samples, pauses, window, sample_rate, overlap_seconds)
+    else:
+        chunks = plan_chunks(num_samples, window, sample_rate, overlap_seconds)
+    plan = ChunkPlan(
+        mode="chunked",
+        duration=duration,
+        budget_mb=budget,
+        estimated_peak_mb=DEFAULT_MEMORY_MODEL.peak_mb(min(window, duration)),
+        chunk_seconds=window,
+        overlap_seconds=overlap_seconds,
+        reason=reason,
+        workers=workers,
+    )
+    return chunks, plan
+
+
+@contextmanager
+def _shared_pcm(samples: "np.ndarray") -> Iterator[Path]:
+    """A raw float32 file holding *samples*; memory-mapped input is used as is."""
+    import numpy as np
+
+    filename = getattr(samples, "filename", None)
+    if (
+        isinstance(samples, np.memmap)
+        and filename
+        and samples.offset == 0
+        and samples.dtype == np.float32
+        and samples.flags.c_contiguous
+        and os.path.getsize(filename) == samples.nbytes
+    ):
+        yield Path(filename)
+        return
+    fd, name = tempfile.mkstemp(prefix="podkeet-", suffix=".f32")
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.asarray(samples, dtype=np.float32).tofile(fh)
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def transcribe_sharded(
+    samples: "np.ndarray",
+    workers: int,
+    *,
+    model_name: str = DEFAULT_MODEL,
+    dtype: str = DEFAULT_DTYPE,
+    loader: Optional[Loader] = None,
+    chunk_seconds: Optional[float] = None,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    worker_memory_mb: Optional[float] = None,
+    on_final: Optional[Callable[[Transcript], None]] = None,
+    checkpoint: Optional[ChunkCheckpoint] = None,
+    pauses: Optional["np.ndarray"] = None,
+    start_method: str = "spawn",
+) -> Tuple[Transcript, ChunkPlan]:
+    """Transcribe 16 kHz mono *samples* in windows spread over *workers* processes.
+
+    Windows are planned by `plan_shards` and all submitted up front; results
+    are merged in order as they come in, and *on_final* gets each batch of
+    final sentences like in serial chunked mode. Windows saved in *checkpoint*
+    are reused and new ones saved. Workers are started with *start_method*
+    ("spawn" by default, so they never inherit the parent's MLX state) and
+    load the model with *loader*, which must then be picklable.
+    """
+    with span("chunk.split", workers=workers):
+        chunks, plan = plan_shards(
+            len(samples),
+            workers,
+            chunk_seconds=chunk_seconds,
+            overlap_seconds=overlap_seconds,
+            worker_memory_mb=worker_memory_mb,
+            pauses=pauses,
+        )
+    parts: Dict[int, Transcript] = {}
+    if checkpoint is not None:
+        for idx, chunk in enumerate(chunks):
+            saved = checkpoint.load(chunk)
+            if saved is not None:
+                parts[idx] = saved
+    todo = [idx for idx in range(len(chunks)) if idx not in parts]
+    logger.info(
+        "Transcribing %d windows of %.0fs in %d worker processes",
+        len(todo),
+        plan.chunk_seconds,
+        min(workers, len(todo)),
+    )
+
+    merger = transcriber._SeamMerger(chunks)
+    with _shared_pcm(samples) as pcm_path:
+        pool: Optional[ProcessPoolExecutor] = None
+        futures: Dict[int, Future] = {}
+        if todo:
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(todo)),
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(str(pcm_path), model_name, dtype, loader),
+            )
+            futures = {
+                idx: pool.submit(_transcribe_shard, chunks[idx].start, chunks[idx].end)
+                for idx in todo
+            }
+        try:
+            for idx, chunk in enumerate(chunks):
+                part = parts.get(idx)
+                if part is None:
+                    with span("shard.wait", index=idx, offset=chunk.offset):
+                        local = futures[idx].result()
+                    if checkpoint is not None:
+                        checkpoint.save(chunk, local)
+                    part = local.shift(chunk.offset)
+                with span("merge", index=idx):
+                    final = merger.add(idx, part)
+                if on_final is not None:
+                    on_final(final)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+    if checkpoint is not None and checkpoint.reused:
+        logger.info(
+            "Resumed %d of %d chunks from %s", checkpoint.reused, len(chunks), checkpoint.path
+        )
+    return merger.result(), plan
@@ -0,0 +1,183 @@
+"""Lightweight stage tracing: nested timing spans with peak RSS.
+
+Code marks its stages with ``with span("ffmpeg.decode"):``. Outside of
+`tracing` that is a no-op; inside, every span records its start, duration,
+thread, parent and the process's peak RSS when it ended. A `Tracer`
+aggregates the spans into a per-stage breakdown and writes them in Chrome
+trace-event format (open in ``chrome://tracing`` or https://ui.perfetto.dev).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: Optional["Tracer"] = None
+_local = threading.local()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class Span:
+    name: str
+    start: float  # seconds since the tracer started
+    thread: int
+    thread_name: str
+    depth: int = 0
+    parent: Optional[str] = None
+    seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """Collects finished spans from every thread."""
+
+    def __init__(self) -> None:
+        self.t0 = perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def peak_rss_mb(self) -> Optional[float]:
+        peaks = [s.peak_rss_mb for s in self.spans if s.peak_rss_mb is not None]
+        return max(peaks) if peaks else peak_rss_mb()
+
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        """Total seconds, count and peak RSS per span name, in order of first start.
+
+        Nested stages are reported on their own and also count towards their
+        parents (``chunk.infer`` is part of ``transcribe``).
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        for s in sorted(self.spans, key=lambda s: s.start):
+            st = out.setdefault(s.name, {"seconds": 0.0, "count": 0, "peak_rss_mb": None})
+            st["seconds"] += s.seconds
+            st["count"] += 1
+            if s.peak_rss_mb is not None:
+                st["peak_rss_mb"] = max(st["peak_rss_mb"] or 0.0, s.peak_rss_mb)
+        return out
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The breakdown embedded as ``profile`` in JSON summaries."""
+        return {"peak_rss_mb": self.peak_rss_mb, "stages": self.stages()}
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace events: one complete (``X``) event per span,
+        a ``peak_rss_mb`` counter, and thread names."""
+        pid = os.getpid()
+        spans = sorted(self.spans, key=lambda s: s.start)
+        tids: Dict[int, int] = {}
+        events: List[Dict[str, Any]] = []
+        for s in spans:
+            if s.thread not in tids:
+                tids[s.thread] = len(tids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": tids[s.thread],
+                        "args": {"name": s.thread_name},
+                    }
+                )
+        for s in spans:
+            tid = tids[s.thread]
+            ts = s.start * 1e6
+            args = dict(s.args)
+            if s.peak_rss_mb is not None:
+                args["peak_rss_mb"] = round(s.peak_rss_mb, 1)
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": s.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": ts,
+                    "dur": s.seconds * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+            if s.peak_rss_mb is not None:
+                events.append(
+                    {
+                        "name": "peak_rss_mb",
+                        "ph": "C",
+                        "ts": ts + s.seconds * 1e6,
+                        "pid": pid,
+                        "args": {"MB": round(s.peak_rss_mb, 1)},
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return path
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """Record spans from every thread into *tracer* (a new one by default)."""
+    global _active
+    previous = _active
+    tracer = tracer if tracer is not None else Tracer()
+    _active = tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as stage *name*; a no-op unless `tracing` is active.
+
+    Keyword *args* are attached to the trace event (e.g. chunk index, URL).
+    """
+    tracer = _active
+    if tracer is None:
+        yield None
+        return
+    stack: List[Span] = _local.__dict__.setdefault("stack", [])
+    thread = threading.current_thread()
+    t0 = perf_counter()
+    current = Span(
+        name,
+        start=t0 - tracer.t0,
+        thread=thread.ident or 0,
+        thread_name=thread.name,
+        depth=len(stack),
+        parent=stack[-1].name if stack else None,
+        args=args,
+    )
+    stack.append(current)
+    try:
+        yield current
+    finally:
+        current.seconds = perf_counter() - t0
+        stack.pop()
+        current.peak_rss_mb = peak_rss_mb()
+        tracer.record(current)
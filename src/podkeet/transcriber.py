@@ -1,358 +1,571 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from types import SimpleNamespace
-import subprocess
-import tempfile
-from typing import Tuple
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Any, Dict, List
-
-from rich.console import Console
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cache import TranscriptCache, hash_audio, hash_samples, transcript_key
+from .checkpoints import CheckpointStore, ChunkCheckpoint
+from .chunking import (
+    DEFAULT_CHUNK_SECONDS,
+    DEFAULT_OVERLAP_SECONDS,
+    Chunk,
+    ChunkPlan,
+    plan_chunks,
+    plan_chunks_at_pauses,
+    plan_transcription,
+)
+from .ffmpeg_utils import SAMPLE_RATE, decode_audio, ensure_ffmpeg, probe_duration
+from .formats import FORMATTERS, WORD_FORMATTERS, Formats, _to_txt, parse_formats
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, ModelRegistry, get_registry
+from .tracing import span
+from .transcript import Transcript
+from .vad import TimeMap, VoiceActivity, detect_voice, trim_silence
+from .writers import StreamingOutput, write_atomic
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "console":  # the shared, lazily created `podkeet.console`
+        from . import console
+
+        return console
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _SeamMerger:
+    """Stitch window transcripts as they arrive and release what is final.
+
+    After window ``i`` is merged, every sentence whose tokens all start before
+    window ``i + 1`` begins can no longer be touched by a later seam, so it is
+    handed out (and dropped from the working tail) right away.
+    """
 
-from .ffmpeg_utils import ensure_ffmpeg
+    def __init__(self, chunks: List[Chunk]) -> None:
+        self.chunks = chunks
+        self.pieces: List[Transcript] = []
+        self.tail = Transcript.empty()
 
-console = Console()
+    def add(self, idx: int, part: Transcript) -> Transcript:
+        """Merge the transcript of ``chunks[idx]`` and return the newly final sentences."""
+        if idx == 0 or (not self.pieces and not self.tail.num_sentences):
+            self.tail = part
+        else:
+            lo = self.chunks[idx].offset
+            hi = self.chunks[idx - 1].offset + self.chunks[idx - 1].duration
+            left_cut, right_cut = _seam_cut(self.tail, part, lo, hi)
+            left, _, left_cut_inside = self.tail.select(self.tail.token_start < left_cut)
+            right, right_cut_inside, _ = part.select(part.token_start >= right_cut)
+            # If the seam fell mid-sentence on both sides, stitch that sentence back together
+            self.tail = Transcript.concat(
+                [left, right], join_first=left_cut_inside and right_cut_inside
+            )
 
+        horizon = self.chunks[idx + 1].offset if idx + 1 < len(self.chunks) else float("inf")
+        done = self.tail.settled_before(horizon)
+        final = self.tail.sentence_slice(0, done)
+        self.tail = self.tail.sentence_slice(done, self.tail.num_sentences)
+        self.pieces.append(final)
+        return final
 
-# Local copies of formatters inspired by parakeet_mlx.cli
-# to avoid depending on internal CLI module.
+    def result(self) -> Transcript:
+        merged = Transcript.concat(self.pieces + [self.tail])
+        merged.text = "".join(merged.sentence_text).strip()
+        return merged
 
 
-def _format_timestamp(
-    seconds: float, always_include_hours: bool = True, decimal_marker: str = ","
-) -> str:
-    assert seconds >= 0
-    milliseconds = round(seconds * 1000.0)
-    hours = milliseconds // 3_600_000
-    milliseconds %= 3_600_000
-    minutes = milliseconds // 60_000
-    milliseconds %= 60_000
-    sec = milliseconds // 1_000
-    milliseconds %= 1_000
-    hours_marker = f"{hours:02d}:" if always_include_hours or hours > 0 else ""
-    return f"{hours_marker}{minutes:02d}:{sec:02d}{decimal_marker}{milliseconds:03d}"
-
-
-def _to_txt(result: Any) -> str:
-    return (getattr(result, "text", "") or "").strip()
-
-
-def _to_srt(result: Any, highlight_words: bool = False) -> str:
-    srt_content: List[str] = []
-    entry_index = 1
-    sentences = getattr(result, "sentences", [])
-    if highlight_words:
-        for sentence in sentences:
-            tokens = getattr(sentence, "tokens", [])
-            for i, token in enumerate(tokens):
-                start_time = _format_timestamp(getattr(token, "start", 0.0), decimal_marker=",")
-                end_val = (
-                    getattr(token, "end", 0.0)
-                    if i == len(tokens) - 1
-                    else getattr(tokens[i + 1], "start", 0.0)
-                )
-                end_time = _format_timestamp(end_val, decimal_marker=",")
-                text = ""
-                for j, inner_token in enumerate(tokens):
-                    ttxt = getattr(inner_token, "text", "")
-                    if i == j:
-                        text += ttxt.replace(ttxt.strip(), f"<u>{ttxt.strip()}</u>")
-                    else:
-                        text += ttxt
-                text = text.strip()
-                srt_content.append(str(entry_index))
-                srt_content.append(f"{start_time} --> {end_time}")
-                srt_content.append(text)
-                srt_content.append("")
-                entry_index += 1
-    else:
-        for sentence in sentences:
-            start_time = _format_timestamp(getattr(sentence, "start", 0.0), decimal_marker=",")
-            end_time = _format_timestamp(getattr(sentence, "end", 0.0), decimal_marker=",")
-            text = (getattr(sentence, "text", "") or "").strip()
-            srt_content.append(str(entry_index))
-            srt_content.append(f"{start_time} --> {end_time}")
-            srt_content.append(text)
-            srt_content.append("")
-            entry_index += 1
-    return "\n".join(srt_content)
-
-
-def _to_vtt(result: Any, highlight_words: bool = False) -> str:
-    vtt_content: List[str] = ["WEBVTT", ""]
-    sentences = getattr(result, "sentences", [])
-    if highlight_words:
-        for sentence in sentences:
-            tokens = getattr(sentence, "tokens", [])
-            for i, token in enumerate(tokens):
-                start_time = _format_timestamp(getattr(token, "start", 0.0), decimal_marker=".")
-                end_val = (
-                    getattr(token, "end", 0.0)
-                    if i == len(tokens) - 1
-                    else getattr(tokens[i + 1], "start", 0.0)
-                )
-                end_time = _format_timestamp(end_val, decimal_marker=".")
-                text_line = ""
-                for j, inner_token in enumerate(tokens):
-                    ttxt = getattr(inner_token, "text", "")
-                    if i == j:
-                        text_line += ttxt.replace(ttxt.strip(), f"<b>{ttxt.strip()}</b>")
-                    else:
-                        text_line += ttxt
-                text_line = text_line.strip()
-                vtt_content.append(f"{start_time} --> {end_time}")
-                vtt_content.append(text_line)
-                vtt_content.append("")
-    else:
-        for sentence in sentences:
-            start_time = _format_timestamp(getattr(sentence, "start", 0.0), decimal_marker=".")
-            end_time = _format_timestamp(getattr(sentence, "end", 0.0), decimal_marker=".")
-            text_line = (getattr(sentence, "text", "") or "").strip()
-            vtt_content.append(f"{start_time} --> {end_time}")
-            vtt_content.append(text_line)
-            vtt_content.append("")
-    return "\n".join(vtt_content)
-
-
-def _to_json(result: Any) -> str:
-    import json
-
-    def token_to_dict(tok: Any) -> Dict[str, Any]:
-        return {
-            "text": getattr(tok, "text", ""),
-            "start": round(float(getattr(tok, "start", 0.0)), 3),
-            "end": round(float(getattr(tok, "end", 0.0)), 3),
-            "duration": round(float(getattr(tok, "duration", 0.0)), 3),
-        }
-
-    def sentence_to_dict(sent: Any) -> Dict[str, Any]:
-        tokens = [token_to_dict(t) for t in getattr(sent, "tokens", [])]
-        return {
-            "text": getattr(sent, "text", ""),
-            "start": round(float(getattr(sent, "start", 0.0)), 3),
-            "end": round(float(getattr(sent, "end", 0.0)), 3),
-            "duration": round(float(getattr(sent, "duration", 0.0)), 3),
-            "tokens": tokens,
-        }
-
-    output_dict = {
-        "text": getattr(result, "text", ""),
-        "sentences": [sentence_to_dict(s) for s in getattr(result, "sentences", [])],
-    }
-    return json.dumps(output_dict, indent=2, ensure_ascii=False)
-
-
-def _result_to_dict(result: Any) -> Dict[str, Any]:
-    """Normalize a parakeet result to a plain Python dict we can manipulate."""
-
-    def token_to_dict(tok: Any) -> Dict[str, Any]:
-        return {
-            "text": getattr(tok, "text", ""),
-            "start": float(getattr(tok, "start", 0.0)),
-            "end": float(getattr(tok, "end", 0.0)),
-            "duration": float(getattr(tok, "duration", 0.0)),
-        }
-
-    def sentence_to_dict(sent: Any) -> Dict[str, Any]:
-        tokens = [token_to_dict(t) for t in getattr(sent, "tokens", [])]
-        return {
-            "text": getattr(sent, "text", ""),
-            "start": float(getattr(sent, "start", 0.0)),
-            "end": float(getattr(sent, "end", 0.0)),
-            "duration": float(getattr(sent, "duration", 0.0)),
-            "tokens": tokens,
-        }
-
-    return {
-        "text": getattr(result, "text", ""),
-        "sentences": [sentence_to_dict(s) for s in getattr(result, "sentences", [])],
-    }
-
-
-def _dict_with_offset(d: Dict[str, Any], offset: float) -> Dict[str, Any]:
-    """Apply a time offset (seconds) to all timings in a normalized result dict."""
-    out = {
-        "text": d.get("text", ""),
-        "sentences": [],
-    }
-    for s in d.get("sentences", []):
-        ss = {
-            "text": s.get("text", ""),
-            "start": s.get("start", 0.0) + offset,
-            "end": s.get("end", 0.0) + offset,
-            "duration": s.get("duration", 0.0),
-            "tokens": [],
-        }
-        for t in s.get("tokens", []):
-            ss["tokens"].append(
-                {
-                    "text": t.get("text", ""),
-                    "start": t.get("start", 0.0) + offset,
-                    "end": t.get("end", 0.0) + offset,
-                    "duration": t.get("duration", 0.0),
-                }
-            )
-        out["sentences"].append(ss)
-    return out
+def _merge_transcripts(parts: List[Transcript], chunks: Optional[List[Chunk]] = None) -> Transcript:
+    """Merge transcripts of consecutive windows (already offset) into one.
 
+    Without *chunks* the parts are simply concatenated. With the chunk windows
+    they came from, consecutive parts are stitched at their overlap so each
+    token in the overlap is kept exactly once.
+    """
+    if chunks is None:
+        text = "\n\n".join(t for t in (p.text.strip() for p in parts) if t)
+        return Transcript.concat(parts, text=text)
 
-def _merge_result_dicts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Merge multiple normalized result dicts into one."""
-    text: List[str] = []
-    sentences: List[Dict[str, Any]] = []
-    for p in parts:
-        t = (p.get("text") or "").strip()
-        if t:
-            text.append(t)
-        sentences.extend(p.get("sentences", []))
-    return {"text": "\n\n".join(text), "sentences": sentences}
+    merger = _SeamMerger(chunks)
+    for idx, part in enumerate(parts):
+        merger.add(idx, part)
+    return merger.result()
 
 
-def _ns(obj: Any) -> Any:
-    """Recursively convert dicts to SimpleNamespace to satisfy getattr in formatters."""
-    if isinstance(obj, dict):
-        return SimpleNamespace(**{k: _ns(v) for k, v in obj.items()})
-    if isinstance(obj, list):
-        return [_ns(x) for x in obj]
-    return obj
+def _norm_token(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
 
 
-def _ffprobe_duration(path: Path) -> float:
-    """Get duration in seconds using ffprobe. Returns 0.0 on failure."""
-    try:
-        out = subprocess.check_output(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=nw=1:nk=1",
-                str(path),
-            ],
-            stderr=subprocess.STDOUT,
-        )
-        return float(out.decode("utf-8").strip())
-    except Exception:
-        return 0.0
+def _overlap_tokens(transcript: Transcript, mask: "np.ndarray") -> List[Tuple[float, str]]:
+    idx = mask.nonzero()[0]
+    starts = transcript.token_start[idx].tolist()
+    texts = [transcript.strings[i] for i in transcript.token_ids[idx].tolist()]
+    return [(s, n) for s, n in zip(starts, map(_norm_token, texts)) if n]
 
 
-def _split_audio(input_path: Path, chunk_seconds: int = 600) -> Tuple[List[Path], List[float]]:
-    """Split input audio into roughly chunk_seconds parts using ffmpeg segmenter.
+def _seam_cut(
+    left: Transcript,
+    right: Transcript,
+    lo: float,
+    hi: float,
+    tolerance: float = 0.25,
+) -> Tuple[float, float]:
+    """Pick where to stop the left chunk and start the right one in ``[lo, hi]``.
 
-    Returns list of segment paths and their durations.
+    Tokens both chunks heard in the overlap are matched by text and start time;
+    the match closest to the middle of the overlap (farthest from either
+    chunk's edge) becomes the seam. Without a match, cut at the midpoint.
+    """
+    mid = (lo + hi) / 2
+    if hi <= lo:
+        return lo, lo
+    left_ov = _overlap_tokens(left, left.token_start >= lo)
+    right_ov = _overlap_tokens(right, right.token_start < hi)
+    best: Optional[Tuple[float, float, float]] = None
+    j = 0
+    for a_start, key in left_ov:
+        # Both lists are time-ordered, so skip right tokens that are already too early
+        while j < len(right_ov) and right_ov[j][0] < a_start - tolerance:
+            j += 1
+        k = j
+        while k < len(right_ov) and right_ov[k][0] <= a_start + tolerance:
+            b_start, b_key = right_ov[k]
+            if b_key == key:
+                dist = abs(a_start - mid)
+                if best is None or dist < best[0]:
+                    best = (dist, a_start, b_start)
+                break
+            k += 1
+    if best is None:
+        return mid, mid
+    return best[1], best[2]
+
+
+def _model_sample_rate(model: Any) -> int:
+    config = getattr(model, "preprocessor_config", None)
+    return int(getattr(config, "sample_rate", SAMPLE_RATE))
+
+
+def _transcribe_samples(model: Any, samples: "np.ndarray", dtype: str = DEFAULT_DTYPE) -> Any:
+    """Run the model on decoded mono PCM, skipping parakeet's own file loader."""
+    import mlx.core as mx
+    from parakeet_mlx.audio import get_logmel
+
+    audio = mx.array(samples).astype(getattr(mx, dtype))
+    mel = get_logmel(audio, model.preprocessor_config)
+    return model.generate(mel)[0]
+
+
+def _transcribe_chunked(
+    model: Any,
+    samples: "np.ndarray",
+    dtype: str,
+    chunk_seconds: float,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    on_final: Optional[Callable[[Transcript], None]] = None,
+    checkpoint: Optional[ChunkCheckpoint] = None,
+    pauses: Optional["np.ndarray"] = None,
+) -> Transcript:
+    """Transcribe overlapping windows of *samples* and stitch them at the seams.
+
+    *on_final* is called after every window with the sentences that are now
+    final, in order, so outputs can be written while later windows still run.
+    With a *checkpoint*, each window's result is saved as it completes and
+    windows already saved by an interrupted run are not transcribed again.
+    With *pauses* (sample ranges of silence), windows end inside a pause near
+    *chunk_seconds* instead of at a fixed length.
     """
-    with tempfile.TemporaryDirectory(prefix="podkeet-seg-") as tmpdir:
-        # Keep directory around by copying paths out after segmentation
-        temp_dir = Path(tmpdir)
-        pattern = temp_dir / "part-%05d.mp3"
-        cmd = [
-            "ffmpeg",
-            "-nostdin",
-            "-y",
-            "-i",
-            str(input_path),
-            "-f",
-            "segment",
-            "-segment_time",
-            str(chunk_seconds),
-            "-c",
-            "copy",
-            str(pattern),
-        ]
-        subprocess.run(cmd, check=True, capture_output=True)
-        parts = sorted(temp_dir.glob("part-*.mp3"))
-        # Copy parts to a stable temp folder we return (since TemporaryDirectory will be deleted)
-        # Instead, we move them to a new temp dir that persists for the caller lifetime
-        persist = Path(tempfile.mkdtemp(prefix="podkeet-parts-"))
-        out_paths: List[Path] = []
-        durations: List[float] = []
-        for p in parts:
-            dst = persist / p.name
-            p.replace(dst)
-            out_paths.append(dst)
-            durations.append(_ffprobe_duration(dst))
-        return out_paths, durations
+    rate = _model_sample_rate(model)
+    with span("chunk.split", chunk_seconds=chunk_seconds):
+        if pauses is not None:
+            chunks = plan_chunks_at_pauses(
+                len(samples), pauses, chunk_seconds, rate, overlap_seconds
+            )
+        else:
+            chunks = plan_chunks(len(samples), chunk_seconds, rate, overlap_seconds)
+    merger = _SeamMerger(chunks)
+    for idx, chunk in enumerate(chunks):
+        part = checkpoint.load(chunk) if checkpoint is not None else None
+        if part is None:
+            with span("chunk.infer", index=idx, offset=chunk.offset, seconds=chunk.duration):
+                result = _transcribe_samples(model, chunk.slice(samples), dtype)
+            local = Transcript.from_result(result)
+            if checkpoint is not None:
+                checkpoint.save(chunk, local)
+            part = local.shift(chunk.offset)
+        with span("merge", index=idx):
+            final = merger.add(idx, part)
+        if on_final is not None:
+            on_final(final)
+    if checkpoint is not None and checkpoint.reused:
+        logger.info(
+            "Resumed %d of %d chunks from %s", checkpoint.reused, len(chunks), checkpoint.path
+        )
+    return merger.result()
 
 
 @dataclass
 class TranscriptionResult:
     text: str
     out_path: Path
+    out_paths: List[Path] = field(default_factory=list)
+    plan: Optional[ChunkPlan] = None
+    cached: bool = False
+    vad: Optional[Dict[str, Any]] = None
+
+
+def render_transcript(
+    result: Union[Transcript, Dict[str, Any]],
+    name: str,
+    out_dir: Path,
+    out_format: Formats = "txt",
+    highlight_words: bool = False,
+) -> TranscriptionResult:
+    """Write a transcript (or its dict form) as ``out_dir/name.<format>`` per format.
+
+    Every formatter reads the same result object; with several formats they
+    are rendered and written in parallel. *highlight_words* turns SRT/VTT into
+    one cue per word with that word highlighted.
+    """
+    formats = parse_formats(out_format)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    transcript = Transcript.from_result(result)
+    formatters = {**FORMATTERS, **WORD_FORMATTERS} if highlight_words else FORMATTERS
+
+    def write(fmt: str) -> Path:
+        with span("format", format=fmt):
+            text = formatters[fmt](transcript)
+        with span("write", format=fmt):
+            return write_atomic(out_dir / f"{name}.{fmt}", text)
+
+    if len(formats) == 1:
+        paths = [write(formats[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+            paths = list(pool.map(write, formats))
+    return TranscriptionResult(text=_to_txt(transcript), out_path=paths[0], out_paths=paths)
+
+
+def _cache_key(
+    audio_id: str,
+    model_name: str,
+    dtype: str,
+    chunk_seconds: Optional[float],
+    overlap_seconds: float,
+    vad: bool = False,
+    workers: int = 1,
+) -> str:
+    options: Dict[str, Any] = {"chunk_seconds": chunk_seconds, "overlap_seconds": overlap_seconds}
+    # Only when set, so keys from before these options existed stay valid
+    if vad:
+        options["vad"] = True
+    if workers > 1:  # sharded runs place their windows differently
+        options["workers"] = workers
+    return transcript_key(audio_id, model_name, dtype, **options)
+
+
+def lookup_cached(
+    cache: TranscriptCache,
+    cache_id: str,
+    out_dir: Path,
+    *,
+    model_name: str = DEFAULT_MODEL,
+    out_format: Formats = "txt",
+    dtype: str = DEFAULT_DTYPE,
+    chunk_seconds: Optional[float] = None,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    highlight_words: bool = False,
+    vad: bool = False,
+    workers: int = 1,
+) -> Optional[TranscriptionResult]:
+    """Render a cached transcript for *cache_id* (e.g. a video ID) without any audio.
+
+    Returns None on a miss. Lets URL sources skip the download entirely.
+    """
+    key = _cache_key(cache_id, model_name, dtype, chunk_seconds, overlap_seconds, vad, workers)
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    rendered = render_transcript(entry.result, entry.name, out_dir, out_format, highlight_words)
+    rendered.cached = True
+    return rendered
+
+
+def _infer(
+    model: Any,
+    audio_path: Path,
+    samples: Optional["np.ndarray"],
+    dtype: str,
+    chunk_seconds: Optional[float],
+    overlap_seconds: float,
+    memory_budget_mb: Optional[float],
+    on_final: Optional[Callable[[Transcript], None]] = None,
+    open_checkpoint: Optional[Callable[[], Optional[ChunkCheckpoint]]] = None,
+    pauses: Optional["np.ndarray"] = None,
+) -> Tuple[Transcript, Optional[ChunkPlan]]:
+    """Run the model and return its transcript plus the chunk plan used.
+
+    *open_checkpoint* is only called once a chunked run is decided, so a
+    full-file run never pays for hashing the audio.
+    """
+    plan: Optional[ChunkPlan] = None
+    if chunk_seconds is None:
+        if samples is not None:
+            duration = len(samples) / _model_sample_rate(model)
+        else:
+            duration = probe_duration(audio_path)
+        if duration > 0:
+            with span("plan"):
+                plan = plan_transcription(
+                    duration, memory_budget_mb, overlap_seconds=overlap_seconds
+                )
+            logger.info(
+                "Planned %s transcription of %s (%.1fs, est. %.0f MB of %.0f MB budget%s): %s",
+                plan.mode,
+                audio_path.name,
+                plan.duration,
+                plan.estimated_peak_mb,
+                plan.budget_mb,
+                f", {plan.chunk_seconds:.0f}s windows" if plan.chunked else "",
+                plan.reason,
+            )
+            if plan.chunked:
+                chunk_seconds = plan.chunk_seconds
+
+    if chunk_seconds is not None:
+        if samples is None:
+            samples = decode_audio(audio_path, sample_rate=_model_sample_rate(model))
+        checkpoint = open_checkpoint() if open_checkpoint is not None else None
+        merged = _transcribe_chunked(
+            model, samples, dtype, chunk_seconds, overlap_seconds, on_final, checkpoint, pauses
+        )
+        return merged, plan
+
+    # Try full-file transcription first. If MLX runs out of memory, fall back to chunking.
+    try:
+        with span("infer", source=audio_path.name):
+            if samples is not None:
+                result = _transcribe_samples(model, samples, dtype)
+            else:
+                result = model.transcribe(audio_path)
+        return Transcript.from_result(result), plan
+    except Exception as e:
+        msg = str(e)
+        if "metal::malloc" in msg or "maximum allowed buffer size" in msg:
+            # Fallback: decode once and transcribe zero-copy slices of the PCM buffer
+            if samples is None:
+                samples = decode_audio(audio_path, sample_rate=_model_sample_rate(model))
+            merged = _transcribe_chunked(
+                model,
+                samples,
+                dtype,
+                DEFAULT_CHUNK_SECONDS,
+                overlap_seconds,
+                on_final,
+                open_checkpoint() if open_checkpoint is not None else None,
+                pauses,
+            )
+            return merged, plan
+        raise
 
 
 def transcribe(
     audio_path: Path,
     *,
-    model_name: str = "mlx-community/parakeet-tdt-0.6b-v2",
+    model_name: str = DEFAULT_MODEL,
     language: str = "auto",
     device: str = "auto",
-    out_format: str = "txt",
+    out_format: Formats = "txt",
     out_dir: Optional[Path] = None,
+    dtype: str = DEFAULT_DTYPE,
+    registry: Optional[ModelRegistry] = None,
+    samples: Optional["np.ndarray"] = None,
+    pcm: bool = False,
+    chunk_seconds: Optional[float] = None,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    memory_budget_mb: Optional[float] = None,
+    cache: Optional[TranscriptCache] = None,
+    cache_id: Optional[str] = None,
+    highlight_words: bool = False,
+    checkpoints: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    vad: bool = False,
+    workers: int = 1,
+    worker_memory_mb: Optional[float] = None,
 ) -> TranscriptionResult:
     """Transcribe the given audio file using Parakeet-MLX.
 
-    Downloads the model if missing via from_pretrained and writes output in
-    the requested format.
+    The model is taken from *registry* (the process-wide registry by default),
+    so repeated calls in one process only pay the load cost once. Writes output
+    in every requested format (see `parse_formats`) from a single inference run.
+
+    Pass already-decoded 16 kHz mono float32 *samples* (``audio_path`` then
+    only names the outputs), or set *pcm* to decode any audio/video file in a
+    single ffmpeg pass and hand the array straight to the model.
+
+    With *chunk_seconds* the audio is transcribed in windows of that length
+    that overlap by *overlap_seconds*. Otherwise the duration is checked
+    against *memory_budget_mb* (half of RAM by default) to choose full-file or
+    chunked mode up front; an MLX out-of-memory error still falls back to
+    10-minute windows if the estimate was off.
+
+    With a *cache*, results are looked up by *cache_id* (e.g. a video ID) or a
+    hash of the audio, plus the model and options; a hit skips the model.
+    Without a *cache_id* the audio is decoded to PCM up front, as with *pcm*,
+    and the same samples are hashed and transcribed.
+
+    *highlight_words* writes word-level SRT/VTT (one cue per word, the current
+    word underlined or bold) instead of one cue per sentence.
+
+    Outputs are written to ``<name>.<format>.partial`` and renamed when
+    complete. In chunked mode each window's final sentences are appended as
+    soon as they are known, so long transcripts can be tailed mid-run.
+
+    With *checkpoints*, chunked runs save every finished window under a key of
+    the audio hash and model; *resume* reuses the windows an interrupted run
+    already finished. Checkpoints are removed once the run completes.
+
+    With *vad*, the audio is decoded to PCM and silences longer than a second
+    are cut out before inference (see `podkeet.vad`); timestamps are mapped
+    back to the original timeline, and chunk boundaries are placed in pauses.
+
+    With *workers* > 1, the decoded audio is split into windows that a pool of
+    that many processes transcribes in parallel, each with its own copy of the
+    model (see `podkeet.sharding`). *worker_memory_mb* is each worker's memory
+    budget for choosing the window length (default: *memory_budget_mb*, or
+    half of RAM, divided between the workers).
     """
+    formats = parse_formats(out_format)  # fail fast, before any inference
     ensure_ffmpeg()  # required by parakeet_mlx.audio.load_audio
 
-    try:
-        from parakeet_mlx import from_pretrained
-        from mlx.core import bfloat16
-    except Exception as e:  # pragma: no cover
-        raise RuntimeError(
-            "parakeet-mlx is not installed. Install it with:\n"
-            "  uv pip install parakeet-mlx\n"
-            "or\n"
-            "  pip install parakeet-mlx"
-        ) from e
-
-    # Load model (dtype bfloat16 by default; parakeet-mlx uses MLX backend)
-    model = from_pretrained(model_name, dtype=bfloat16)
-
-    # Ensure output path
-    if out_dir:
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / (audio_path.stem + f".{out_format}")
+    # The cache key is a hash of the decoded audio, so decode once and reuse it
+    hash_for_cache = cache is not None and cache_id is None
+    if samples is None and (pcm or vad or workers > 1 or hash_for_cache):
+        samples = decode_audio(audio_path, sample_rate=SAMPLE_RATE)
+
+    source_samples = samples  # before any silence is cut
+    audio_id: Optional[str] = cache_id
+
+    def identify() -> str:
+        nonlocal audio_id
+        if audio_id is None:
+            with span("cache.hash"):
+                audio_id = (
+                    hash_samples(source_samples)
+                    if source_samples is not None
+                    else hash_audio(audio_path, SAMPLE_RATE)
+                )
+        return audio_id
+
+    key: Optional[str] = None
+    entry = None
+    if cache is not None:
+        audio_id = identify()
+        key = _cache_key(audio_id, model_name, dtype, chunk_seconds, overlap_seconds, vad, workers)
+        with span("cache.lookup"):
+            entry = cache.get(key)
+
+    plan: Optional[ChunkPlan] = None
+    stream: Optional[StreamingOutput] = None
+    voice: Optional[VoiceActivity] = None
+    out_dir = out_dir or audio_path.parent
+    if entry is not None:
+        transcript = Transcript.from_dict(entry.result)
     else:
-        out_path = audio_path.with_suffix(f".{out_format}")
+        registry = registry if registry is not None else get_registry()
+        stream = StreamingOutput(out_dir, audio_path.stem, formats, highlight_words)
+
+        time_map: Optional[TimeMap] = None
+        pauses: Optional["np.ndarray"] = None
+        if vad and samples is not None:
+            with span("vad"):
+                voice = detect_voice(samples, SAMPLE_RATE)
+                trimmed = trim_silence(samples, voice)
+            samples, time_map, pauses = trimmed.samples, trimmed.time_map, trimmed.pauses
+            logger.info(
+                "Voice activity in %s: %.1fs of speech in %d regions, %.1fs of silence removed",
+                audio_path.name,
+                voice.speech_seconds,
+                len(voice.regions),
+                voice.total_seconds - voice.speech_seconds,
+            )
 
-    # Try full-file transcription first. If MLX runs out of memory, fall back to chunking.
-    try:
-        result = model.transcribe(audio_path)
-    except Exception as e:
-        msg = str(e)
-        if "metal::malloc" in msg or "maximum allowed buffer size" in msg:
-            # Fallback: chunked transcription
-            parts, durations = _split_audio(audio_path, chunk_seconds=600)
-            results: List[Dict[str, Any]] = []
-            offset = 0.0
-            for idx, part in enumerate(parts):
-                r = model.transcribe(part)
-                rd = _result_to_dict(r)
-                results.append(_dict_with_offset(rd, offset))
-                # advance offset by exact segment duration if available
-                seg_dur = durations[idx] if idx < len(durations) else 0.0
-                offset += seg_dur if seg_dur > 0 else 600.0
-            merged = _merge_result_dicts(results)
-            result = _ns(merged)
-            # chunked fallback executed
-        else:
+        def on_final(piece: Transcript) -> None:
+            with span("write", sentences=piece.num_sentences):
+                stream.write(time_map.apply(piece) if time_map is not None else piece)
+
+        checkpoint: Optional[ChunkCheckpoint] = None
+
+        def open_checkpoint() -> Optional[ChunkCheckpoint]:
+            nonlocal checkpoint
+            if checkpoint is None and checkpoints is not None:
+                # Trimmed audio has other sample offsets, so its windows are kept apart
+                checkpoint_id = f"{identify()}+vad" if vad else identify()
+                checkpoint = checkpoints.open(checkpoint_id, model_name, dtype, resume=resume)
+            return checkpoint
+
+        try:
+            if workers > 1 and samples is not None:
+                from .sharding import transcribe_sharded
+
+                if worker_memory_mb is None and memory_budget_mb is not None:
+                    worker_memory_mb = memory_budget_mb / workers
+                transcript, plan = transcribe_sharded(
+                    samples,
+                    workers,
+                    model_name=model_name,
+                    dtype=dtype,
+                    loader=registry.loader,
+                    chunk_seconds=chunk_seconds,
+                    overlap_seconds=overlap_seconds,
+                    worker_memory_mb=worker_memory_mb,
+                    on_final=on_final,
+                    checkpoint=open_checkpoint(),
+                    pauses=pauses,
+                )
+            else:
+                # Load model (dtype bfloat16 by default; parakeet-mlx uses MLX backend)
+                model = registry.get(model_name, dtype)
+                transcript, plan = _infer(
+                    model,
+                    audio_path,
+                    samples,
+                    dtype,
+                    chunk_seconds,
+                    overlap_seconds,
+                    memory_budget_mb,
+                    on_final=on_final,
+                    open_checkpoint=open_checkpoint,
+                    pauses=pauses,
+                )
+        except BaseException:
+            stream.abort()  # keep whatever was written as .partial files
             raise
+        if time_map is not None:
+            transcript = time_map.apply(transcript)
+        if checkpoint is not None:
+            checkpoint.clear()
+        if cache is not None and key is not None:
+            with span("cache.store"):
+                cache.put(
+                    key,
+                    transcript.to_dict(),
+                    name=audio_path.stem,
+                    meta={"model": model_name, "dtype": dtype, "source": str(audio_path)},
+                )
 
-    formatters = {
-        "txt": _to_txt,
-        "srt": lambda r: _to_srt(r, highlight_words=False),
-        "vtt": lambda r: _to_vtt(r, highlight_words=False),
-        "json": _to_json,
-    }
-    if out_format not in formatters:
-        raise ValueError(f"Unsupported format: {out_format}. Choose from txt|srt|vtt|json")
-
-    content = formatters[out_format](result)
-    out_path.write_text(content, encoding="utf-8")
-
-    return TranscriptionResult(text=_to_txt(result), out_path=out_path)
+    if stream is not None and stream.started:
+        with span("write", final=True):
+            paths = stream.close(transcript)
+        rendered = TranscriptionResult(text=_to_txt(transcript), out_path=paths[0], out_paths=paths)
+    else:
+        rendered = render_transcript(transcript, audio_path.stem, out_dir, formats, highlight_words)
+    rendered.plan = plan
+    rendered.cached = entry is not None
+    rendered.vad = voice.as_dict() if voice is not None else None
+    return rendered
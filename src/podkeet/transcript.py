@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _get(obj: Any, name: str, default: Any) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+@dataclass
+class Transcript:
+    """A transcription result stored as flat arrays rather than nested objects.
+
+    Token texts are interned in the ``strings`` table and referenced by
+    ``token_ids``; token timings are contiguous float64 arrays. Sentence ``j``
+    owns tokens ``bounds[j]:bounds[j + 1]`` and keeps its own text and timings,
+    so a multi-hour transcript is a handful of arrays instead of hundreds of
+    thousands of small Python objects.
+    """
+
+    text: str
+    strings: List[str]
+    token_ids: np.ndarray
+    token_start: np.ndarray
+    token_end: np.ndarray
+    token_duration: np.ndarray
+    bounds: np.ndarray
+    sentence_text: List[str]
+    sentence_start: np.ndarray
+    sentence_end: np.ndarray
+    sentence_duration: np.ndarray
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.token_ids)
+
+    @property
+    def num_sentences(self) -> int:
+        return len(self.sentence_text)
+
+    @classmethod
+    def empty(cls, text: str = "") -> "Transcript":
+        return cls._build(text, [], [], [], [], [], [0], [], [], [], [])
+
+    @classmethod
+    def _build(
+        cls,
+        text: str,
+        strings: List[str],
+        ids: Sequence[int],
+        t_start: Sequence[float],
+        t_end: Sequence[float],
+        t_dur: Sequence[float],
+        bounds: Sequence[int],
+        s_text: List[str],
+        s_start: Sequence[float],
+        s_end: Sequence[float],
+        s_dur: Sequence[float],
+    ) -> "Transcript":
+        return cls(
+            text=text,
+            strings=strings,
+            token_ids=np.asarray(ids, dtype=np.int32),
+            token_start=np.asarray(t_start, dtype=np.float64),
+            token_end=np.asarray(t_end, dtype=np.float64),
+            token_duration=np.asarray(t_dur, dtype=np.float64),
+            bounds=np.asarray(bounds, dtype=np.int64),
+            sentence_text=s_text,
+            sentence_start=np.asarray(s_start, dtype=np.float64),
+            sentence_end=np.asarray(s_end, dtype=np.float64),
+            sentence_duration=np.asarray(s_dur, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_result(cls, result: Any) -> "Transcript":
+        """Build from a parakeet result, a normalized dict, or anything shaped alike."""
+        if isinstance(result, cls):
+            return result
+        index: Dict[str, int] = {}
+        strings: List[str] = []
+        ids: List[int] = []
+        t_start: List[float] = []
+        t_end: List[float] = []
+        t_dur: List[float] = []
+        bounds = [0]
+        s_text: List[str] = []
+        s_start: List[float] = []
+        s_end: List[float] = []
+        s_dur: List[float] = []
+        for sent in _get(result, "sentences", None) or []:
+            for tok in _get(sent, "tokens", None) or []:
+                txt = _get(tok, "text", "") or ""
+                i = index.get(txt)
+                if i is None:
+                    i = index[txt] = len(strings)
+                    strings.append(txt)
+                ids.append(i)
+                t_start.append(float(_get(tok, "start", 0.0)))
+                t_end.append(float(_get(tok, "end", 0.0)))
+                t_dur.append(float(_get(tok, "duration", 0.0)))
+            bounds.append(len(ids))
+            s_text.append(_get(sent, "text", "") or "")
+            s_start.append(float(_get(sent, "start", 0.0)))
+            s_end.append(float(_get(sent, "end", 0.0)))
+            s_dur.append(float(_get(sent, "duration", 0.0)))
+        return cls._build(
+            _get(result, "text", "") or "",
+            strings,
+            ids,
+            t_start,
+            t_end,
+            t_dur,
+            bounds,
+            s_text,
+            s_start,
+            s_end,
+            s_dur,
+        )
+
+    from_dict = from_result
+
+    def token_texts(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        strings = self.strings
+        return [strings[i] for i in self.token_ids[start:stop].tolist()]
+
+    def sentences(self) -> Iterator[Tuple[str, float, float, int, int]]:
+        """Yield ``(text, start, end, first_token, stop_token)`` per sentence."""
+        bounds = self.bounds.tolist()
+        yield from zip(
+            self.sentence_text,
+            self.sentence_start.tolist(),
+            self.sentence_end.tolist(),
+            bounds[:-1],
+            bounds[1:],
+        )
+
+    def sentence_slice(self, start: int, stop: int) -> "Transcript":
+        """Sentences ``start:stop`` as a transcript of views into these arrays."""
+        a, b = int(self.bounds[start]), int(self.bounds[stop])
+        return Transcript(
+            text="",
+            strings=self.strings,
+            token_ids=self.token_ids[a:b],
+            token_start=self.token_start[a:b],
+            token_end=self.token_end[a:b],
+            token_duration=self.token_duration[a:b],
+            bounds=self.bounds[start : stop + 1] - a,
+            sentence_text=self.sentence_text[start:stop],
+            sentence_start=self.sentence_start[start:stop],
+            sentence_end=self.sentence_end[start:stop],
+            sentence_duration=self.sentence_duration[start:stop],
+        )
+
+    def settled_before(self, horizon: float) -> int:
+        """How many leading sentences have every token starting before *horizon*."""
+        if not self.num_tokens:
+            return self.num_sentences
+        counts = np.diff(self.bounds)
+        last_start = self.token_start[np.maximum(self.bounds[1:] - 1, 0)]
+        pending = np.flatnonzero((counts > 0) & (last_start >= horizon))
+        return int(pending[0]) if len(pending) else self.num_sentences
+
+    def to_dict(self, ndigits: Optional[int] = None) -> Dict[str, Any]:
+        """The nested ``{"text", "sentences": [{..., "tokens": [...]}]}`` form.
+
+        This is what the cache stores and the JSON output is built from; with
+        *ndigits* every timing is rounded.
+        """
+
+        def floats(arr: np.ndarray) -> List[float]:
+            values = arr.tolist()
+            return values if ndigits is None else [round(v, ndigits) for v in values]
+
+        texts = self.token_texts()
+        starts, ends, durs = (
+            floats(self.token_start),
+            floats(self.token_end),
+            floats(self.token_duration),
+        )
+        tokens = [
+            {"text": t, "start": s, "end": e, "duration": d}
+            for t, s, e, d in zip(texts, starts, ends, durs)
+        ]
+        bounds = self.bounds.tolist()
+        sentences = [
+            {"text": txt, "start": s, "end": e, "duration": d, "tokens": tokens[a:b]}
+            for txt, s, e, d, a, b in zip(
+                self.sentence_text,
+                floats(self.sentence_start),
+                floats(self.sentence_end),
+                floats(self.sentence_duration),
+                bounds[:-1],
+                bounds[1:],
+            )
+        ]
+        return {"text": self.text, "sentences": sentences}
+
+    def shift(self, offset: float) -> "Transcript":
+        """Copy with every timing moved by *offset* seconds (one add per array)."""
+        return Transcript(
+            text=self.text,
+            strings=self.strings,
+            token_ids=self.token_ids,
+            token_start=self.token_start + offset,
+            token_end=self.token_end + offset,
+            token_duration=self.token_duration,
+            bounds=self.bounds,
+            sentence_text=self.sentence_text,
+            sentence_start=self.sentence_start + offset,
+            sentence_end=self.sentence_end + offset,
+            sentence_duration=self.sentence_duration,
+        )
+
+    def select(self, keep: np.ndarray) -> Tuple["Transcript", bool, bool]:
+        """Keep only the tokens where *keep* is true.
+
+        Sentences left without tokens are dropped; sentences that lost some are
+        rebuilt from the survivors. Returns the result and whether its first
+        and last sentence were cut partway through.
+        """
+        keep = np.asarray(keep, dtype=bool)
+        counts = np.diff(self.bounds)
+        owner = np.repeat(np.arange(len(counts)), counts)
+        kept = np.bincount(owner[keep], minlength=len(counts))
+        survive = kept > 0
+        rebuilt = survive & (kept < counts)
+
+        token_start = self.token_start[keep]
+        token_end = self.token_end[keep]
+        token_ids = self.token_ids[keep]
+        bounds = np.concatenate(([0], np.cumsum(kept[survive])))
+        s_start = self.sentence_start[survive]
+        s_end = self.sentence_end[survive]
+        s_dur = self.sentence_duration[survive]
+        s_text = [t for t, ok in zip(self.sentence_text, survive.tolist()) if ok]
+        for j in np.flatnonzero(rebuilt[survive]).tolist():
+            a, b = int(bounds[j]), int(bounds[j + 1])
+            s_text[j] = "".join(self.strings[i] for i in token_ids[a:b].tolist())
+            s_start[j] = token_start[a]
+            s_end[j] = token_end[b - 1]
+            s_dur[j] = s_end[j] - s_start[j]
+
+        flags = rebuilt[survive]
+        out = Transcript(
+            text=self.text,
+            strings=self.strings,
+            token_ids=token_ids,
+            token_start=token_start,
+            token_end=token_end,
+            token_duration=self.token_duration[keep],
+            bounds=bounds.astype(np.int64),
+            sentence_text=s_text,
+            sentence_start=s_start,
+            sentence_end=s_end,
+            sentence_duration=s_dur,
+        )
+        if not len(flags):
+            return out, False, False
+        return out, bool(flags[0]), bool(flags[-1])
+
+    @classmethod
+    def concat(
+        cls, parts: Sequence["Transcript"], text: str = "", join_first: bool = False
+    ) -> "Transcript":
+        """Concatenate transcripts, merging their string tables.
+
+        With *join_first* (two parts only), the last sentence of the first part
+        and the first sentence of the second are fused into one.
+        """
+        index: Dict[str, int] = {}
+        strings: List[str] = []
+        ids = []
+        bounds = [np.zeros(1, dtype=np.int64)]
+        total = 0
+        for p in parts:
+            remap = []
+            for s in p.strings:
+                i = index.get(s)
+                if i is None:
+                    i = index[s] = len(strings)
+                    strings.append(s)
+                remap.append(i)
+            ids.append(np.asarray(remap, dtype=np.int32)[p.token_ids])
+            bounds.append(p.bounds[1:] + total)
+            total += p.num_tokens
+        out = cls(
+            text=text,
+            strings=strings,
+            token_ids=np.concatenate(ids).astype(np.int32) if ids else np.zeros(0, np.int32),
+            token_start=np.concatenate([p.token_start for p in parts] or [np.zeros(0)]),
+            token_end=np.concatenate([p.token_end for p in parts] or [np.zeros(0)]),
+            token_duration=np.concatenate([p.token_duration for p in parts] or [np.zeros(0)]),
+            bounds=np.concatenate(bounds),
+            sentence_text=[t for p in parts for t in p.sentence_text],
+            sentence_start=np.concatenate([p.sentence_start for p in parts] or [np.zeros(0)]),
+            sentence_end=np.concatenate([p.sentence_end for p in parts] or [np.zeros(0)]),
+            sentence_duration=np.concatenate([p.sentence_duration for p in parts] or [np.zeros(0)]),
+        )
+        if join_first and len(parts) == 2 and parts[0].num_sentences and parts[1].num_sentences:
+            j = parts[0].num_sentences - 1
+            out.sentence_text[j : j + 2] = ["".join(out.sentence_text[j : j + 2])]
+            out.bounds = np.delete(out.bounds, j + 1)
+            out.sentence_start = np.delete(out.sentence_start, j + 1)
+            out.sentence_end = np.delete(out.sentence_end, j)
+            out.sentence_duration = np.delete(out.sentence_duration, j + 1)
+            out.sentence_duration[j] = out.sentence_end[j] - out.sentence_start[j]
+        return out
@@ -0,0 +1,211 @@
+"""Energy-based voice activity detection over decoded PCM.
+
+`detect_voice` finds speech regions from per-frame RMS energy against an
+adaptive threshold (the recording's noise floor plus a margin). `trim_silence`
+drops the long silences between them before inference and returns a
+`TimeMap` that moves timestamps on the trimmed audio back to the original
+timeline. Everything is vectorized NumPy; energies are computed in blocks,
+so scanning hours of memory-mapped audio needs no full-size temporaries.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import numpy as np
+
+from .ffmpeg_utils import SAMPLE_RATE
+from .transcript import Transcript
+
+FRAME_SECONDS = 0.03
+_BLOCK_FRAMES = 8192  # frames squared at a time (~30 MB of float64 at 16 kHz)
+
+
+def frame_energy_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    """RMS energy in dBFS of consecutive *frame*-sample frames (a short tail is its own frame)."""
+    n = len(samples)
+    full = n // frame
+    out = np.empty(full + (1 if n % frame else 0), dtype=np.float64)
+    for first in range(0, full, _BLOCK_FRAMES):
+        last = min(first + _BLOCK_FRAMES, full)
+        block = np.asarray(samples[first * frame : last * frame], dtype=np.float64)
+        block = block.reshape(-1, frame)
+        out[first:last] = np.einsum("ij,ij->i", block, block) / frame
+    if n % frame:
+        tail = np.asarray(samples[full * frame :], dtype=np.float64)
+        out[-1] = np.dot(tail, tail) / len(tail)
+    return 10.0 * np.log10(out + 1e-12)
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """``[start, end)`` index pairs of the runs of True in *mask*, shape ``(n, 2)``."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def _bridge(runs: np.ndarray, min_gap: int) -> np.ndarray:
+    """Merge runs separated by fewer than *min_gap* positions."""
+    if len(runs) < 2:
+        return runs
+    keep = np.concatenate(([True], runs[1:, 0] - runs[:-1, 1] >= min_gap))
+    group = np.cumsum(keep) - 1
+    out = np.empty((int(group[-1]) + 1, 2), dtype=runs.dtype)
+    out[:, 0] = runs[keep, 0]
+    out[:, 1] = np.maximum.reduceat(runs[:, 1], np.flatnonzero(keep))
+    return out
+
+
+@dataclass
+class VoiceActivity:
+    """Speech regions and pauses of a recording, as ``(n, 2)`` sample ranges."""
+
+    regions: np.ndarray  # speech, short gaps bridged, padded
+    pauses: np.ndarray  # every quiet stretch of at least min_pause_seconds
+    num_samples: int
+    sample_rate: int = SAMPLE_RATE
+    threshold_db: float = 0.0
+
+    @property
+    def speech_seconds(self) -> float:
+        return float((self.regions[:, 1] - self.regions[:, 0]).sum()) / self.sample_rate
+
+    @property
+    def total_seconds(self) -> float:
+        return self.num_samples / self.sample_rate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": self.total_seconds,
+            "speech_seconds": self.speech_seconds,
+            "removed_seconds": self.total_seconds - self.speech_seconds,
+            "regions": len(self.regions),
+            "threshold_db": self.threshold_db,
+        }
+
+
+def detect_voice(
+    samples: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    *,
+    margin_db: float = 10.0,
+    floor_db: float = -55.0,
+    min_silence_seconds: float = 1.0,
+    min_pause_seconds: float = 0.3,
+    min_speech_seconds: float = 0.1,
+    pad_seconds: float = 0.2,
+) -> VoiceActivity:
+    """Find speech in mono PCM by frame energy.
+
+    A frame is speech when its energy is *margin_db* above the noise floor
+    (10th percentile of frame energies), or *margin_db* below the loud level
+    (95th percentile) if that is lower, and above *floor_db*. Bursts shorter
+    than *min_speech_seconds* are ignored, gaps shorter than
+    *min_silence_seconds* are bridged, and each region is padded by
+    *pad_seconds* so word onsets and tails are kept. Quiet stretches of at
+    least *min_pause_seconds* are reported as pauses, the places to cut.
+    """
+    frame = max(int(round(FRAME_SECONDS * sample_rate)), 1)
+    n = len(samples)
+    if n == 0:
+        empty = np.zeros((0, 2), dtype=np.int64)
+        return VoiceActivity(empty, empty, 0, sample_rate, floor_db)
+
+    energy = frame_energy_db(samples, frame)
+    quiet, loud = np.percentile(energy, [10, 95])
+    # Below the loud level too, so a recording without any silence is all speech
+    threshold = max(min(quiet + margin_db, loud - margin_db), floor_db)
+    speech = energy > threshold
+
+    frame_s = frame / sample_rate
+    runs = _runs(speech)
+    runs = runs[runs[:, 1] - runs[:, 0] >= max(1, round(min_speech_seconds / frame_s))]
+    pauses = _runs(~speech)
+    pauses = pauses[pauses[:, 1] - pauses[:, 0] >= max(1, round(min_pause_seconds / frame_s))]
+
+    regions = _bridge(runs, max(1, round(min_silence_seconds / frame_s))) * frame
+    pad = int(round(pad_seconds * sample_rate))
+    regions = np.clip(regions + [-pad, pad], 0, n)
+    regions = _bridge(regions, 1)
+    return VoiceActivity(
+        regions.astype(np.int64),
+        np.clip(pauses * frame, 0, n).astype(np.int64),
+        n,
+        sample_rate,
+        float(threshold),
+    )
+
+
+@dataclass
+class TimeMap:
+    """Where each kept segment of the trimmed audio sits on the original timeline."""
+
+    trimmed_start: np.ndarray  # seconds, segment starts in the trimmed audio
+    original_start: np.ndarray  # seconds, the same starts in the original audio
+
+    def to_original(self, times: np.ndarray, end: bool = False) -> np.ndarray:
+        """Map times on the trimmed audio back to the original.
+
+        With *end*, a time exactly on a segment boundary belongs to the
+        segment before it (an end time, not a start).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        idx = np.searchsorted(self.trimmed_start, times, side="left" if end else "right") - 1
+        idx = np.clip(idx, 0, len(self.trimmed_start) - 1)
+        return times - self.trimmed_start[idx] + self.original_start[idx]
+
+    def apply(self, transcript: Transcript) -> Transcript:
+        """*transcript* with every timestamp moved to the original timeline."""
+        token_start = self.to_original(transcript.token_start)
+        token_end = self.to_original(transcript.token_end, end=True)
+        sentence_start = self.to_original(transcript.sentence_start)
+        sentence_end = self.to_original(transcript.sentence_end, end=True)
+        return Transcript(
+            text=transcript.text,
+            strings=transcript.strings,
+            token_ids=transcript.token_ids,
+            token_start=token_start,
+            token_end=token_end,
+            token_duration=token_end - token_start,
+            bounds=transcript.bounds,
+            sentence_text=transcript.sentence_text,
+            sentence_start=sentence_start,
+            sentence_end=sentence_end,
+            sentence_duration=sentence_end - sentence_start,
+        )
+
+
+@dataclass
+class TrimmedAudio:
+    samples: np.ndarray
+    time_map: TimeMap
+    pauses: np.ndarray  # sample ranges on the trimmed audio, seams included
+
+
+def trim_silence(samples: np.ndarray, activity: VoiceActivity) -> TrimmedAudio:
+    """Concatenate the speech regions of *samples*, dropping the silences between them.
+
+    Pauses inside kept regions are carried over to the trimmed timeline, and
+    every seam where a silence was removed becomes a zero-length pause, so
+    chunk boundaries can be placed there.
+    """
+    regions = activity.regions
+    rate = activity.sample_rate
+    if len(regions) == 0:
+        regions = np.array([[0, len(samples)]], dtype=np.int64)
+    lengths = regions[:, 1] - regions[:, 0]
+    trimmed_start = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    out = np.concatenate([np.asarray(samples[a:b]) for a, b in regions.tolist()])
+
+    # Pauses that lie inside one kept region, shifted onto the trimmed timeline
+    pauses = activity.pauses
+    seg = np.searchsorted(regions[:, 0], pauses[:, 0], side="right") - 1
+    inside = (seg >= 0) & (pauses[:, 1] <= regions[np.maximum(seg, 0), 1])
+    shift = (trimmed_start - regions[:, 0])[seg[inside]]
+    moved = pauses[inside] + shift[:, None]
+    seams = np.repeat(trimmed_start[1:, None], 2, axis=1)
+    all_pauses = np.concatenate((moved, seams)).astype(np.int64)
+    all_pauses = all_pauses[np.argsort(all_pauses[:, 0], kind="stable")]
+
+    time_map = TimeMap(trimmed_start / rate, regions[:, 0] / rate)
+    return TrimmedAudio(out, time_map, all_pauses)
@@ -0,0 +1,209 @@
+"""Watch a directory and transcribe recordings as they land in it.
+
+The directory is polled; a media file is picked up once its size and mtime
+have not changed for *settle_seconds*, so half-copied files are left alone.
+Each file then goes through `batch.process_source` (video is extracted
+first) with the model kept warm. Outcomes go to the job `Ledger`, so a
+restart skips what is already done, a failed file is retried up to
+*max_attempts* times, and a file whose content changes is transcribed again.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .batch import BatchItem, process_source
+from .ffmpeg_utils import is_media_file
+from .ledger import JobSpec, Ledger, job_options
+from .models import DEFAULT_DTYPE, DEFAULT_MODEL, ModelRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 2.0
+SETTLE_SECONDS = 5.0
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class _Pending:
+    size: int
+    mtime_ns: int
+    since: float  # monotonic time the file was first seen at this size and mtime
+
+
+class DirectoryWatcher:
+    """Find settled, unprocessed media files in *directory* and transcribe them."""
+
+    def __init__(
+        self,
+        directory: Path,
+        out_dir: Path,
+        ledger: Ledger,
+        *,
+        model_name: str = DEFAULT_MODEL,
+        dtype: str = DEFAULT_DTYPE,
+        registry: Optional[ModelRegistry] = None,
+        settle_seconds: float = SETTLE_SECONDS,
+        recursive: bool = False,
+        max_attempts: int = MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.monotonic,
+        **options: Any,
+    ) -> None:
+        """Extra *options* are forwarded to `batch.process_source`."""
+        self.directory = directory.resolve()
+        self.out_dir = out_dir.resolve()
+        self.ledger = ledger
+        self.model_name = model_name
+        self.dtype = dtype
+        self.registry = registry if registry is not None else get_registry()
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.options = options
+        self.job_options = job_options(self.out_dir, {"dtype": dtype, **options})
+        self.pending: Dict[Path, _Pending] = {}
+        self.handled: Dict[Path, Tuple[int, int]] = {}  # done or given up, by size and mtime
+
+    def _candidates(self) -> List[Path]:
+        paths = self.directory.rglob("*") if self.recursive else self.directory.iterdir()
+        # Outputs written inside the watched tree (e.g. audio extracted from video) are skipped
+        skip = self.out_dir if self.out_dir != self.directory else None
+        return sorted(
+            p
+            for p in paths
+            if not p.name.startswith(".")  # editors' and rsync's temporary files
+            and is_media_file(p)
+            and p.is_file()
+            and (skip is None or skip not in p.parents)
+        )
+
+    def _settled(self, spec: JobSpec) -> bool:
+        """True if the ledger says *spec* needs no (more) work."""
+        if self.ledger.is_done(spec):
+            logger.info("Skipping %s: already transcribed", Path(spec.source).name)
+            return True
+        failures = self.ledger.failures(spec)
+        if failures >= self.max_attempts:
+            logger.info("Skipping %s: failed %d times", Path(spec.source).name, failures)
+            return True
+        return False
+
+    def poll(self) -> List[JobSpec]:
+        """Update what is waiting and return the files that have settled, oldest first."""
+        now = self.clock()
+        present = set()
+        for path in self._candidates():
+            try:
+                st = path.stat()
+            except OSError:  # removed between listing and stat
+                continue
+            present.add(path)
+            sig = (st.st_size, st.st_mtime_ns)
+            if self.handled.get(path) == sig:
+                continue
+            entry = self.pending.get(path)
+            if entry is None or (entry.size, entry.mtime_ns) != sig:
+                # A version the ledger has seen is judged right away, without hashing
+                content = self.ledger.known_hash(path, *sig)
+                if content is not None and self._settled(
+                    JobSpec(str(path), content, self.model_name, self.job_options, *sig)
+                ):
+                    self.handled[path] = sig
+                    self.pending.pop(path, None)
+                    continue
+                self.pending[path] = _Pending(*sig, now)
+        for gone in set(self.pending) - present:
+            del self.pending[gone]
+        for gone in set(self.handled) - present:
+            del self.handled[gone]
+
+        ready: List[JobSpec] = []
+        for path, e in sorted(self.pending.items(), key=lambda kv: kv[1].mtime_ns):
+            if e.size == 0 or now - e.since < self.settle_seconds:
+                continue
+            spec = self.ledger.spec(str(path), self.model_name, self.job_options)
+            if self._settled(spec):
+                self.handled[path] = (e.size, e.mtime_ns)
+                del self.pending[path]
+            else:
+                ready.append(spec)
+        return ready
+
+    @property
+    def backlog(self) -> int:
+        return len(self.pending)
+
+    def process(self, spec: JobSpec) -> BatchItem:
+        """Transcribe one settled file and record the outcome in the ledger."""
+        path = Path(spec.source)
+        item = process_source(
+            spec.source,
+            self.out_dir,
+            model_name=self.model_name,
+            dtype=self.dtype,
+            registry=self.registry,
+            **self.options,
+        )
+        self.ledger.record(spec, item, command="watch")
+        self.pending.pop(path, None)
+        sig = (spec.size or 0, spec.mtime_ns or 0)
+        lag = time.time() - sig[1] / 1e9
+        if item.status == "ok":
+            self.handled[path] = sig
+            logger.info(
+                "Transcribed %s in %.1fs (%.1fs after it was written, %d left in backlog)",
+                path.name,
+                item.total_seconds,
+                lag,
+                self.backlog,
+            )
+            return item
+        failures = self.ledger.failures(spec)
+        if failures >= self.max_attempts:
+            self.handled[path] = sig
+        else:  # retried once it has settled again
+            self.pending[path] = _Pending(*sig, self.clock())
+        logger.warning(
+            "Failed %s (attempt %d of %d): %s", path.name, failures, self.max_attempts, item.error
+        )
+        return item
+
+    def run(
+        self,
+        *,
+        poll_seconds: float = POLL_SECONDS,
+        once: bool = False,
+        stop: Optional[threading.Event] = None,
+        on_item: Optional[Callable[[BatchItem], None]] = None,
+    ) -> List[BatchItem]:
+        """Poll and transcribe until *stop* is set (or, with *once*, the backlog is empty).
+
+        The model is loaded up front and reused for every file.
+        """
+        self.registry.get(self.model_name, self.dtype)
+        stop = stop if stop is not None else threading.Event()
+        items: List[BatchItem] = []
+        last_backlog = -1
+        while not stop.is_set():
+            ready = self.poll()
+            if self.backlog != last_backlog:
+                last_backlog = self.backlog
+                logger.info("Backlog: %d file(s) waiting, %d settled", self.backlog, len(ready))
+            for spec in ready:
+                if stop.is_set():
+                    break
+                item = self.process(spec)
+                items.append(item)
+                if on_item is not None:
+                    on_item(item)
+            if once and not any(e.size for e in self.pending.values()):
+                break  # nothing left but empty files, which may never be written
+            if not ready:
+                stop.wait(poll_seconds)
+        return items
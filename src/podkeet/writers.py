@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Sequence, Type
+
+from .formats import (
+    JSON_TAIL,
+    PARTIAL_JSON_HEAD,
+    SRT_TAGS,
+    VTT_HEADER,
+    VTT_TAGS,
+    _cues,
+    _json_head,
+    _json_sentence,
+    _sentence_records,
+    _srt_cue,
+    _to_json,
+    _vtt_cue,
+)
+from .transcript import Transcript
+
+PARTIAL_SUFFIX = ".partial"
+
+
+def partial_path(path: Path) -> Path:
+    return path.with_name(path.name + PARTIAL_SUFFIX)
+
+
+def write_atomic(path: Path, text: str) -> Path:
+    """Write *text* to ``<path>.partial`` and rename it over *path* once complete."""
+    tmp = partial_path(path)
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+class TranscriptWriter(ABC):
+    """Appends transcript pieces to ``<path>.partial`` and renames it on close.
+
+    Pieces must arrive in time order and must not change once written (see
+    `transcriber._SeamMerger`). Each write is flushed so the partial file can
+    be tailed while a long recording is still being transcribed.
+    """
+
+    def __init__(self, path: Path, highlight_words: bool = False) -> None:
+        self.path = path
+        self.partial = partial_path(path)
+        self.highlight_words = highlight_words
+        self._fh: Optional[IO[str]] = None
+
+    def _start(self) -> IO[str]:
+        if self._fh is None:
+            self._fh = open(self.partial, "w", encoding="utf-8")
+            self._fh.write(self._header())
+        return self._fh
+
+    def _header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def _render(self, piece: Transcript) -> str:
+        """The text *piece* adds to the file."""
+
+    def _footer(self, transcript: Transcript) -> str:
+        return ""
+
+    def write(self, piece: Transcript) -> None:
+        fh = self._start()
+        fh.write(self._render(piece))
+        fh.flush()
+
+    def close(self, transcript: Transcript) -> Path:
+        """Finish the file for the complete *transcript* and move it into place."""
+        fh = self._start()
+        fh.write(self._footer(transcript))
+        fh.close()
+        self._fh = None
+        os.replace(self.partial, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Close without renaming; the ``.partial`` file is left for inspection."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class TxtWriter(TranscriptWriter):
+    def __init__(self, path: Path, highlight_words: bool = False) -> None:
+        super().__init__(path, highlight_words)
+        self._started = False
+        self._pending = ""
+
+    def _render(self, piece: Transcript) -> str:
+        # Matches "".join(sentences).strip(): leading whitespace is dropped and
+        # trailing whitespace is held back until more text follows it
+        chunk = "".join(piece.sentence_text)
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return ""
+            self._started = True
+        body = chunk.rstrip()
+        if not body:
+            self._pending += chunk
+            return ""
+        out = self._pending + body
+        self._pending = chunk[len(body) :]
+        return out
+
+
+class SrtWriter(TranscriptWriter):
+    def __init__(self, path: Path, highlight_words: bool = False) -> None:
+        super().__init__(path, highlight_words)
+        self._index = 0
+
+    def _render(self, piece: Transcript) -> str:
+        out: List[str] = []
+        for cue in _cues(piece, self.highlight_words, SRT_TAGS):
+            self._index += 1
+            out.append(("\n" if self._index > 1 else "") + _srt_cue(self._index, *cue))
+        return "".join(out)
+
+
+class VttWriter(TranscriptWriter):
+    def _header(self) -> str:
+        return VTT_HEADER
+
+    def _render(self, piece: Transcript) -> str:
+        return "".join(
+            "\n" + _vtt_cue(*cue) for cue in _cues(piece, self.highlight_words, VTT_TAGS)
+        )
+
+
+class JsonWriter(TranscriptWriter):
+    """Streams the ``"sentences"`` array; ``"text"`` is put in front on close.
+
+    The ``.partial`` file holds only the sentences written so far. Closing
+    writes the `_to_json` layout (``"text"`` first) by copying them after the
+    finished head.
+    """
+
+    def __init__(self, path: Path, highlight_words: bool = False) -> None:
+        super().__init__(path, highlight_words)
+        self._count = 0
+
+    def _header(self) -> str:
+        return PARTIAL_JSON_HEAD
+
+    def _render(self, piece: Transcript) -> str:
+        out: List[str] = []
+        for record in _sentence_records(piece):
+            out.append((",\n" if self._count else "") + _json_sentence(record))
+            self._count += 1
+        return "".join(out)
+
+    def close(self, transcript: Transcript) -> Path:
+        self.abort()
+        if not self._count:
+            # No sentences: an empty array rather than the opened one
+            path = write_atomic(self.path, _to_json(transcript))
+        else:
+            finished = self.path.with_name(self.path.name + ".tmp")
+            with open(self.partial, "rb") as src, open(finished, "wb") as dst:
+                dst.write(_json_head(transcript.text).encode("utf-8"))
+                src.seek(len(PARTIAL_JSON_HEAD))
+                shutil.copyfileobj(src, dst)
+                dst.write(JSON_TAIL.encode("utf-8"))
+            os.replace(finished, self.path)
+            path = self.path
+        self.partial.unlink(missing_ok=True)
+        return path
+
+
+class JsonlWriter(TranscriptWriter):
+    def _render(self, piece: Transcript) -> str:
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in _sentence_records(piece))
+
+
+WRITERS: Dict[str, Type[TranscriptWriter]] = {
+    "txt": TxtWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "json": JsonWriter,
+    "jsonl": JsonlWriter,
+}
+
+
+class StreamingOutput:
+    """One incremental writer per requested format, all fed the same pieces."""
+
+    def __init__(
+        self, out_dir: Path, name: str, formats: Sequence[str], highlight_words: bool = False
+    ) -> None:
+        self.out_dir = out_dir
+        self.writers = [WRITERS[fmt](out_dir / f"{name}.{fmt}", highlight_words) for fmt in formats]
+        self.started = False
+
+    def write(self, piece: Transcript) -> None:
+        if not self.started:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            self.started = True
+        for writer in self.writers:
+            writer.write(piece)
+
+    def close(self, transcript: Transcript) -> List[Path]:
+        return [writer.close(transcript) for writer in self.writers]
+
+    def abort(self) -> None:
+        for writer in self.writers:
+            writer.abort()
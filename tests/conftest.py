@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path_factory, monkeypatch):
+    """Keep every test's job ledger and search index out of the user's directories."""
+    state = tmp_path_factory.mktemp("state")
+    monkeypatch.setenv("PODKEET_LEDGER", str(state / "ledger.sqlite"))
+    monkeypatch.setenv("PODKEET_INDEX", str(state / "index.sqlite"))
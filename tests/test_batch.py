@@ -0,0 +1,230 @@
+import json
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from podkeet.batch import collect_sources, run_batch
+from podkeet.cli import app
+from podkeet.models import ModelRegistry
+from podkeet.pipeline import run_pipeline
+
+
+def _touch(path: Path) -> Path:
+    path.write_bytes(b"fake")
+    return path
+
+
+def test_collect_sources_expands_dirs_globs_and_manifest(tmp_path):
+    media = tmp_path / "media"
+    media.mkdir()
+    a = _touch(media / "a.mp3")
+    b = _touch(media / "b.mp4")
+    _touch(media / "notes.txt")
+    other = tmp_path / "other"
+    other.mkdir()
+    c = _touch(other / "c.wav")
+
+    manifest = tmp_path / "list.txt"
+    manifest.write_text(
+        "# episodes\n\nhttps://example.com/watch?v=1\nother/c.wav\n", encoding="utf-8"
+    )
+
+    sources = collect_sources([str(media), str(other / "*.wav")], manifest)
+
+    assert sources == [str(a), str(b), str(c), "https://example.com/watch?v=1"]
+
+
+def test_collect_sources_keeps_unmatched_entries(tmp_path):
+    missing = str(tmp_path / "nope.mp3")
+    assert collect_sources([missing]) == [missing]
+
+
+def test_run_batch_continues_after_failure(tmp_path):
+    loads = []
+    registry = ModelRegistry(loader=lambda name, dtype: loads.append(name) or object())
+    good = _touch(tmp_path / "good.mp3")
+    bad = _touch(tmp_path / "bad.mp3")
+
+    def fake_transcribe(audio_path, **kwargs):
+        if audio_path.name == "bad.mp3":
+            raise RuntimeError("boom")
+        result = MagicMock()
+        result.out_path = tmp_path / (audio_path.stem + ".txt")
+        return result
+
+    with (
+        patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+        patch("podkeet.batch.probe_duration", return_value=60.0),
+    ):
+        summary = run_batch([str(bad), str(good)], tmp_path, model_name="m", registry=registry)
+
+    assert loads == ["m"]
+    assert [i.status for i in summary.items] == ["error", "ok"]
+    assert "boom" in summary.items[0].error
+    assert summary.items[1].transcript_path == str(tmp_path / "good.txt")
+    assert summary.audio_seconds == 60.0
+    assert summary.as_dict()["status"] == "partial"
+
+
+def test_skip_is_checked_per_item_and_its_errors_fail_only_that_item(tmp_path):
+    loads = []
+    registry = ModelRegistry(loader=lambda name, dtype: loads.append(name) or object())
+    a, b, c = (_touch(tmp_path / f"{n}.mp3") for n in "abc")
+    asked = []
+
+    def skip(source):
+        asked.append(Path(source).name)
+        if source == str(b):
+            raise OSError("unreadable")
+        return source == str(a)
+
+    def fake_transcribe(audio_path, **kwargs):
+        assert asked[-1] == audio_path.name  # fingerprinted just before its turn
+        result = MagicMock()
+        result.out_path = tmp_path / (audio_path.stem + ".txt")
+        return result
+
+    for run in (run_batch, run_pipeline):
+        asked.clear()
+        with (
+            patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+            patch("podkeet.batch.probe_duration", return_value=60.0),
+        ):
+            summary = run([str(a), str(b), str(c)], tmp_path, registry=registry, skip=skip)
+        assert summary.skipped == [str(a)]
+        assert [(i.status, Path(i.source).name) for i in summary.items] == [
+            ("error", "b.mp3"),
+            ("ok", "c.mp3"),
+        ]
+        assert "unreadable" in summary.items[0].error
+
+    def no_load(name, dtype):
+        raise AssertionError("nothing to transcribe, so no model either")
+
+    summary = run_batch([str(a)], tmp_path, registry=ModelRegistry(loader=no_load), skip=skip)
+    assert summary.skipped == [str(a)] and summary.model_load_seconds == 0.0
+
+
+def test_skipped_sources_keep_their_queue_position(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: object())
+    sources = [str(tmp_path / f"{n}.wav") for n in "abc"]
+
+    for run in (run_batch, run_pipeline):
+        seen = []
+        run(
+            sources,
+            tmp_path,
+            registry=registry,
+            skip=lambda source: source == sources[0],
+            on_item=lambda idx, item: seen.append((idx, Path(item.source).name)),
+        )
+        assert seen == [(1, "b.wav"), (2, "c.wav")], run.__name__
+
+
+def test_run_pipeline_prefetches_while_model_runs(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: object())
+    urls = [f"https://example.com/watch?v={i}" for i in range(3)]
+    second_downloaded = threading.Event()
+
+    def fake_download(url, out_dir, codec="mp3", **kwargs):
+        path = _touch(out_dir / (url[-1] + ".mp3"))
+        if url == urls[1]:
+            second_downloaded.set()
+        return path
+
+    overlapped = []
+
+    def fake_transcribe(audio_path, **kwargs):
+        if audio_path.stem == "0":
+            # The next item must be fetched while the model is still busy with this one
+            overlapped.append(second_downloaded.wait(timeout=5))
+        result = MagicMock()
+        result.out_path = tmp_path / (audio_path.stem + ".txt")
+        return result
+
+    with (
+        patch("podkeet.batch.download_audio", side_effect=fake_download),
+        patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+        patch("podkeet.batch.probe_duration", return_value=10.0),
+    ):
+        summary = run_pipeline(urls, tmp_path, registry=registry, prefetch=2)
+
+    assert overlapped == [True]
+    assert [i.source for i in summary.items] == urls
+    assert all(i.status == "ok" for i in summary.items)
+    assert not any((tmp_path / f"{i}.mp3").exists() for i in range(3))
+    stages = summary.as_dict()["stages"]
+    assert stages["download"]["items"] == 3
+    assert stages["model"]["items"] == 3
+    assert stages["bottleneck"] in {"download", "model"}
+
+
+def test_transcribe_many_writes_summary(tmp_path):
+    runner = CliRunner()
+    _touch(tmp_path / "one.mp3")
+    _touch(tmp_path / "two.mp3")
+    out_dir = tmp_path / "out"
+
+    def fake_transcribe(audio_path, **kwargs):
+        result = MagicMock()
+        result.out_path = out_dir / (audio_path.stem + ".txt")
+        return result
+
+    with (
+        patch("podkeet.pipeline.get_registry", return_value=MagicMock()),
+        patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+        patch("podkeet.batch.probe_duration", return_value=30.0),
+    ):
+        result = runner.invoke(
+            app,
+            ["transcribe-many", str(tmp_path / "*.mp3"), "--out-dir", str(out_dir), "--no-timing"],
+        )
+
+    assert result.exit_code == 0, result.output
+    summary = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+    assert summary["succeeded"] == 2
+    assert [Path(i["source"]).name for i in summary["items"]] == ["one.mp3", "two.mp3"]
+
+
+def test_transcribe_many_without_sources_exits_2():
+    runner = CliRunner()
+    result = runner.invoke(app, ["transcribe-many"])
+    assert result.exit_code == 2
+
+
+def test_native_downloads_skip_mp3_unless_kept(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: object())
+    codecs = []
+
+    def fake_download(url, out_dir, codec="mp3", **kwargs):
+        codecs.append(codec)
+        return _touch(out_dir / (url[-1] + ".webm"))
+
+    def fake_encode(src, mp3_path):
+        return _touch(mp3_path)
+
+    def fake_transcribe(audio_path, **kwargs):
+        result = MagicMock()
+        result.out_path = tmp_path / (audio_path.stem + ".txt")
+        return result
+
+    urls = ["https://example.com/watch?v=1", "https://example.com/watch?v=2"]
+    with (
+        patch("podkeet.batch.download_audio", side_effect=fake_download),
+        patch("podkeet.batch.encode_mp3", side_effect=fake_encode) as encode,
+        patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+        patch("podkeet.batch.probe_duration", return_value=120.0),
+    ):
+        dropped = run_batch(urls[:1], tmp_path, registry=registry)
+        kept = run_batch(urls[1:], tmp_path, registry=registry, keep_audio=True)
+
+    assert codecs == [None, None]
+    assert dropped.items[0].transcode_seconds_saved_estimate == 2.0  # 120 s at 60x realtime
+    assert dropped.as_dict()["transcode_seconds_saved_estimate"] == 2.0
+    assert not (tmp_path / "1.webm").exists()
+    encode.assert_called_once()
+    assert kept.items[0].audio_path == str(tmp_path / "2.mp3")
+    assert kept.items[0].transcode_seconds is not None
+    assert (tmp_path / "2.mp3").exists() and not (tmp_path / "2.webm").exists()
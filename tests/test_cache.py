@@ -0,0 +1,154 @@
+import io
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from typer.testing import CliRunner
+
+from podkeet.cache import TranscriptCache, hash_audio, hash_samples, transcript_key
+from podkeet.cli import app
+from podkeet.downloader import video_id
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import transcribe
+
+RESULT = {
+    "text": "hello world",
+    "sentences": [
+        {
+            "text": "hello world",
+            "start": 0.0,
+            "end": 1.0,
+            "duration": 1.0,
+            "tokens": [{"text": "hello world", "start": 0.0, "end": 1.0, "duration": 1.0}],
+        }
+    ],
+}
+
+
+def test_cache_roundtrip_and_lru_prune(tmp_path):
+    cache = TranscriptCache(tmp_path, max_bytes=10**9)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        path = cache.put(key, RESULT, name=f"ep{i}")
+        os.utime(path, (1000 + i, 1000 + i))
+
+    assert cache.get("aa1").name == "ep0"  # refreshes aa1, so bb2 is now oldest
+    assert cache.get("missing") is None
+    total = cache.stats()["bytes"]
+
+    assert cache.prune(max_bytes=total - 1) == 1
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") is not None and cache.get("cc3") is not None
+    assert cache.clear() == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_transcript_key_depends_on_model_and_options():
+    base = transcript_key("youtube:abc", "m", "bfloat16", chunk_seconds=None)
+    assert base == transcript_key("youtube:abc", "m", "bfloat16", chunk_seconds=None)
+    assert base != transcript_key("youtube:abc", "m2", "bfloat16", chunk_seconds=None)
+    assert base != transcript_key("youtube:abc", "m", "bfloat16", chunk_seconds=60)
+
+
+def test_hash_samples_is_content_addressed():
+    a = np.linspace(-1, 1, 100_000, dtype=np.float32)
+    assert hash_samples(a) == hash_samples(a.copy())
+    assert hash_samples(a) != hash_samples(a[:-1])
+
+
+def test_video_id_parses_youtube_urls_locally():
+    vid = "dQw4w9WgXcQ"
+    assert video_id(f"https://www.youtube.com/watch?v={vid}&t=121s") == f"youtube:{vid}"
+    assert video_id(f"https://youtu.be/{vid}") == f"youtube:{vid}"
+    assert video_id(f"https://youtube.com/shorts/{vid}") == f"youtube:{vid}"
+
+
+def _fake_ffmpeg(samples):
+    """Stand-in for ``subprocess.Popen`` of an ffmpeg decode that outputs *samples*."""
+
+    def popen(args, **kwargs):
+        return SimpleNamespace(
+            args=args,
+            stdout=io.BytesIO(samples.astype(np.float32).tobytes()),
+            returncode=0,
+            communicate=lambda: (None, b""),
+        )
+
+    return popen
+
+
+def test_hash_audio_matches_hash_samples_of_the_decoded_audio(tmp_path):
+    samples = np.linspace(-1, 1, 3_000_000, dtype=np.float32)  # more than one read block
+    with (
+        patch("podkeet.cache.ensure_ffmpeg"),
+        patch("podkeet.cache.subprocess.Popen", side_effect=_fake_ffmpeg(samples)),
+    ):
+        assert hash_audio(tmp_path / "ep.m4a") == hash_samples(samples)
+
+
+def test_transcribe_cache_hit_skips_model(tmp_path):
+    loads = []
+    model = SimpleNamespace(
+        transcribe=lambda path: SimpleNamespace(text="hi", sentences=[]),
+        preprocessor_config=SimpleNamespace(sample_rate=16_000),
+    )
+    registry = ModelRegistry(loader=lambda name, dtype: loads.append(name) or model)
+    cache = TranscriptCache(tmp_path / "cache")
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"same bytes")
+    samples = np.linspace(-1, 1, 16_000, dtype=np.float32)
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.cache.subprocess.Popen") as mock_popen,
+        patch("podkeet.transcriber.decode_audio", return_value=samples) as mock_decode,
+        patch("podkeet.transcriber._transcribe_samples", return_value=model.transcribe(audio)),
+    ):
+        first = transcribe(audio, out_dir=tmp_path, registry=registry, cache=cache)
+        # Keyed by the decoded audio, so a --pcm run (or a re-mux) hits the same entry
+        second = transcribe(
+            audio, out_dir=tmp_path, out_format="json", registry=registry, cache=cache, pcm=True
+        )
+
+    # One decode per run, shared by the cache key and the model
+    assert mock_decode.call_count == 2 and not mock_popen.called
+    assert len(loads) == 1
+    assert not first.cached and second.cached
+    assert json.loads(second.out_path.read_text(encoding="utf-8"))["text"] == "hi"
+
+
+def test_cli_url_cache_hit_skips_download(tmp_path, monkeypatch):
+    monkeypatch.setenv("PODKEET_CACHE_DIR", str(tmp_path / "cache"))
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    key = transcript_key(
+        "youtube:dQw4w9WgXcQ",
+        "mlx-community/parakeet-tdt-0.6b-v2",
+        "bfloat16",
+        chunk_seconds=None,
+        overlap_seconds=15.0,
+    )
+    TranscriptCache().put(key, RESULT, name="Never Gonna")
+
+    with patch("podkeet.cli.download_audio") as mock_download:
+        result = CliRunner().invoke(
+            app, ["transcribe", url, "--out-dir", str(tmp_path), "--format", "srt"]
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_download.assert_not_called()
+    assert "hello world" in (tmp_path / "Never Gonna.srt").read_text(encoding="utf-8")
+
+
+def test_cli_cache_stats_and_clear(tmp_path, monkeypatch):
+    monkeypatch.setenv("PODKEET_CACHE_DIR", str(tmp_path))
+    TranscriptCache().put("ab12", RESULT, name="x")
+    runner = CliRunner()
+
+    stats = runner.invoke(app, ["cache", "stats", "--json"])
+    assert stats.exit_code == 0, stats.output
+    assert json.loads(stats.stdout)["entries"] == 1
+
+    cleared = runner.invoke(app, ["cache", "clear"])
+    assert cleared.exit_code == 0
+    assert TranscriptCache().stats()["entries"] == 0
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from podkeet.checkpoints import CheckpointStore
+from podkeet.cli import app
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import transcribe
+
+
+def _window(n):
+    tok = SimpleNamespace(text=f" part{n}.", start=1.0, end=1.5, duration=0.5)
+    sent = SimpleNamespace(text=tok.text, start=1.0, end=1.5, duration=0.5, tokens=[tok])
+    return SimpleNamespace(text=tok.text, sentences=[sent])
+
+
+def _run(tmp_path, store, fake, resume=False):
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace())
+    samples = np.arange(16_000 * 30, dtype=np.float32)
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake),
+    ):
+        return transcribe(
+            tmp_path / "ep.wav",
+            out_dir=tmp_path,
+            out_format="srt",
+            registry=registry,
+            samples=samples,
+            chunk_seconds=10,
+            overlap_seconds=0.0,
+            checkpoints=store,
+            resume=resume,
+        )
+
+
+def test_resume_only_transcribes_missing_chunks(tmp_path):
+    store = CheckpointStore(tmp_path / "ckpt")
+    calls = []
+
+    def crash_on_third(model, chunk, dtype):
+        calls.append(chunk[0])
+        if len(calls) == 3:
+            raise RuntimeError("killed")
+        return _window(len(calls))
+
+    with pytest.raises(RuntimeError):
+        _run(tmp_path, store, crash_on_third)
+    saved = list((tmp_path / "ckpt").glob("*/*.json"))
+    assert len(saved) == 2
+
+    resumed = []
+
+    def fake(model, chunk, dtype):
+        resumed.append(chunk[0])
+        return _window(3)
+
+    result = _run(tmp_path, store, fake, resume=True)
+
+    assert resumed == [16_000 * 20]  # only the third window ran again
+    srt = result.out_path.read_text(encoding="utf-8")
+    assert "00:00:11,000 --> 00:00:11,500\npart2." in srt
+    assert "00:00:21,000 --> 00:00:21,500\npart3." in srt
+    assert not list((tmp_path / "ckpt").glob("*/*.json"))  # removed after success
+
+
+def test_checkpoints_ignored_without_resume(tmp_path):
+    store = CheckpointStore(tmp_path / "ckpt")
+    calls = []
+
+    def crash(model, chunk, dtype):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return _window(1)
+
+    with pytest.raises(RuntimeError):
+        _run(tmp_path, store, crash)
+    assert list((tmp_path / "ckpt").glob("*/*.json"))
+
+    again = []
+    _run(tmp_path, store, lambda m, c, d: again.append(1) or _window(len(again)))
+    assert len(again) == 3
+
+
+def test_full_file_runs_do_not_hash_for_checkpoints(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace())
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber._transcribe_samples", return_value=_window(1)),
+        patch("podkeet.transcriber.hash_samples", side_effect=AssertionError) as hashed,
+    ):
+        transcribe(
+            tmp_path / "ep.wav",
+            out_dir=tmp_path,
+            registry=registry,
+            samples=np.zeros(16_000 * 30, dtype=np.float32),
+            memory_budget_mb=1e6,
+            checkpoints=CheckpointStore(tmp_path / "ckpt"),
+        )
+    hashed.assert_not_called()
+    assert not (tmp_path / "ckpt").exists()
+
+
+def test_cli_resume_flag(tmp_path):
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    with patch("podkeet.cli.run_transcription") as mock_run:
+        mock_run.return_value = SimpleNamespace(text="hi", out_path=tmp_path / "ep.txt")
+        result = CliRunner().invoke(app, ["transcribe", str(audio), "--resume", "--no-timing"])
+
+    assert result.exit_code == 0, result.output
+    kwargs = mock_run.call_args.kwargs
+    assert kwargs["resume"] is True
+    assert isinstance(kwargs["checkpoints"], CheckpointStore)
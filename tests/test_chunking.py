@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from podkeet.chunking import (
+    MIN_CHUNK_SECONDS,
+    MemoryModel,
+    plan_chunks,
+    plan_chunks_at_pauses,
+    plan_transcription,
+)
+
+
+def test_plan_chunks_uses_exact_sample_offsets():
+    chunks = plan_chunks(16_000 * 25, chunk_seconds=10)
+    assert [(c.start, c.end) for c in chunks] == [
+        (0, 160_000),
+        (160_000, 320_000),
+        (320_000, 400_000),
+    ]
+    assert [c.offset for c in chunks] == [0.0, 10.0, 20.0]
+    assert chunks[-1].duration == 5.0
+
+
+def test_chunk_slice_is_a_view():
+    samples = np.arange(16_000 * 3, dtype=np.float32)
+    chunk = plan_chunks(len(samples), chunk_seconds=1)[1]
+    view = chunk.slice(samples)
+    assert np.shares_memory(view, samples)
+    assert view[0] == 16_000
+
+
+def test_plan_chunks_empty_and_invalid():
+    assert plan_chunks(0) == []
+    with pytest.raises(ValueError):
+        plan_chunks(100, chunk_seconds=0)
+
+
+def test_plan_chunks_with_overlap():
+    chunks = plan_chunks(16_000 * 25, chunk_seconds=10, overlap_seconds=2)
+    assert [(c.offset, c.offset + c.duration) for c in chunks] == [
+        (0.0, 10.0),
+        (8.0, 18.0),
+        (16.0, 25.0),
+    ]
+    with pytest.raises(ValueError):
+        plan_chunks(100, chunk_seconds=5, overlap_seconds=5)
+
+
+def test_plan_chunks_at_pauses_cuts_in_silence_or_falls_back_to_overlap():
+    sr = 100
+    # Pauses near 9 s and 17 s; nothing between 20 s and the end at 40 s
+    pauses = np.array([[300, 340], [880, 920], [1690, 1710]])
+    chunks = plan_chunks_at_pauses(
+        4000, pauses, chunk_seconds=10, sample_rate=sr, overlap_seconds=2
+    )
+    assert [(c.start, c.end) for c in chunks] == [
+        (0, 900),  # middle of the pause before the 10 s target
+        (900, 1700),  # latest pause within the last 2.5 s of the window
+        (1700, 2700),  # no pause: full window ...
+        (2500, 3500),  # ... and the next one overlaps it
+        (3300, 4000),
+    ]
+
+
+def test_plan_transcription_full_when_estimate_fits():
+    model = MemoryModel(base_mb=1000, linear_mb_per_second=1, quadratic_mb_per_second2=0.001)
+    plan = plan_transcription(600, memory_budget_mb=4000, memory_model=model)
+    # 1000 + 600 + 360
+    assert plan.mode == "full"
+    assert plan.estimated_peak_mb == 1960
+    assert plan.chunk_seconds is None
+
+
+def test_plan_transcription_picks_largest_window_that_fits():
+    model = MemoryModel(base_mb=1000, linear_mb_per_second=0, quadratic_mb_per_second2=0.01)
+    # 1000 + 0.01 * d^2 <= 2000  ->  d <= 316s, rounded down to 310s
+    plan = plan_transcription(3 * 3600, memory_budget_mb=2000, memory_model=model)
+    assert plan.chunked
+    assert plan.chunk_seconds == 310
+    assert plan.estimated_peak_mb <= 2000
+
+
+def test_plan_transcription_caps_and_floors_window():
+    model = MemoryModel(base_mb=1000, linear_mb_per_second=0, quadratic_mb_per_second2=0.01)
+    roomy = plan_transcription(
+        3 * 3600, memory_budget_mb=1_000_000, memory_model=model, max_chunk_seconds=600
+    )
+    assert roomy.chunk_seconds == 600
+    tight = plan_transcription(3 * 3600, memory_budget_mb=500, memory_model=model)
+    assert tight.chunked
+    assert tight.chunk_seconds == MIN_CHUNK_SECONDS
+    assert "minimum" in tight.reason
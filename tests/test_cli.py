@@ -1,10 +1,15 @@
+import json
+import os
 import re
+import subprocess
+import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
 from typer.testing import CliRunner
 
-from podkeet.cli import app, _fmt_duration
-from podkeet.ffmpeg_utils import is_video_file, VIDEO_EXTENSIONS
+from podkeet.cli import _fmt_duration, app
+from podkeet.ffmpeg_utils import VIDEO_EXTENSIONS, is_video_file
 
 
 def test_fmt_duration_zero():
@@ -30,6 +35,40 @@ def test_cli_version():
     assert re.search(r"^podkeet\s+\d+\.\d+\.\d+", result.stdout.strip())
 
 
+# Import time `podkeet --version` may add on top of importing typer itself
+STARTUP_BUDGET_MS = 120
+HEAVY_MODULES = {"numpy", "rich", "asyncio", "yt_dlp", "parakeet_mlx", "mlx"}
+
+
+def _import_profile(code):
+    """Modules imported by *code* and their total import time in ms (best of 3 runs)."""
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([src, os.environ.get("PYTHONPATH", "")])}
+    best, modules = None, set()
+    for _ in range(3):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        rows = re.findall(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", proc.stderr)
+        total = sum(int(cum) for cum, indent, _ in rows if not indent)
+        best = total if best is None else min(best, total)
+        modules = {name for _, _, name in rows}
+    return modules, best / 1000
+
+
+def test_version_startup_budget():
+    modules, total_ms = _import_profile("from podkeet.cli import app; app(['--version'])")
+    _, typer_ms = _import_profile("import typer")
+
+    assert "podkeet.cli" in modules
+    assert not {m.split(".")[0] for m in modules} & HEAVY_MODULES
+    assert not {"podkeet.transcriber", "podkeet.server", "podkeet.batch"} & modules
+    assert total_ms - typer_ms < STARTUP_BUDGET_MS
+
+
 def test_is_video_file_known_extensions():
     for ext in [".mp4", ".mkv", ".avi", ".mov", ".webm", ".m4v", ".flv"]:
         assert is_video_file(Path(f"video{ext}")), f"{ext} should be detected as video"
@@ -109,7 +148,90 @@ def test_transcribe_video_file_keep_audio(tmp_path):
     assert fake_mp3.exists()
 
 
+def test_transcribe_video_file_pcm_skips_mp3_extraction(tmp_path):
+    """With --pcm the video is decoded directly; no intermediate MP3 is produced."""
+    runner = CliRunner()
+    fake_video = tmp_path / "clip.mp4"
+    fake_video.write_bytes(b"fake video content")
+
+    fake_result = MagicMock()
+    fake_result.out_path = tmp_path / "clip.txt"
+
+    with (
+        patch("podkeet.cli.extract_audio_from_video") as mock_extract,
+        patch("podkeet.cli.run_transcription", return_value=fake_result) as mock_transcribe,
+    ):
+        result = runner.invoke(
+            app,
+            ["transcribe", str(fake_video), "--out-dir", str(tmp_path), "--pcm", "--no-timing"],
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_extract.assert_not_called()
+    assert mock_transcribe.call_args.args[0] == fake_video
+    assert mock_transcribe.call_args.kwargs["pcm"] is True
+
+
+def test_transcribe_rejects_unknown_format(tmp_path):
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"fake")
+    with patch("podkeet.cli.run_transcription") as mock_transcribe:
+        result = CliRunner().invoke(app, ["transcribe", str(audio), "--format", "srt,docx"])
+    assert result.exit_code == 2
+    mock_transcribe.assert_not_called()
+
+
 def test_transcribe_missing_file_returns_exit_2(tmp_path):
     runner = CliRunner()
     result = runner.invoke(app, ["transcribe", str(tmp_path / "nonexistent.mp4")])
     assert result.exit_code == 2
+
+
+def _url_transcribe(tmp_path, *extra):
+    native = tmp_path / "ep.webm"
+    native.write_bytes(b"opus")
+    fake_result = MagicMock()
+    fake_result.out_path = tmp_path / "ep.json"
+    fake_result.plan = None
+
+    def fake_encode(src, mp3_path):
+        mp3_path.write_bytes(b"mp3")
+        return mp3_path
+
+    with (
+        patch("podkeet.cli.video_id", return_value=None),
+        patch("podkeet.cli.download_audio", return_value=native) as mock_download,
+        patch("podkeet.cli.run_transcription", return_value=fake_result) as mock_transcribe,
+        patch("podkeet.cli.encode_mp3", side_effect=fake_encode) as mock_encode,
+        patch("podkeet.cli.probe_duration", return_value=600.0),
+    ):
+        result = CliRunner().invoke(
+            app,
+            ["transcribe", "https://youtu.be/x", "--out-dir", str(tmp_path), "--format", "json"]
+            + list(extra),
+        )
+    assert result.exit_code == 0, result.output
+    assert mock_download.call_args.kwargs["codec"] is None
+    assert mock_transcribe.call_args.args[0] == native  # decoded directly, no MP3
+    return json.loads(result.stdout.strip().splitlines()[-1]), mock_encode
+
+
+def test_transcribe_url_skips_mp3_transcode(tmp_path):
+    summary, encode = _url_transcribe(tmp_path)
+
+    encode.assert_not_called()
+    assert summary["transcode_seconds_saved_estimate"] == 10.0  # 600 s at 60x realtime
+    assert not (tmp_path / "ep.webm").exists()
+
+
+def test_transcribe_url_keep_audio_produces_mp3_only_when_asked(tmp_path):
+    summary, encode = _url_transcribe(tmp_path, "--keep-audio")
+    encode.assert_called_once()
+    assert summary["audio_path"] == str(tmp_path / "ep.mp3")
+    assert "transcode_seconds" in summary
+    assert not (tmp_path / "ep.webm").exists()
+
+    summary, encode = _url_transcribe(tmp_path, "--keep-audio", "--audio-format", "native")
+    encode.assert_not_called()
+    assert summary["audio_path"] == str(tmp_path / "ep.webm")
+    assert (tmp_path / "ep.webm").exists()
@@ -0,0 +1,314 @@
+import json
+import sys
+import threading
+import types
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from podkeet.cli import app
+from podkeet.downloader import (
+    DownloadArchive,
+    DownloadFailed,
+    RetryPolicy,
+    classify_error,
+    download_audio,
+    download_playlist,
+)
+
+PLAYLIST = {
+    "_type": "playlist",
+    "id": "PL1",
+    "extractor_key": "YoutubeTab",
+    "entries": [
+        {
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": "aaaaaaaaaaa",
+            "url": "aaaaaaaaaaa",
+            "title": "Same",
+        },
+        {
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": "bbbbbbbbbbb",
+            "url": "bbbbbbbbbbb",
+            "title": "Same",
+        },
+        None,
+        {
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": "ccccccccccc",
+            "url": "https://www.youtube.com/watch?v=ccccccccccc",
+            "title": "Broken",
+        },
+        {
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": "aaaaaaaaaaa",
+            "url": "aaaaaaaaaaa",
+            "title": "Same",
+        },
+    ],
+}
+
+
+class DownloadError(Exception):
+    pass
+
+
+class FakeYoutubeDL:
+    """Writes the file yt-dlp would produce into the ``outtmpl`` directory."""
+
+    downloads = []
+    concurrent = 0
+    peak = 0
+    lock = threading.Lock()
+    barrier = None
+    failures = {}  # video id -> error messages raised by successive attempts
+    sleep = None
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True, **kwargs):
+        if not download:
+            return PLAYLIST
+        cls = FakeYoutubeDL
+        with cls.lock:
+            cls.concurrent += 1
+            cls.peak = max(cls.peak, cls.concurrent)
+        try:
+            vid = url.rsplit("=", 1)[-1]
+            if cls.failures.get(vid):
+                raise DownloadError(cls.failures[vid].pop(0))
+            if vid == "ccccccccccc":
+                raise DownloadError("Video unavailable")
+            if cls.barrier is not None:
+                cls.barrier.wait(timeout=2)  # both good entries must be in flight at once
+            title = "Same" if vid != "single" else "Solo"
+            tmpl = self.opts["outtmpl"].replace("%(title)s", title).replace("%(id)s", vid)
+            path = Path(tmpl.replace("%(ext)s", "mp3"))
+            path.write_bytes(b"x" * 10)
+            # A stray file next to it must not be mistaken for the result
+            (path.parent / "other.mp3").write_bytes(b"")
+            cls.downloads.append(vid)
+            return {"id": vid, "title": title, "requested_downloads": [{"filepath": str(path)}]}
+        finally:
+            with cls.lock:
+                cls.concurrent -= 1
+
+
+@pytest.fixture
+def fake_ytdlp(monkeypatch):
+    FakeYoutubeDL.downloads = []
+    FakeYoutubeDL.concurrent = FakeYoutubeDL.peak = 0
+    FakeYoutubeDL.barrier = None
+    FakeYoutubeDL.failures = {}
+    module = types.ModuleType("yt_dlp")
+    module.YoutubeDL = FakeYoutubeDL
+    utils = types.ModuleType("yt_dlp.utils")
+    utils.DownloadError = DownloadError
+    module.utils = utils
+    monkeypatch.setitem(sys.modules, "yt_dlp", module)
+    monkeypatch.setitem(sys.modules, "yt_dlp.utils", utils)
+    with (
+        patch("podkeet.downloader.ensure_ffmpeg"),
+        patch("podkeet.downloader.time.sleep") as sleep,
+    ):
+        FakeYoutubeDL.sleep = sleep
+        yield FakeYoutubeDL
+
+
+def test_download_audio_uses_requested_downloads_and_cleans_up(tmp_path, fake_ytdlp):
+    path = download_audio("https://www.youtube.com/watch?v=single", tmp_path)
+
+    assert path == tmp_path / "Solo [single].mp3"
+    assert path.read_bytes() == b"x" * 10
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["Solo [single].mp3"]
+
+    # Same title, different videos: neither replaces the other in the shared folder
+    a = download_audio("https://www.youtube.com/watch?v=aaaaaaaaaaa", tmp_path)
+    b = download_audio("https://www.youtube.com/watch?v=bbbbbbbbbbb", tmp_path)
+    assert a != b and a.exists() and b.exists()
+
+
+def test_playlist_downloads_concurrently_and_archive_skips_on_rerun(tmp_path, fake_ytdlp):
+    fake_ytdlp.barrier = threading.Barrier(2)
+    archive = tmp_path / "archive.txt"
+    seen = []
+
+    summary = download_playlist(
+        "https://www.youtube.com/playlist?list=PL1",
+        tmp_path,
+        workers=3,
+        archive=archive,
+        on_item=seen.append,
+    )
+
+    assert [i.id for i in summary.items] == ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+    assert [i.status for i in summary.items] == ["ok", "ok", "error"]
+    assert "Video unavailable" in summary.items[2].error
+    assert fake_ytdlp.peak >= 2
+    assert len(seen) == 3
+    # Same titles don't collide, and no per-item work dirs are left behind
+    assert sorted(p.name for p in tmp_path.glob("*.mp3")) == [
+        "Same [aaaaaaaaaaa].mp3",
+        "Same [bbbbbbbbbbb].mp3",
+    ]
+    assert not list(tmp_path.glob(".download-*"))
+    assert set(archive.read_text().splitlines()) == {
+        "youtube aaaaaaaaaaa",
+        "youtube bbbbbbbbbbb",
+    }
+    data = summary.as_dict()
+    assert (data["downloaded"], data["failed"], data["bytes"]) == (2, 1, 20)
+
+    fake_ytdlp.barrier = None
+    fake_ytdlp.downloads = []
+    again = download_playlist(
+        "https://www.youtube.com/playlist?list=PL1", tmp_path, workers=3, archive=archive
+    )
+    assert [i.status for i in again.items] == ["skipped", "skipped", "error"]
+    assert fake_ytdlp.downloads == []
+    assert len(DownloadArchive(archive)) == 2
+
+
+def test_cli_download_playlist_writes_summary(tmp_path, fake_ytdlp):
+    result = CliRunner().invoke(
+        app,
+        [
+            "download-playlist",
+            "https://www.youtube.com/playlist?list=PL1",
+            "--out-dir",
+            str(tmp_path),
+            "--json",
+        ],
+    )
+
+    assert result.exit_code == 1  # one entry failed
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert data["count"] == 3 and data["downloaded"] == 2
+    assert (tmp_path / "archive.txt").exists()
+    assert json.loads((tmp_path / "download-summary.json").read_text())["failed"] == 1
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        (
+            "[youtube] x: Video unavailable. This video has been removed",
+            (False, "unavailable"),
+        ),
+        (
+            "[youtube] x: Private video. Sign in if you've been granted access",
+            (False, "private"),
+        ),
+        (
+            "The uploader has not made this video available in your country",
+            (False, "geo-blocked"),
+        ),
+        ("ERROR: Sign in to confirm your age", (False, "age-restricted")),
+        ("ERROR: Unsupported URL: https://example.com/", (False, "unsupported-url")),
+        (
+            "unable to download video data: HTTP Error 429: Too Many Requests",
+            (True, "rate-limited"),
+        ),
+        (
+            "unable to download webpage: HTTP Error 503: Service Unavailable",
+            (True, "server-error"),
+        ),
+        ("ERROR: [Errno 54] Connection reset by peer", (True, "connection")),
+        ("ERROR: The read operation timed out", (True, "timeout")),
+        ("ERROR: something new went wrong", (True, "unknown")),
+    ],
+)
+def test_classify_error(message, expected):
+    assert classify_error(DownloadError(message)) == expected
+
+
+def test_classify_error_uses_wrapped_exception():
+    err = DownloadError("ERROR: boom")
+    err.exc_info = (OSError, OSError("boom"), None)
+    assert classify_error(err) == (True, "network")
+    expected = Exception("boom")
+    expected.expected = True
+    err.exc_info = (Exception, expected, None)
+    assert classify_error(err) == (False, "unavailable")
+
+
+def test_permanent_error_fails_fast(tmp_path, fake_ytdlp):
+    fake_ytdlp.failures = {"single": ["ERROR: [youtube] single: Video unavailable"] * 5}
+    attempts = []
+
+    with pytest.raises(DownloadFailed) as info:
+        download_audio("https://www.youtube.com/watch?v=single", tmp_path, attempts=attempts)
+
+    assert (info.value.reason, info.value.retryable) == ("unavailable", False)
+    assert [a.outcome for a in info.value.attempts] == ["failed"]
+    assert attempts == info.value.attempts
+    fake_ytdlp.sleep.assert_not_called()
+
+
+def test_retryable_errors_back_off_with_jitter_then_succeed(tmp_path, fake_ytdlp):
+    fake_ytdlp.failures = {"single": ["HTTP Error 503: Service Unavailable", "Read timed out"]}
+    attempts = []
+    policy = RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=1.5)
+
+    path = download_audio(
+        "https://www.youtube.com/watch?v=single", tmp_path, retry=policy, attempts=attempts
+    )
+
+    assert path.name == "Solo [single].mp3"
+    assert [(a.outcome, a.reason) for a in attempts] == [
+        ("retry", "server-error"),
+        ("retry", "timeout"),
+        ("ok", None),
+    ]
+    delays = [c.args[0] for c in fake_ytdlp.sleep.call_args_list]
+    assert delays == [a.sleep_seconds for a in attempts[:2]]
+    assert 0.0 <= delays[0] <= 1.0 and 0.0 <= delays[1] <= 1.5  # capped
+
+
+def test_retries_stop_at_deadline(tmp_path, fake_ytdlp):
+    fake_ytdlp.failures = {"single": ["HTTP Error 429: Too Many Requests"] * 5}
+    policy = RetryPolicy(base_delay=10.0, max_delay=10.0, deadline=0.0)
+
+    with pytest.raises(DownloadFailed) as info:
+        download_audio("https://www.youtube.com/watch?v=single", tmp_path, retry=policy)
+
+    assert info.value.retryable is True
+    assert len(info.value.attempts) == 1
+    assert "1 attempt]" in str(info.value)
+
+
+def test_cli_json_summary_reports_download_attempts(tmp_path, fake_ytdlp):
+    fake_ytdlp.failures = {"single": ["ERROR: Private video"]}
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "transcribe",
+            "https://www.youtube.com/watch?v=single",
+            "--out-dir",
+            str(tmp_path),
+            "--format",
+            "json",
+            "--no-cache",
+        ],
+    )
+
+    assert result.exit_code == 1
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert data["status"] == "error"
+    assert data["reason"] == "private" and data["retryable"] is False
+    assert data["download_attempts"][0]["outcome"] == "failed"
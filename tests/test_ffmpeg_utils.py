@@ -0,0 +1,51 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from podkeet.ffmpeg_utils import decode_audio, is_media_file
+
+
+def _fake_ffmpeg(samples):
+    payload = np.asarray(samples, dtype=np.float32).tobytes()
+
+    def run(cmd, check=True, stdout=None, **kwargs):
+        assert cmd[cmd.index("-ar") + 1] == "16000"
+        assert cmd[cmd.index("-f") + 1] == "f32le"
+        if stdout is not None and stdout is not subprocess.PIPE:
+            stdout.write(payload)
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+        return subprocess.CompletedProcess(cmd, 0, payload, b"")
+
+    return run
+
+
+def test_decode_audio_in_memory(tmp_path):
+    with (
+        patch("podkeet.ffmpeg_utils.ensure_ffmpeg"),
+        patch("podkeet.ffmpeg_utils.subprocess.run", side_effect=_fake_ffmpeg([0.5, -0.25, 0.0])),
+    ):
+        samples = decode_audio(tmp_path / "talk.mp4")
+
+    assert samples.dtype == np.float32
+    assert samples.tolist() == [0.5, -0.25, 0.0]
+
+
+def test_decode_audio_memory_mapped(tmp_path):
+    out = tmp_path / "talk.f32"
+    with (
+        patch("podkeet.ffmpeg_utils.ensure_ffmpeg"),
+        patch("podkeet.ffmpeg_utils.subprocess.run", side_effect=_fake_ffmpeg([0.1, 0.2])),
+    ):
+        samples = decode_audio(tmp_path / "talk.mp3", out_path=out)
+
+    assert isinstance(samples, np.memmap)
+    assert out.stat().st_size == 2 * 4
+    np.testing.assert_allclose(samples, [0.1, 0.2])
+
+
+def test_is_media_file():
+    assert is_media_file(Path("episode.opus"))
+    assert is_media_file(Path("clip.MKV"))
+    assert not is_media_file(Path("notes.txt"))
@@ -0,0 +1,134 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from podkeet.batch import BatchItem
+from podkeet.cli import app
+from podkeet.ledger import Ledger, job_options
+
+
+def _item(source, status="ok", outputs=(), error=None, audio=60.0, total=6.0):
+    item = BatchItem(source=source, status=status, error=error, audio_seconds=audio)
+    item.transcript_paths = [str(p) for p in outputs]
+    item.transcript_path = item.transcript_paths[0] if outputs else None
+    item.transcribe_seconds = total - 1.0
+    item.total_seconds = total
+    return item
+
+
+def test_jobs_are_identified_by_content_model_and_options(tmp_path):
+    ledger = Ledger(tmp_path / "ledger.sqlite")
+    a, b = tmp_path / "a.mp3", tmp_path / "copy.mp3"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    options = job_options(tmp_path / "out", {"out_format": "srt", "cache": object()})
+    assert set(options) == {"out_format", "out_dir"}
+
+    spec = ledger.spec(str(a), "m", options)
+    assert spec.key == ledger.spec(str(b), "m", options).key
+    assert spec.key != ledger.spec(str(a), "other", options).key
+    assert spec.key != ledger.spec(str(a), "m", {**options, "out_format": "txt"}).key
+
+    out = tmp_path / "out" / "a.srt"
+    out.parent.mkdir()
+    out.write_text("1")
+    ledger.record(spec, _item(str(a), outputs=[out]))
+    assert ledger.is_done(spec)
+    with patch("podkeet.ledger.hash_file", side_effect=AssertionError):
+        assert ledger.spec(str(a), "m", options).key == spec.key  # known size and mtime
+    out.unlink()
+    assert not ledger.is_done(spec)  # outputs deleted: do it again
+
+    with patch("podkeet.downloader.video_id", return_value="abc123"):
+        url = ledger.spec("https://youtu.be/abc123", "m", options)
+    assert url.content_hash == "url:abc123"
+
+
+def test_failures_count_since_the_last_success(tmp_path):
+    ledger = Ledger(tmp_path / "ledger.sqlite")
+    src = tmp_path / "ep.mp3"
+    src.write_bytes(b"x")
+    spec = ledger.spec(str(src), "m", {})
+    ledger.record(spec, _item(str(src), "error", error="boom"))
+    ledger.record(spec, _item(str(src), "error", error="boom"))
+    assert ledger.failures(spec) == 2
+    assert ledger.failed_sources() == [str(src)]
+
+    ledger.record(spec, _item(str(src), outputs=[src]))
+    assert ledger.failures(spec) == 0 and ledger.failed_sources() == []
+    job = ledger.last(spec)
+    assert job["transcribe_seconds"] == 5.0 and job["outputs"] == [str(src)]
+
+
+def test_stats_per_period(tmp_path):
+    ledger = Ledger(tmp_path / "ledger.sqlite")
+    src = tmp_path / "ep.mp3"
+    src.write_bytes(b"x")
+    spec = ledger.spec(str(src), "m", {})
+    with patch("podkeet.ledger.time.time", return_value=86400 * 10.5):
+        ledger.record(spec, _item(str(src), outputs=[src], audio=600.0, total=60.0))
+    with patch("podkeet.ledger.time.time", return_value=86400 * 12.5):
+        ledger.record(spec, _item(str(src), outputs=[src], audio=300.0, total=30.0))
+        ledger.record(spec, _item(str(src), "error", error="boom\ntraceback", total=10.0))
+
+    stats = ledger.stats()
+    assert [p["jobs"] for p in stats["periods"]] == [1, 2]
+    assert stats["periods"][1]["failure_rate"] == 0.5
+    assert stats["total"]["audio_seconds"] == 900.0
+    assert stats["total"]["throughput"] == 9.0
+    assert stats["errors"] == [{"error": "boom\ntraceback", "count": 1}]
+    assert len(ledger.stats(since=86400 * 12)["periods"]) == 1
+    assert len(ledger.stats(period="month")["periods"]) == 1
+
+
+def test_transcribe_many_skips_done_sources_and_retries_failed(tmp_path):
+    runner = CliRunner()
+    for name in ("one.mp3", "two.mp3"):
+        (tmp_path / name).write_bytes(name.encode())
+    out_dir = tmp_path / "out"
+    calls = []
+
+    def fake_transcribe(audio_path, **kwargs):
+        calls.append(audio_path.name)
+        if audio_path.name == "two.mp3" and calls.count("two.mp3") == 1:
+            raise RuntimeError("decoder crashed")
+        out = out_dir / (audio_path.stem + ".txt")
+        out.write_text("hi")
+        result = MagicMock()
+        result.out_path = out
+        result.out_paths = [out]
+        return result
+
+    def run(*args):
+        with (
+            patch("podkeet.pipeline.get_registry", return_value=MagicMock()),
+            patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+            patch("podkeet.batch.probe_duration", return_value=30.0),
+        ):
+            return runner.invoke(
+                app, ["transcribe-many", *args, "--out-dir", str(out_dir), "--no-timing"]
+            )
+
+    result = run(str(tmp_path / "*.mp3"))
+    assert result.exit_code == 1 and calls == ["one.mp3", "two.mp3"]
+
+    result = run(str(tmp_path / "one.mp3"), "--retry-failed")
+    assert result.exit_code == 0, result.output
+    assert calls[2:] == ["two.mp3"]
+    summary = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+    assert [Path(s).name for s in summary["skipped"]] == ["one.mp3"]
+
+    result = run(str(tmp_path / "*.mp3"))
+    assert result.exit_code == 0 and "Nothing to do" in result.output
+    run(str(tmp_path / "one.mp3"), "--force")
+    assert calls[3:] == ["one.mp3"]
+
+    result = runner.invoke(app, ["jobs", "--json", "--failed"])
+    stats = json.loads(result.stdout)
+    assert stats["total"]["jobs"] == 4 and stats["total"]["failed"] == 1
+    assert stats["failed_sources"] == []
+    result = runner.invoke(app, ["jobs", "--by", "week"])
+    assert result.exit_code == 0 and "decoder crashed" in result.output
+    assert runner.invoke(app, ["jobs", "--by", "year"]).exit_code == 2
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import transcribe
+
+
+class StubModel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+
+    def transcribe(self, path):
+        self.calls += 1
+        return SimpleNamespace(text=f"hello from {self.name}", sentences=[])
+
+
+def make_registry(max_models: int = 1):
+    loaded = []
+
+    def loader(model_name, dtype):
+        loaded.append((model_name, dtype))
+        return StubModel(model_name)
+
+    return ModelRegistry(max_models=max_models, loader=loader), loaded
+
+
+def test_registry_reuses_loaded_model():
+    registry, loaded = make_registry()
+    first = registry.get("m1")
+    second = registry.get("m1")
+    assert first is second
+    assert loaded == [("m1", "bfloat16")]
+    assert registry.stats.hits == 1
+    assert registry.stats.misses == 1
+    assert registry.stats.hit_rate == 0.5
+
+
+def test_registry_keys_on_dtype():
+    registry, loaded = make_registry(max_models=2)
+    registry.get("m1", "bfloat16")
+    registry.get("m1", "float32")
+    assert len(loaded) == 2
+    assert ("m1", "float32") in registry
+
+
+def test_registry_evicts_least_recently_used():
+    registry, loaded = make_registry(max_models=2)
+    registry.get("m1")
+    registry.get("m2")
+    registry.get("m1")  # m2 is now least recently used
+    registry.get("m3")
+    assert registry.loaded() == [("m1", "bfloat16"), ("m3", "bfloat16")]
+    assert registry.stats.evictions == 1
+    assert [name for name, _ in loaded] == ["m1", "m2", "m3"]  # the hit on m1 didn't reload
+
+
+def test_registry_unload_and_clear():
+    registry, loaded = make_registry(max_models=2)
+    registry.get("m1")
+    registry.get("m2")
+    assert registry.unload("m1") is True
+    assert registry.unload("m1") is False
+    registry.clear()
+    assert len(registry) == 0
+    registry.get("m2")
+    assert loaded.count(("m2", "bfloat16")) == 2
+
+
+def test_registry_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        ModelRegistry(max_models=0)
+
+
+def test_transcribe_loads_model_once_per_registry(tmp_path):
+    registry, loaded = make_registry()
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"fake")
+
+    with patch("podkeet.transcriber.ensure_ffmpeg"):
+        for _ in range(3):
+            result = transcribe(audio, model_name="m1", out_dir=tmp_path, registry=registry)
+
+    assert loaded == [("m1", "bfloat16")]
+    assert registry.stats.hits == 2
+    assert result.text == "hello from m1"
+    assert result.out_path.read_text(encoding="utf-8") == "hello from m1"
@@ -0,0 +1,119 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from podkeet.cli import app
+from podkeet.formats import _to_json, _to_jsonl
+from podkeet.search import SearchIndex
+
+
+def _sentence(words, start):
+    tokens = []
+    t = start
+    for word in words:
+        for i, piece in enumerate(word):
+            tokens.append({"text": (" " if i == 0 else "") + piece, "start": t, "end": t + 0.25})
+            t += 0.25
+    text = "".join(tok["text"] for tok in tokens)
+    return {"text": text, "start": start, "end": t, "duration": t - start, "tokens": tokens}
+
+
+def _result(*sentences):
+    return {"text": "".join(s["text"] for s in sentences), "sentences": list(sentences)}
+
+
+EPISODE = _result(
+    _sentence([["Wel", "come"], ["to"], ["the"], ["show"]], 0.0),
+    _sentence([["Today"], ["we"], ["talk"], ["about"], ["sour", "dough"], ["bread"]], 2.0),
+)
+
+
+def test_search_times_hits_to_the_matching_words(tmp_path):
+    (tmp_path / "ep1.json").write_text(_to_json(EPISODE), encoding="utf-8")
+    (tmp_path / "ep2.jsonl").write_text(
+        _to_jsonl(_result(_sentence([["More"], ["sour", "dough"], ["tips"]], 10.0))),
+        encoding="utf-8",
+    )
+    (tmp_path / "summary.json").write_text(json.dumps({"results": []}), encoding="utf-8")
+    index = SearchIndex()
+
+    update = index.update([tmp_path])
+    assert (update.added, update.skipped) == (2, 1)
+    assert index.stats()["sentences"] == 3
+
+    hits = index.search("sourdough bread")
+    assert [os.path.basename(h.path) for h in hits] == ["ep1.json"]
+    hit = hits[0]
+    assert hit.text == "Today we talk about sourdough bread"
+    assert (hit.start_ms, hit.end_ms) == (3000, 3750)  # "sour" through "bread"
+    assert (hit.sentence_start_ms, hit.sentence_end_ms) == (2000, 3750)
+
+    assert {os.path.basename(h.path) for h in index.search("sourdough")} == {
+        "ep1.json",
+        "ep2.jsonl",
+    }
+    assert [h.start_ms for h in index.search("welc*")] == [0]
+    assert index.search('"talk about') != []  # not valid FTS5: searched as plain words
+    assert index.search("pizza") == []
+
+
+def test_update_is_incremental(tmp_path):
+    ep1, ep2 = tmp_path / "ep1.json", tmp_path / "ep2.json"
+    ep1.write_text(_to_json(EPISODE), encoding="utf-8")
+    ep2.write_text(_to_json(_result(_sentence([["Hello"]], 0.0))), encoding="utf-8")
+    index = SearchIndex()
+    index.update([tmp_path])
+
+    with patch("podkeet.search.read_sentences", side_effect=AssertionError):
+        assert index.update([tmp_path]).unchanged == 2  # nothing is read again
+
+    ep2.write_text(_to_json(_result(_sentence([["Goodbye"]], 0.0))), encoding="utf-8")
+    ep1.unlink()
+    update = index.update([tmp_path])
+    assert (update.updated, update.removed) == (1, 1)
+    assert index.search("hello") == [] and index.search("show") == []
+    assert [h.text for h in index.search("goodbye")] == ["Goodbye"]
+    assert index.stats()["documents"] == 1
+
+
+def test_cli_index_search_and_auto_index(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "ep1.json").write_text(_to_json(EPISODE), encoding="utf-8")
+
+    assert runner.invoke(app, ["search", "bread"]).exit_code == 1  # no index yet
+    result = runner.invoke(app, ["index", str(out), "--json"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["added"] == 1
+
+    def fake_transcribe(audio_path, **kwargs):
+        path = out / "ep2.json"
+        path.write_text(_to_json(_result(_sentence([["Bread"], ["again"]], 5.0))))
+        result = MagicMock()
+        result.out_path = path
+        result.out_paths = [path]
+        return result
+
+    audio = tmp_path / "ep2.mp3"
+    audio.write_bytes(b"fake")
+    with (
+        patch("podkeet.pipeline.get_registry", return_value=MagicMock()),
+        patch("podkeet.batch.run_transcription", side_effect=fake_transcribe),
+        patch("podkeet.batch.probe_duration", return_value=30.0),
+    ):
+        result = runner.invoke(
+            app, ["transcribe-many", str(audio), "--out-dir", str(out), "--no-timing"]
+        )
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(app, ["search", "bread", "--json"])
+    hits = json.loads(result.stdout)
+    assert sorted((os.path.basename(h["path"]), h["start_ms"]) for h in hits) == [
+        ("ep1.json", 3500),
+        ("ep2.json", 5000),
+    ]
+    result = runner.invoke(app, ["search", "bread"])
+    assert "00:00:05.000 --> 00:00:05.250" in result.output
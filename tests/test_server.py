@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from podkeet.models import ModelRegistry
+from podkeet.server import TranscriptionServer, _percentiles
+
+
+class StubModel:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.calls = []
+
+    def transcribe(self, audio_path):
+        self.calls.append(audio_path.name)
+        if self.gate is not None:
+            self.gate.wait(5)
+        tok = SimpleNamespace(text=" hello.", start=0.0, end=0.5, duration=0.5)
+        sent = SimpleNamespace(text=tok.text, start=0.0, end=0.5, duration=0.5, tokens=[tok])
+        return SimpleNamespace(text=tok.text, sentences=[sent])
+
+
+@contextmanager
+def _serving(tmp_path, model, **kwargs):
+    loads = []
+    registry = ModelRegistry(loader=lambda name, dtype: loads.append(name) or model)
+    server = TranscriptionServer(tmp_path / "jobs", registry=registry, **kwargs)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start("127.0.0.1", 0))
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.probe_duration", return_value=0.0),
+        patch("podkeet.batch.probe_duration", return_value=10.0),
+    ):
+        thread.start()
+        assert ready.wait(5)
+        assert loads == [server.model_name]  # warmed before accepting requests
+        try:
+            yield f"http://127.0.0.1:{server.port}"
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+
+def _call(url, data=None, content_type="application/json"):
+    if isinstance(data, dict):
+        data = json.dumps(data).encode()
+    req = Request(url, data=data, headers={"Content-Type": content_type} if data else {})
+    try:
+        with urlopen(req, timeout=5) as resp:
+            return resp.status, resp.read()
+    except HTTPError as e:
+        return e.code, e.read()
+
+
+def _wait_done(base, job_id):
+    for _ in range(200):
+        status, body = _call(f"{base}/jobs/{job_id}")
+        assert status == 200
+        job = json.loads(body)
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_path_and_upload_jobs_produce_results_and_metrics(tmp_path):
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    model = StubModel()
+
+    with _serving(tmp_path, model, out_format="txt,srt", source_dirs=[tmp_path]) as base:
+        status, body = _call(f"{base}/jobs", {"source": str(audio)})
+        assert status == 202
+        job = _wait_done(base, json.loads(body)["id"])
+        assert job["status"] == "done"
+        assert job["audio_seconds"] == 10.0
+        assert set(job["results"]) == {"txt", "srt"}
+
+        status, srt = _call(f"{base}/jobs/{job['id']}/result?format=srt")
+        assert status == 200
+        assert srt.decode() == "1\n00:00:00,000 --> 00:00:00,500\nhello.\n"
+        assert _call(f"{base}/jobs/{job['id']}/result?format=vtt")[0] == 404
+
+        status, body = _call(
+            f"{base}/jobs?filename=up.wav&format=txt", b"RIFF", "application/octet-stream"
+        )
+        assert status == 202
+        upload = _wait_done(base, json.loads(body)["id"])
+        assert upload["source"] == "up.wav"
+        assert _call(f"{base}/jobs/{upload['id']}/result")[1] == b"hello."
+        assert not (tmp_path / "jobs" / upload["id"] / "upload").exists()
+
+        health = json.loads(_call(f"{base}/health")[1])
+        assert health["model_loaded"] is True
+        metrics = json.loads(_call(f"{base}/metrics")[1])
+
+    assert model.calls == ["ep.mp3", "up.wav"]
+    assert metrics["queue_depth"] == 0
+    assert metrics["jobs"]["completed"] == 2
+    assert metrics["jobs"]["audio_seconds"] == 20.0
+    assert metrics["jobs"]["latency_ms"]["p50"] is not None
+    assert metrics["jobs"]["realtime_factor"] < 1.0
+    assert metrics["model_registry"]["misses"] == 1
+
+
+def test_full_queue_is_rejected_and_failures_are_reported(tmp_path):
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    gate = threading.Event()
+
+    with _serving(
+        tmp_path, StubModel(gate), max_queue=1, concurrency=1, source_dirs=[tmp_path]
+    ) as base:
+        first = json.loads(_call(f"{base}/jobs", {"source": str(audio)})[1])
+        for _ in range(100):  # wait until the worker has taken the first job
+            if json.loads(_call(f"{base}/jobs/{first['id']}")[1])["status"] == "running":
+                break
+            time.sleep(0.02)
+        status, body = _call(f"{base}/jobs", {"source": str(audio)})
+        assert status == 202
+        second = json.loads(body)
+        status, body = _call(f"{base}/jobs", {"source": str(audio)})
+        assert status == 503
+        assert "full" in json.loads(body)["error"]
+
+        status, body = _call(f"{base}/jobs/{first['id']}/result")
+        assert status == 409
+        gate.set()
+        assert _wait_done(base, second["id"])["status"] == "done"
+
+        missing = json.loads(_call(f"{base}/jobs", {"source": str(tmp_path / "nope.mp3")})[1])
+        failed = _wait_done(base, missing["id"])
+        assert failed["status"] == "error"
+        assert "FileNotFoundError" in failed["error"]
+
+        assert _call(f"{base}/jobs", {"format": "srt"})[0] == 400
+        for outside in ("/etc/passwd", str(tmp_path / ".." / "secret.mp3")):
+            assert _call(f"{base}/jobs", {"source": outside})[0] == 403
+        assert _call(f"{base}/jobs", {"source": str(audio), "format": "pdf"})[0] == 400
+        assert _call(f"{base}/jobs/deadbeef")[0] == 404
+        metrics = json.loads(_call(f"{base}/metrics")[1])
+
+    assert metrics["jobs"]["rejected"] == 1
+    assert metrics["jobs"]["failed"] == 1
+
+
+def test_pruned_jobs_take_their_outputs_with_them(tmp_path):
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    jobs = tmp_path / "jobs"
+
+    with _serving(tmp_path, StubModel(), max_jobs=1, source_dirs=[tmp_path]) as base:
+        first = json.loads(_call(f"{base}/jobs", {"source": str(audio)})[1])
+        _wait_done(base, first["id"])
+        assert (jobs / first["id"] / "ep.txt").exists()
+
+        second = json.loads(_call(f"{base}/jobs", {"source": str(audio)})[1])
+        _wait_done(base, second["id"])
+        assert _call(f"{base}/jobs/{first['id']}")[0] == 404
+        assert not (jobs / first["id"]).exists()
+        assert (jobs / second["id"] / "ep.txt").exists()
+
+
+@pytest.mark.parametrize(
+    "values,expected",
+    [([], None), ([0.1], 100.0), ([i / 100 for i in range(1, 101)], 500.0)],
+)
+def test_percentiles_nearest_rank(values, expected):
+    assert _percentiles(values)["p50"] == expected
@@ -0,0 +1,152 @@
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from podkeet.batch import run_batch
+from podkeet.checkpoints import CheckpointStore
+from podkeet.chunking import plan_chunks
+from podkeet.models import ModelRegistry
+from podkeet.pipeline import run_pipeline
+from podkeet.sharding import plan_shards, transcribe_sharded
+from podkeet.transcriber import _transcribe_chunked, transcribe
+from podkeet.transcript import Transcript
+
+RATE = 16_000
+
+
+def stub_loader(name, dtype):
+    return SimpleNamespace(name=name)
+
+
+def sentence(toks):
+    start, end = toks[0].start, toks[-1].end
+    text = "".join(t.text for t in toks)
+    return SimpleNamespace(text=text, start=start, end=end, duration=end - start, tokens=toks)
+
+
+def hear(model, samples, dtype):
+    """One token per second of audio, named after the sample value (the second)."""
+    samples = np.asarray(samples)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(samples)) + 1))
+    sentences, toks = [], []
+    for i in starts:
+        value = int(samples[i])
+        start = i / RATE
+        end = min(start + 0.5, len(samples) / RATE)
+        text = f" w{value}" + ("." if value % 5 == 4 else "")
+        toks.append(SimpleNamespace(text=text, start=start, end=end, duration=end - start))
+        if value % 5 == 4:
+            sentences.append(sentence(toks))
+            toks = []
+    if toks:
+        sentences.append(sentence(toks))
+    return SimpleNamespace(text="".join(s.text for s in sentences), sentences=sentences)
+
+
+def seconds_audio(seconds):
+    return np.repeat(np.arange(seconds, dtype=np.float32), RATE)
+
+
+def test_plan_shards_splits_evenly_and_respects_worker_memory():
+    chunks, plan = plan_shards(3600 * RATE, 4, overlap_seconds=15.0, worker_memory_mb=1e6)
+    assert len(chunks) == 4 and plan.workers == 4
+    assert plan.chunk_seconds == 915.0
+    assert chunks[-1].end == 3600 * RATE
+
+    chunks, plan = plan_shards(3600 * RATE, 4, overlap_seconds=15.0, worker_memory_mb=3000)
+    assert plan.chunk_seconds < 915.0 and len(chunks) > 4
+    assert "memory" in plan.reason
+
+    chunks, _ = plan_shards(100 * RATE, 2, chunk_seconds=30.0, overlap_seconds=5.0)
+    assert chunks == plan_chunks(100 * RATE, 30.0, RATE, 5.0)
+    with pytest.raises(ValueError):
+        plan_shards(RATE, 0)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="workers are forked to keep the patch")
+def test_sharded_matches_serial_chunked(tmp_path):
+    samples = seconds_audio(100)
+    pieces = []
+    with patch("podkeet.transcriber._transcribe_samples", side_effect=hear):
+        serial = _transcribe_chunked(stub_loader("m", "d"), samples, "d", 30.0, 5.0)
+        sharded, plan = transcribe_sharded(
+            samples,
+            3,
+            loader=stub_loader,
+            chunk_seconds=30.0,
+            overlap_seconds=5.0,
+            on_final=pieces.append,
+            start_method="fork",
+        )
+
+    assert plan.workers == 3 and plan.chunk_seconds == 30.0
+    assert sharded.text == serial.text
+    assert sharded.text.split()[:3] == ["w0", "w1", "w2"] and "w99" in sharded.text
+    np.testing.assert_allclose(sharded.token_start, serial.token_start)
+    assert pieces and pieces[0].sentence_text[0].strip() == "w0 w1 w2 w3 w4."
+
+
+def test_fully_checkpointed_run_starts_no_workers(tmp_path):
+    samples = seconds_audio(60)
+    chunks = plan_chunks(len(samples), 30.0, RATE, 5.0)
+    store = CheckpointStore(tmp_path)
+    checkpoint = store.open("audio", "m", "d")
+    for chunk in chunks:
+        checkpoint.save(chunk, Transcript.from_result(hear(None, chunk.slice(samples), "d")))
+
+    with patch("podkeet.sharding.ProcessPoolExecutor", side_effect=AssertionError):
+        transcript, _ = transcribe_sharded(
+            samples,
+            2,
+            chunk_seconds=30.0,
+            overlap_seconds=5.0,
+            checkpoint=store.open("audio", "m", "d", resume=True),
+        )
+    assert transcript.text.split()[0] == "w0" and "w59" in transcript.text
+
+
+def test_transcribe_with_workers_shards_without_loading_the_model(tmp_path):
+    registry = ModelRegistry(loader=stub_loader)
+    merged = Transcript.from_result(hear(None, seconds_audio(5), "d"))
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.sharding.transcribe_sharded", return_value=(merged, None)) as sharded,
+    ):
+        result = transcribe(
+            tmp_path / "ep.mp3",
+            out_dir=tmp_path,
+            registry=registry,
+            samples=seconds_audio(5),
+            workers=3,
+            memory_budget_mb=9000,
+        )
+
+    assert result.text.startswith("w0 w1")
+    assert len(registry) == 0
+    args, kwargs = sharded.call_args
+    assert args[1] == 3 and kwargs["loader"] is stub_loader
+    assert kwargs["worker_memory_mb"] == 3000
+
+
+@pytest.mark.parametrize("runner", ["batch", "pipeline"])
+def test_batches_leave_model_loading_to_the_workers(tmp_path, runner):
+    def no_load(name, dtype):
+        raise AssertionError("the parent process must not hold a copy of the model")
+
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    result = MagicMock()
+    result.out_path = tmp_path / "ep.txt"
+    run = run_batch if runner == "batch" else run_pipeline
+    with (
+        patch("podkeet.batch.run_transcription", return_value=result) as transcribe_one,
+        patch("podkeet.batch.probe_duration", return_value=60.0),
+    ):
+        summary = run([str(audio)], tmp_path, registry=ModelRegistry(loader=no_load), workers=2)
+
+    assert [i.status for i in summary.items] == ["ok"]
+    assert transcribe_one.call_args.kwargs["workers"] == 2
+    assert summary.model_load_seconds == 0.0
@@ -0,0 +1,129 @@
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from typer.testing import CliRunner
+
+from podkeet.cli import app
+from podkeet.models import ModelRegistry
+from podkeet.tracing import Tracer, span, tracing
+from podkeet.transcriber import transcribe
+
+
+def test_span_is_a_noop_without_tracing():
+    with span("idle") as s:
+        assert s is None
+
+
+def test_nested_spans_and_chrome_trace(tmp_path):
+    with tracing() as tracer:
+        with span("outer", source="a.mp3"):
+            with span("inner", index=0):
+                pass
+            with span("inner", index=1):
+                pass
+
+    by_name = {s.name: s for s in tracer.spans}
+    assert by_name["inner"].parent == "outer" and by_name["inner"].depth == 1
+    assert by_name["outer"].depth == 0 and by_name["outer"].args == {"source": "a.mp3"}
+
+    stages = tracer.stages()
+    assert list(stages) == ["outer", "inner"]
+    assert stages["inner"]["count"] == 2
+    assert stages["outer"]["seconds"] >= stages["inner"]["seconds"]
+    assert tracer.as_dict()["peak_rss_mb"] > 0
+
+    data = json.loads(tracer.write(tmp_path / "trace.json").read_text())
+    complete = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in complete] == ["outer", "inner", "inner"]
+    assert complete[1]["args"]["index"] == 0 and "peak_rss_mb" in complete[1]["args"]
+    assert complete[0]["ts"] <= complete[1]["ts"]
+    assert any(e["ph"] == "C" and e["name"] == "peak_rss_mb" for e in data["traceEvents"])
+    assert any(e["ph"] == "M" for e in data["traceEvents"])
+
+
+def test_spans_from_other_threads_are_recorded():
+    barrier = threading.Barrier(3)
+
+    def work():
+        with span("download"):
+            barrier.wait(timeout=2)  # all three alive at once, so thread IDs differ
+
+    with tracing() as tracer:
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert tracer.stages()["download"]["count"] == 3
+    assert len({s.thread for s in tracer.spans}) == 3
+
+
+def test_chunked_transcription_records_every_stage(tmp_path):
+    tok = SimpleNamespace(text=" hi.", start=1.0, end=1.5, duration=0.5)
+    sent = SimpleNamespace(text=tok.text, start=1.0, end=1.5, duration=0.5, tokens=[tok])
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace())
+    samples = np.zeros(16_000 * 25, dtype=np.float32)
+
+    with (
+        tracing() as tracer,
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch(
+            "podkeet.transcriber._transcribe_samples",
+            return_value=SimpleNamespace(text=tok.text, sentences=[sent]),
+        ),
+    ):
+        transcribe(
+            tmp_path / "ep.mp3",
+            out_dir=tmp_path,
+            out_format="srt,txt",
+            registry=registry,
+            samples=samples,
+            chunk_seconds=10.0,
+            overlap_seconds=0.0,
+        )
+
+    stages = tracer.stages()
+    assert stages["model.load"]["count"] == 1
+    assert stages["chunk.split"]["count"] == 1
+    assert stages["chunk.infer"]["count"] == 3
+    assert stages["merge"]["count"] == 3
+    assert stages["write"]["count"] == 4  # three streamed windows + closing
+    infer = [s for s in tracer.spans if s.name == "chunk.infer"]
+    assert [s.args["offset"] for s in infer] == [0.0, 10.0, 20.0]
+
+
+def test_cli_trace_and_profile_in_json_summary(tmp_path):
+    audio = tmp_path / "ep.mp3"
+    audio.write_bytes(b"fake")
+    fake_result = MagicMock()
+    fake_result.out_path = tmp_path / "ep.json"
+    fake_result.plan = None
+
+    def fake_transcribe(*args, **kwargs):
+        with span("chunk.infer", index=0):
+            pass
+        return fake_result
+
+    trace = tmp_path / "trace.json"
+    with patch("podkeet.cli.run_transcription", side_effect=fake_transcribe):
+        result = CliRunner().invoke(
+            app,
+            ["transcribe", str(audio), "--out-dir", str(tmp_path), "--format", "json"]
+            + ["--trace", str(trace)],
+        )
+
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert list(data["profile"]["stages"]) == ["transcribe", "chunk.infer"]
+    assert data["profile"]["peak_rss_mb"] > 0
+    assert data["trace_path"] == str(trace)
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert {e["name"] for e in events if e["ph"] == "X"} == {"transcribe", "chunk.infer"}
+
+
+def test_tracer_without_spans_reports_process_peak():
+    assert Tracer().as_dict()["stages"] == {}
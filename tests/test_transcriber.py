@@ -0,0 +1,254 @@
+import logging
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from podkeet.chunking import plan_chunks
+from podkeet.formats import _to_srt, _to_vtt
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import _merge_transcripts, parse_formats, render_transcript, transcribe
+from podkeet.transcript import Transcript
+
+
+def stub_registry():
+    return ModelRegistry(loader=lambda name, dtype: SimpleNamespace(name=name))
+
+
+def test_transcribe_hands_decoded_samples_to_model(tmp_path):
+    video = tmp_path / "talk.mp4"
+    samples = np.zeros(16_000, dtype=np.float32)
+    decoded = SimpleNamespace(text="from pcm", sentences=[])
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.decode_audio", return_value=samples) as mock_decode,
+        patch("podkeet.transcriber._transcribe_samples", return_value=decoded) as mock_run,
+    ):
+        result = transcribe(video, out_dir=tmp_path, registry=stub_registry(), pcm=True)
+
+    mock_decode.assert_called_once_with(video, sample_rate=16_000)
+    assert mock_run.call_args.args[1] is samples
+    assert result.out_path == tmp_path / "talk.txt"
+    assert result.text == "from pcm"
+
+
+def _tok(text, start, end):
+    return SimpleNamespace(text=text, start=start, end=end, duration=end - start)
+
+
+def test_oom_fallback_transcribes_pcm_slices_with_exact_offsets(tmp_path):
+    class OOMModel:
+        def transcribe(self, path):
+            raise RuntimeError("[metal::malloc] Attempting to allocate too much")
+
+    registry = ModelRegistry(loader=lambda name, dtype: OOMModel())
+    samples = np.zeros(16_000 * 1500, dtype=np.float32)  # 25 minutes
+    seen = []
+
+    def fake_samples(model, chunk, dtype):
+        seen.append(len(chunk))
+        tok = _tok(f" part{len(seen)}", 1.0, 1.5)
+        sent = SimpleNamespace(text=tok.text, start=1.0, end=1.5, duration=0.5, tokens=[tok])
+        return SimpleNamespace(text=tok.text, sentences=[sent])
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.decode_audio", return_value=samples) as mock_decode,
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake_samples),
+    ):
+        result = transcribe(
+            tmp_path / "long.mp3",
+            out_dir=tmp_path,
+            out_format="srt",
+            registry=registry,
+            overlap_seconds=0.0,
+        )
+
+    mock_decode.assert_called_once()
+    assert seen == [16_000 * 600, 16_000 * 600, 16_000 * 300]
+    srt = result.out_path.read_text(encoding="utf-8")
+    assert "00:10:01,000 --> 00:10:01,500" in srt
+    assert "00:20:01,000 --> 00:20:01,500" in srt
+
+
+def _tdict(text, start, end):
+    return {"text": text, "start": start, "end": end, "duration": end - start}
+
+
+def _sdict(tokens):
+    return {
+        "text": "".join(t["text"] for t in tokens),
+        "start": tokens[0]["start"],
+        "end": tokens[-1]["end"],
+        "duration": tokens[-1]["end"] - tokens[0]["start"],
+        "tokens": tokens,
+    }
+
+
+def test_merge_overlapping_chunks_keeps_seam_tokens_once():
+    # Windows [0, 10) and [8, 18): both heard "quick brown fox" around 8-10s
+    chunks = plan_chunks(16_000 * 18, chunk_seconds=10, overlap_seconds=2)
+    left = [
+        _tdict(" The", 6.0, 6.5),
+        _tdict(" quick", 8.1, 8.5),
+        _tdict(" brown", 8.9, 9.3),
+        _tdict(" fo", 9.8, 10.0),  # clipped at the window edge
+    ]
+    right = [
+        _tdict(" quick", 8.12, 8.5),
+        _tdict(" brown", 8.92, 9.3),
+        _tdict(" fox.", 9.8, 10.2),
+        _tdict(" Next", 12.0, 12.4),
+    ]
+    merged = _merge_transcripts(
+        [
+            Transcript.from_dict({"text": "", "sentences": [_sdict(left)]}),
+            Transcript.from_dict({"text": "", "sentences": [_sdict(right)]}),
+        ],
+        chunks,
+    )
+
+    assert merged.token_texts() == [" The", " quick", " brown", " fox.", " Next"]
+    # The sentence split by the seam is stitched back into one
+    assert merged.num_sentences == 1
+    assert merged.sentence_start.tolist() == [6.0]
+    assert merged.sentence_end.tolist() == [12.4]
+    assert merged.text == "The quick brown fox. Next"
+
+
+def test_merge_overlapping_chunks_without_match_cuts_at_midpoint():
+    chunks = plan_chunks(16_000 * 18, chunk_seconds=10, overlap_seconds=2)
+    left = [_sdict([_tdict(" a", 1.0, 1.2)]), _sdict([_tdict(" b", 8.5, 8.7)])]
+    right = [_sdict([_tdict(" c", 9.5, 9.7)]), _sdict([_tdict(" d", 15.0, 15.2)])]
+    merged = _merge_transcripts(
+        [
+            Transcript.from_dict({"text": "", "sentences": left}),
+            Transcript.from_dict({"text": "", "sentences": right}),
+        ],
+        chunks,
+    )
+    assert merged.sentence_text == [" a", " b", " c", " d"]
+
+
+def test_transcribe_plans_chunking_before_inference(tmp_path, caplog):
+    class FullFileForbidden:
+        def transcribe(self, path):
+            raise AssertionError("full-file attempt should have been skipped")
+
+    registry = ModelRegistry(loader=lambda name, dtype: FullFileForbidden())
+    windows = []
+
+    def fake_samples(model, chunk, dtype):
+        windows.append(len(chunk))
+        return SimpleNamespace(text="", sentences=[])
+
+    with (
+        caplog.at_level(logging.INFO, logger="podkeet.transcriber"),
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.probe_duration", return_value=1800.0),
+        patch("podkeet.transcriber.decode_audio", return_value=np.zeros(16_000 * 1800, "f4")),
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake_samples),
+    ):
+        result = transcribe(
+            tmp_path / "long.mp3", out_dir=tmp_path, registry=registry, memory_budget_mb=3000
+        )
+
+    assert result.plan.chunked
+    assert set(windows[:-1]) == {16_000 * int(result.plan.chunk_seconds)}
+    assert "Planned chunked transcription of long.mp3" in caplog.text
+
+
+def test_parse_formats():
+    assert parse_formats("srt") == ["srt"]
+    assert parse_formats("txt, SRT,txt") == ["txt", "srt"]
+    assert parse_formats(["vtt", "json"]) == ["vtt", "json"]
+    assert parse_formats("all") == ["txt", "srt", "vtt", "json", "jsonl"]
+    with pytest.raises(ValueError):
+        parse_formats("docx")
+
+
+def test_transcribe_renders_every_format_from_one_inference(tmp_path):
+    calls = []
+
+    def fake_transcribe(path):
+        calls.append(path)
+        tok = _tok(" hi", 0.0, 0.4)
+        sent = SimpleNamespace(text=" hi", start=0.0, end=0.4, duration=0.4, tokens=[tok])
+        return SimpleNamespace(text=" hi", sentences=[sent])
+
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace(transcribe=fake_transcribe))
+    audio = tmp_path / "ep.mp3"
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.probe_duration", return_value=0.0),
+    ):
+        result = transcribe(audio, out_dir=tmp_path, out_format="all", registry=registry)
+
+    assert len(calls) == 1
+    assert [p.name for p in result.out_paths] == [
+        "ep.txt",
+        "ep.srt",
+        "ep.vtt",
+        "ep.json",
+        "ep.jsonl",
+    ]
+    assert result.out_path == tmp_path / "ep.txt"
+    assert (tmp_path / "ep.vtt").read_text(encoding="utf-8").startswith("WEBVTT")
+    assert "00:00:00,000 --> 00:00:00,400" in (tmp_path / "ep.srt").read_text(encoding="utf-8")
+
+
+def _sentence(tokens):
+    return SimpleNamespace(
+        text="".join(t.text for t in tokens),
+        start=tokens[0].start,
+        end=tokens[-1].end,
+        tokens=tokens,
+    )
+
+
+def test_highlight_words_emits_one_cue_per_token():
+    tokens = [_tok(" Hello", 0.0, 0.4), _tok(" world", 0.5, 0.9), _tok(".", 0.9, 1.0)]
+    result = SimpleNamespace(sentences=[_sentence(tokens)])
+
+    srt = _to_srt(result, highlight_words=True)
+    vtt = _to_vtt(result, highlight_words=True)
+
+    assert srt.split("\n")[:8] == [
+        "1",
+        "00:00:00,000 --> 00:00:00,500",
+        "<u>Hello</u> world.",
+        "",
+        "2",
+        "00:00:00,500 --> 00:00:00,900",
+        "Hello <u>world</u>.",
+        "",
+    ]
+    assert "00:00:00.900 --> 00:00:01.000\nHello world<b>.</b>\n" in vtt
+
+
+def test_highlight_words_wraps_only_the_token_itself():
+    # Whitespace-only tokens used to get empty tags spliced between every character
+    tokens = [_tok(" aa", 0.0, 0.2), _tok(" ", 0.2, 0.3), _tok("a", 0.3, 0.4)]
+    srt = _to_srt(SimpleNamespace(sentences=[_sentence(tokens)]), highlight_words=True)
+    cues = srt.split("\n")[2::4]
+    assert cues == ["<u>aa</u> a", "aa a", "aa <u>a</u>"]
+
+
+def test_render_transcript_highlight_words(tmp_path):
+    tokens = [_tok(" Hi", 0.0, 0.3), _tok(" there", 0.3, 0.6)]
+    sentence = {
+        "text": " Hi there",
+        "start": 0.0,
+        "end": 0.6,
+        "duration": 0.6,
+        "tokens": [vars(t) for t in tokens],
+    }
+    result = {"text": " Hi there", "sentences": [sentence]}
+
+    render_transcript(result, "ep", tmp_path, "srt,txt", highlight_words=True)
+
+    assert "Hi <u>there</u>" in (tmp_path / "ep.srt").read_text(encoding="utf-8")
+    assert (tmp_path / "ep.txt").read_text(encoding="utf-8") == "Hi there"
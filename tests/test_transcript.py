@@ -0,0 +1,98 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from podkeet.formats import _to_json
+from podkeet.transcript import Transcript
+
+
+def _tok(text, start, end):
+    return {"text": text, "start": start, "end": end, "duration": end - start}
+
+
+def _sent(tokens):
+    return {
+        "text": "".join(t["text"] for t in tokens),
+        "start": tokens[0]["start"],
+        "end": tokens[-1]["end"],
+        "duration": tokens[-1]["end"] - tokens[0]["start"],
+        "tokens": tokens,
+    }
+
+
+def _result():
+    first = [_tok(" the", 0.0, 0.2), _tok(" cat", 0.2, 0.5), _tok(".", 0.5, 0.6)]
+    second = [_tok(" the", 1.0, 1.2), _tok(" end", 1.2, 1.5)]
+    return {"text": " the cat. the end", "sentences": [_sent(first), _sent(second)]}
+
+
+def test_from_dict_interns_token_text_and_roundtrips():
+    data = _result()
+    t = Transcript.from_dict(data)
+
+    assert t.strings == [" the", " cat", ".", " end"]
+    assert t.token_ids.tolist() == [0, 1, 2, 0, 3]
+    assert t.bounds.tolist() == [0, 3, 5]
+    assert t.token_start.dtype == np.float64
+    assert t.to_dict() == data
+
+
+def test_from_result_reads_attribute_objects():
+    ns = SimpleNamespace(
+        text="hi",
+        sentences=[
+            SimpleNamespace(
+                text=" hi",
+                start=1.0,
+                end=1.5,
+                duration=0.5,
+                tokens=[SimpleNamespace(text=" hi", start=1.0, end=1.5, duration=0.5)],
+            )
+        ],
+    )
+    t = Transcript.from_result(ns)
+    assert t.token_texts() == [" hi"]
+    assert Transcript.from_result(t) is t
+
+
+def test_shift_moves_timings_but_not_durations():
+    t = Transcript.from_dict(_result()).shift(600.0)
+    assert t.token_start.tolist() == [600.0, 600.2, 600.5, 601.0, 601.2]
+    assert t.sentence_end.tolist() == [600.6, 601.5]
+    assert t.token_duration.tolist()[0] == 0.2
+
+
+def test_select_rebuilds_cut_sentences():
+    t = Transcript.from_dict(_result())
+    out, first_cut, last_cut = t.select(t.token_start >= 0.2)
+
+    assert out.sentence_text == [" cat.", " the end"]
+    assert out.sentence_start.tolist() == [0.2, 1.0]
+    assert (first_cut, last_cut) == (True, False)
+    assert out.bounds.tolist() == [0, 2, 4]
+
+
+def test_concat_merges_string_tables_and_joins_seam_sentence():
+    a = Transcript.from_dict({"text": "", "sentences": [_sent([_tok(" one", 0.0, 0.3)])]})
+    b = Transcript.from_dict(
+        {"text": "", "sentences": [_sent([_tok(" two", 0.3, 0.6), _tok(" one", 0.6, 0.9)])]}
+    )
+    out = Transcript.concat([a, b], join_first=True)
+
+    assert out.strings == [" one", " two"]
+    assert out.token_texts() == [" one", " two", " one"]
+    assert out.sentence_text == [" one two one"]
+    assert out.bounds.tolist() == [0, 3]
+    assert (out.sentence_start.tolist(), out.sentence_end.tolist()) == ([0.0], [0.9])
+
+
+def test_to_json_rounds_timings():
+    data = {"text": "x", "sentences": [_sent([_tok(" x", 0.12345, 0.56789)])]}
+    out = json.loads(_to_json(Transcript.from_dict(data)))
+    assert out["sentences"][0]["tokens"][0] == {
+        "text": " x",
+        "start": 0.123,
+        "end": 0.568,
+        "duration": 0.444,
+    }
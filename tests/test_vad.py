@@ -0,0 +1,105 @@
+import re
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import transcribe
+from podkeet.vad import detect_voice, trim_silence
+
+SR = 16_000
+
+
+def _recording(parts):
+    """Concatenate ``(seconds, speech?)`` parts: a loud tone or faint noise."""
+    rng = np.random.default_rng(0)
+    out = []
+    for seconds, speech in parts:
+        n = int(seconds * SR)
+        noise = rng.standard_normal(n).astype(np.float32) * 0.001
+        if speech:
+            t = np.arange(n) / SR
+            noise += (0.3 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+        out.append(noise)
+    return np.concatenate(out)
+
+
+def test_detect_voice_bridges_short_gaps_and_pads_regions():
+    samples = _recording([(5, False), (3, True), (0.5, False), (2, True), (10, False), (1, True)])
+    voice = detect_voice(samples)
+
+    regions = voice.regions / SR
+    assert len(regions) == 2  # the 0.5 s gap is bridged, the 10 s one is not
+    assert regions[0] == pytest.approx([4.8, 10.7], abs=0.05)
+    assert regions[1] == pytest.approx([20.3, 21.5], abs=0.05)
+    assert voice.speech_seconds == pytest.approx(7.1, abs=0.1)
+    # Every quiet stretch is a pause, including the bridged one
+    assert any(abs(a / SR - 8.0) < 0.05 and abs(b / SR - 8.5) < 0.05 for a, b in voice.pauses)
+    assert voice.as_dict()["removed_seconds"] == pytest.approx(21.5 - 7.1, abs=0.1)
+
+
+def test_all_speech_or_empty_input():
+    voice = detect_voice(_recording([(4, True)]))
+    assert voice.regions.tolist() == [[0, 4 * SR]]
+    assert len(detect_voice(np.zeros(0, dtype=np.float32)).regions) == 0
+
+
+def test_trim_silence_maps_times_back_and_marks_seams():
+    samples = _recording([(5, False), (3, True), (10, False), (2, True)])
+    voice = detect_voice(samples)
+    trimmed = trim_silence(samples, voice)
+
+    a, b = voice.regions.tolist()
+    assert len(trimmed.samples) == (a[1] - a[0]) + (b[1] - b[0])
+    np.testing.assert_array_equal(trimmed.samples[: a[1] - a[0]], samples[a[0] : a[1]])
+    seam = (a[1] - a[0]) / SR
+    mapped = trimmed.time_map.to_original(np.array([0.0, 1.0, seam, seam + 0.5]))
+    assert mapped == pytest.approx([a[0] / SR, a[0] / SR + 1.0, b[0] / SR, b[0] / SR + 0.5])
+    # An end time on the seam stays with the segment before it
+    assert trimmed.time_map.to_original(np.array([seam]), end=True)[0] == pytest.approx(a[1] / SR)
+    assert [seam * SR, seam * SR] in trimmed.pauses.tolist()
+
+
+def test_transcribe_with_vad_skips_silence_and_keeps_original_timestamps(tmp_path):
+    samples = _recording([(30, False), (4, True), (60, False), (4, True)])
+    lengths = []
+
+    def fake_samples(model, chunk, dtype):
+        lengths.append(len(chunk) / SR)
+        # One word a second into each of the two speech bursts of the trimmed audio
+        toks = [
+            SimpleNamespace(text=" one.", start=1.0, end=1.5, duration=0.5),
+            SimpleNamespace(text=" two.", start=5.4, end=5.9, duration=0.5),
+        ]
+        sents = [
+            SimpleNamespace(text=t.text, start=t.start, end=t.end, duration=0.5, tokens=[t])
+            for t in toks
+        ]
+        return SimpleNamespace(text=" one. two.", sentences=sents)
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber.decode_audio", return_value=samples),
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake_samples),
+    ):
+        result = transcribe(
+            tmp_path / "ep.mp3",
+            out_dir=tmp_path,
+            out_format="srt",
+            registry=ModelRegistry(loader=lambda name, dtype: SimpleNamespace()),
+            vad=True,
+        )
+
+    # 98 s in; 4 s bursts padded by 0.2 s (the last one ends the file) to the model
+    assert lengths == [pytest.approx(8.6, abs=0.05)]
+    srt = result.out_path.read_text(encoding="utf-8")
+    starts = [
+        int(h) * 3600 + int(m) * 60 + int(sec) + int(ms) / 1000
+        for h, m, sec, ms in re.findall(r"^(\d+):(\d+):(\d+),(\d+) -->", srt, re.M)
+    ]
+    # Padded regions start at 29.8 s and 93.8 s; each word is ~1 s into one
+    assert starts == [pytest.approx(30.8, abs=0.05), pytest.approx(94.8, abs=0.05)]
+    assert result.vad["regions"] == 2
+    assert result.vad["removed_seconds"] == pytest.approx(98 - 8.6, abs=0.05)
@@ -0,0 +1,128 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from podkeet.batch import BatchItem
+from podkeet.cli import app
+from podkeet.ledger import Ledger
+from podkeet.watch import DirectoryWatcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def ok_item(source, out_dir, **options):
+    out = out_dir / (os.path.basename(source) + ".txt")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text("transcript")
+    item = BatchItem(source=source, status="ok", transcript_path=str(out))
+    item.total_seconds = 0.1
+    return item
+
+
+def test_files_are_picked_up_only_once_their_size_settles(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    clock = Clock()
+    watcher = DirectoryWatcher(
+        inbox, tmp_path / "out", Ledger(), registry=MagicMock(), settle_seconds=5, clock=clock
+    )
+    ep = inbox / "ep.mp3"
+    ep.write_bytes(b"abc")
+    (inbox / "notes.txt").write_text("not media")
+    (inbox / ".ep2.mp3.tmp").write_bytes(b"rsync temp")
+    (inbox / "empty.wav").touch()
+
+    assert watcher.poll() == []
+    assert watcher.backlog == 2
+    clock.now = 3.0
+    ep.write_bytes(b"abcdef")  # still being copied
+    assert watcher.poll() == []
+    clock.now = 7.0
+    assert watcher.poll() == []
+    clock.now = 8.0
+    assert [spec.source for spec in watcher.poll()] == [str(ep)]  # empty.wav waits
+
+    (inbox / "empty.wav").unlink()
+    watcher.poll()
+    assert watcher.backlog == 1
+
+
+def test_processed_files_survive_a_restart_and_changes_are_redone(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "a.mp3").write_bytes(b"a")
+    (inbox / "b.mp4").write_bytes(b"b")
+    registry = MagicMock()
+
+    def run():
+        ledger = Ledger()
+        watcher = DirectoryWatcher(
+            inbox, tmp_path / "out", ledger, registry=registry, settle_seconds=0
+        )
+        with patch("podkeet.watch.process_source", side_effect=ok_item) as process:
+            items = watcher.run(once=True, poll_seconds=0)
+        jobs = ledger.jobs()
+        ledger.close()
+        return [os.path.basename(i.source) for i in items], process, jobs
+
+    names, process, jobs = run()
+    assert names == ["a.mp3", "b.mp4"]
+    assert process.call_args.kwargs["registry"] is registry
+    assert [(j["status"], j["command"]) for j in jobs] == [("ok", "watch")] * 2
+
+    assert run()[0] == []
+    (inbox / "b.mp4").write_bytes(b"re-exported")
+    assert run()[0] == ["b.mp4"]
+
+
+def test_failures_are_retried_up_to_max_attempts(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "bad.mp3").write_bytes(b"x")
+    ledger = Ledger()
+    watcher = DirectoryWatcher(
+        inbox, tmp_path / "out", ledger, registry=MagicMock(), settle_seconds=0, max_attempts=2
+    )
+
+    def fail(source, out_dir, **options):
+        item = BatchItem(source=source)
+        item.fail(RuntimeError("corrupt"))
+        return item
+
+    with patch("podkeet.watch.process_source", side_effect=fail):
+        items = watcher.run(once=True, poll_seconds=0)
+        assert [i.status for i in items] == ["error", "error"]
+        assert watcher.run(once=True, poll_seconds=0) == []
+    assert ledger.failed_sources() == [str((inbox / "bad.mp3").resolve())]
+
+
+def test_cli_watch_once(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "ep.mp3").write_bytes(b"fake")
+    out = tmp_path / "out"
+
+    with (
+        patch("podkeet.watch.process_source", side_effect=ok_item) as process,
+        patch("podkeet.watch.get_registry"),
+    ):
+        result = CliRunner().invoke(
+            app,
+            ["watch", str(inbox), "--out-dir", str(out), "--once", "--settle-seconds", "0"]
+            + ["--format", "srt", "--no-cache"],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "ep.mp3" in result.output
+    assert process.call_args.kwargs["out_format"] == "srt"
+    assert Ledger().jobs()[0]["options"]["out_format"] == "srt"
+
+    result = CliRunner().invoke(app, ["watch", str(tmp_path / "missing"), "--once"])
+    assert result.exit_code == 2
@@ -0,0 +1,147 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from podkeet.formats import FORMATTERS, WORD_FORMATTERS
+from podkeet.models import ModelRegistry
+from podkeet.transcriber import transcribe
+from podkeet.transcript import Transcript
+from podkeet.writers import WRITERS, StreamingOutput, TranscriptWriter
+
+
+def _sentence(words, start):
+    tokens = [
+        {"text": w, "start": start + i * 0.5, "end": start + i * 0.5 + 0.4, "duration": 0.4}
+        for i, w in enumerate(words)
+    ]
+    return {
+        "text": "".join(words),
+        "start": tokens[0]["start"],
+        "end": tokens[-1]["end"],
+        "duration": tokens[-1]["end"] - tokens[0]["start"],
+        "tokens": tokens,
+    }
+
+
+def _transcript():
+    sentences = [
+        _sentence([" Hello", " there."], 0.0),
+        _sentence([" Général", " Kenobi."], 2.0),
+        _sentence([" Bye."], 5.0),
+    ]
+    return Transcript.from_dict(
+        {"text": "Hello there. Général Kenobi. Bye.", "sentences": sentences}
+    )
+
+
+@pytest.mark.parametrize("fmt", sorted(WRITERS))
+@pytest.mark.parametrize("highlight_words", [False, True])
+def test_streamed_output_matches_formatter(tmp_path, fmt, highlight_words):
+    full = _transcript()
+    path = tmp_path / f"ep.{fmt}"
+    writer = WRITERS[fmt](path, highlight_words)
+    for a, b in [(0, 1), (1, 1), (1, 3)]:
+        writer.write(full.sentence_slice(a, b))
+        assert writer.partial.exists() and not path.exists()
+    writer.close(full)
+
+    formatter = (WORD_FORMATTERS if highlight_words else {}).get(fmt, FORMATTERS[fmt])
+    assert path.read_text(encoding="utf-8") == formatter(full)
+    assert not writer.partial.exists()
+    if fmt == "json":
+        assert list(json.loads(path.read_text(encoding="utf-8"))) == ["text", "sentences"]
+
+
+def test_writers_must_render(tmp_path):
+    with pytest.raises(TypeError):
+        TranscriptWriter(tmp_path / "ep.txt")
+
+
+def test_empty_json_is_valid(tmp_path):
+    out = StreamingOutput(tmp_path, "ep", ["json", "jsonl"])
+    out.write(Transcript.empty())
+    out.close(Transcript.empty())
+    assert json.loads((tmp_path / "ep.json").read_text(encoding="utf-8"))["sentences"] == []
+    assert (tmp_path / "ep.jsonl").read_text(encoding="utf-8") == ""
+
+
+def _window_result(words, start):
+    tokens = [
+        SimpleNamespace(text=w, start=start + i, end=start + i + 0.5, duration=0.5)
+        for i, w in enumerate(words)
+    ]
+    sent = SimpleNamespace(
+        text="".join(words), start=start, end=tokens[-1].end, duration=0.5, tokens=tokens
+    )
+    return SimpleNamespace(text=sent.text, sentences=[sent])
+
+
+def test_chunked_transcription_streams_cues_as_windows_finish(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace())
+    samples = np.zeros(16_000 * 30, dtype=np.float32)
+    partial = tmp_path / "talk.srt.partial"
+    seen_on_disk = []
+    calls = []
+
+    def fake_samples(model, chunk, dtype):
+        if partial.exists():
+            seen_on_disk.append(partial.read_text(encoding="utf-8"))
+        calls.append(chunk)
+        return _window_result([f" w{len(calls)}", " end."], 1.0)
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake_samples),
+    ):
+        result = transcribe(
+            tmp_path / "talk.wav",
+            out_dir=tmp_path,
+            out_format="srt,jsonl",
+            registry=registry,
+            samples=samples,
+            chunk_seconds=10,
+            overlap_seconds=0.0,
+        )
+
+    # Window 1 was already on disk while windows 2 and 3 were transcribed
+    assert seen_on_disk[0] == "1\n00:00:01,000 --> 00:00:02,500\nw1 end.\n"
+    assert len(seen_on_disk) == 2
+    srt = result.out_path.read_text(encoding="utf-8")
+    assert [line for line in srt.splitlines() if line.isdigit()] == ["1", "2", "3"]
+    assert "3\n00:00:21,000 --> 00:00:22,500\nw3 end.\n" in srt
+    assert not partial.exists()
+    records = (tmp_path / "talk.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(r)["start"] for r in records] == [1.0, 11.0, 21.0]
+
+
+def test_failed_run_leaves_partial_output(tmp_path):
+    registry = ModelRegistry(loader=lambda name, dtype: SimpleNamespace())
+    samples = np.zeros(16_000 * 30, dtype=np.float32)
+    calls = []
+
+    def fake_samples(model, chunk, dtype):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return _window_result([" first."], 1.0)
+
+    with (
+        patch("podkeet.transcriber.ensure_ffmpeg"),
+        patch("podkeet.transcriber._transcribe_samples", side_effect=fake_samples),
+        pytest.raises(RuntimeError),
+    ):
+        transcribe(
+            tmp_path / "talk.wav",
+            out_dir=tmp_path,
+            out_format="txt",
+            registry=registry,
+            samples=samples,
+            chunk_seconds=10,
+            overlap_seconds=0.0,
+        )
+
+    assert not (tmp_path / "talk.txt").exists()
+    assert (tmp_path / "talk.txt.partial").read_text(encoding="utf-8") == "first."